@@ -1,2 +1,2 @@
-#EXAMPLE ACTION IDEA FOR IMPROVE YOURSELF
+#EXAMPLE ACTION IDEA FOR IMPROVE YOURSELF
 #TAKE THE API KEY FROM A RADAR WEB SITE TO SEE ALL PLANES ON THE AIR
\ No newline at end of file
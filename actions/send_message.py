@@ -1,96 +1,125 @@
-import time
-import pyautogui
-from tts import edge_speak
-
-REQUIRED_PARAMS = ["receiver", "message_text", "platform"]
-
-def send_message(parameters: dict, response: str | None = None, player=None, session_memory=None) -> bool:
-    """
-    Send a message via Windows app (WhatsApp, Telegram, etc.)
-
-    Multi-step support: asks for missing parameters using temporary memory.
-
-    Expected parameters:
-        - receiver (str)
-        - message_text (str)
-        - platform (str, default: "WhatsApp")
-    """
-
-    if session_memory is None:
-        msg = "Session memory missing, cannot proceed."
-        if player:
-            player.write_log(msg)
-        edge_speak(msg, player)
-        return False
-
-    if parameters:
-        session_memory.update_parameters(parameters)
-
-    for param in REQUIRED_PARAMS:
-        value = session_memory.get_parameter(param)
-        if not value:
-        
-            session_memory.set_current_question(param)
-            question_text = ""
-            if param == "receiver":
-                question_text = "Sir, who should I send the message to?"
-            elif param == "message_text":
-                question_text = "Sir, what should I say?"
-            elif param == "platform":
-                question_text = "Sir, which platform should I use? (WhatsApp, Telegram, etc.)"
-            else:
-                question_text = f"Sir, please provide {param}."
-
-            if player:
-                player.write_log("AI :", question_text)
-            edge_speak(question_text, player)
-            return False  
-
-    receiver = session_memory.get_parameter("receiver").strip()
-    platform = session_memory.get_parameter("platform").strip() or "WhatsApp"
-    message_text = session_memory.get_parameter("message_text").strip()
-
-    if response:
-        if player:
-            player.write_log(response)
-        edge_speak(response, player)
-
-    try:
-        pyautogui.PAUSE = 0.1
-
-        pyautogui.press("win")
-        time.sleep(0.3)
-        pyautogui.write(platform, interval=0.03)
-        pyautogui.press("enter")
-        time.sleep(0.6)
-
-        pyautogui.hotkey("ctrl", "f")
-        time.sleep(0.2)
-        pyautogui.write(receiver, interval=0.03)
-        time.sleep(0.2)
-        pyautogui.press("enter")
-        time.sleep(0.2)
-
-        pyautogui.write(message_text, interval=0.03)
-        pyautogui.press("enter")
-
-        session_memory.clear_current_question()
-        session_memory.clear_pending_intent()
-        session_memory.update_parameters({})  
-
-        # -----------------------------
-        # Log success
-        # -----------------------------
-        success_msg = f"Sir, message sent to {receiver} via {platform}."
-        if player:
-            player.write_log(success_msg)
-        edge_speak(success_msg, player)
-
-        return True
-
-    except Exception as e:
-        msg = f"Sir, I failed to send the message. ({e})"
-        if player:
-            player.write_log(msg)
-        edge_speak(msg, player)
-        return False
+import time
+import pyautogui
+from tts import edge_speak, PRIORITY_CLARIFICATION
+
+REQUIRED_PARAMS = ["receiver", "message_text", "platform"]
+
+QUESTIONS = {
+    "receiver": "Sir, who should I send the message to?",
+    "message_text": "Sir, what should I say?",
+    "platform": "Sir, which platform should I use? (WhatsApp, Telegram, etc.)",
+}
+
+# Spoken answers to "which platform should I use?".
+PLATFORMS = ["whatsapp", "telegram", "signal", "discord", "instagram", "messenger", "slack", "teams", "skype"]
+
+def expected_answers(param: str, memory: dict | None = None) -> list[str] | None:
+    """
+    Likely spoken answers when asking for `param`, used to bias recognition.
+    None when the answer is free text.
+    """
+    if param == "platform":
+        return PLATFORMS
+
+    if param == "receiver" and memory:
+        answers = []
+        for rel, info in memory.get("relationships", {}).items():
+            answers.append(rel.replace("_", " "))
+            if isinstance(info, dict) and isinstance(info.get("name"), dict):
+                name = info["name"].get("value")
+                if isinstance(name, str) and name.strip():
+                    answers.append(name)
+        return [a.lower() for a in answers] or None
+
+    return None
+
+def ask_for_missing(session_memory, player=None) -> bool:
+    """
+    Asks for the first missing parameter and makes it the current
+    question. Returns False when nothing is missing.
+    """
+    for param in REQUIRED_PARAMS:
+        if session_memory.get_parameter(param):
+            continue
+
+        session_memory.set_current_question(param)
+        question_text = QUESTIONS.get(param, f"Sir, please provide {param}.")
+        if player:
+            player.write_log(f"AI: {question_text}")
+        edge_speak(question_text, player, priority=PRIORITY_CLARIFICATION)
+        return True
+    return False
+
+def send_message(parameters: dict, response: str | None = None, player=None, session_memory=None) -> bool:
+    """
+    Send a message via Windows app (WhatsApp, Telegram, etc.)
+
+    Multi-step support: asks for missing parameters using temporary memory.
+
+    Expected parameters:
+        - receiver (str)
+        - message_text (str)
+        - platform (str, default: "WhatsApp")
+    """
+
+    if session_memory is None:
+        msg = "Session memory missing, cannot proceed."
+        if player:
+            player.write_log(msg)
+        edge_speak(msg, player)
+        return False
+
+    if parameters:
+        session_memory.update_parameters(parameters)
+
+    if ask_for_missing(session_memory, player):
+        return False
+
+    receiver = session_memory.get_parameter("receiver").strip()
+    platform = session_memory.get_parameter("platform").strip() or "WhatsApp"
+    message_text = session_memory.get_parameter("message_text").strip()
+
+    if response:
+        if player:
+            player.write_log(response)
+        edge_speak(response, player)
+
+    try:
+        pyautogui.PAUSE = 0.1
+
+        pyautogui.press("win")
+        time.sleep(0.3)
+        pyautogui.write(platform, interval=0.03)
+        pyautogui.press("enter")
+        time.sleep(0.6)
+
+        pyautogui.hotkey("ctrl", "f")
+        time.sleep(0.2)
+        pyautogui.write(receiver, interval=0.03)
+        time.sleep(0.2)
+        pyautogui.press("enter")
+        time.sleep(0.2)
+
+        pyautogui.write(message_text, interval=0.03)
+        pyautogui.press("enter")
+
+        session_memory.clear_current_question()
+        session_memory.clear_pending_intent()
+        session_memory.update_parameters({})  
+
+        # -----------------------------
+        # Log success
+        # -----------------------------
+        success_msg = f"Sir, message sent to {receiver} via {platform}."
+        if player:
+            player.write_log(success_msg)
+        edge_speak(success_msg, player)
+
+        return True
+
+    except Exception as e:
+        msg = f"Sir, I failed to send the message. ({e})"
+        if player:
+            player.write_log(msg)
+        edge_speak(msg, player)
+        return False
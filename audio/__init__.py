@@ -0,0 +1 @@
+#audio package
\ No newline at end of file
@@ -0,0 +1,218 @@
+# audio/backends.py
+import io
+import time
+import shutil
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+import numpy as np
+import soundfile as sf
+import edge_tts
+
+from audio.mp3_stream import Mp3StreamDecoder
+
+# Switch to the local engine when the cloud's time-to-first-byte exceeds this.
+CLOUD_TTFB_THRESHOLD_MS = 1200
+
+# A single cloud request waiting longer than this for audio is abandoned
+# and the sentence is spoken by the local engine instead.
+CLOUD_TTFB_TIMEOUT_MS = 2500
+
+# How long to stay on the local engine before probing the cloud again.
+FALLBACK_COOLDOWN_SECONDS = 60
+
+# Weight of the newest sample in the moving latency average.
+LATENCY_SMOOTHING = 0.3
+
+ESPEAK_VOICE = "en-us"
+ESPEAK_WORDS_PER_MINUTE = 175
+
+# Optional Piper voice (path to the .onnx model). Used instead of espeak when set.
+PIPER_MODEL: str | None = None
+PIPER_SAMPLERATE = 22050
+
+
+class SynthBackend(ABC):
+    """
+    Interface of a speech synthesizer.
+    """
+
+    name = "base"
+    cacheable = False
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def stream(self, sentence: str):
+        """
+        Async generator of (samplerate, pcm) chunks for one sentence, pcm
+        being float32 with shape frames x channels.
+        """
+
+
+class EdgeTTSBackend(SynthBackend):
+    """
+    Microsoft Edge cloud voices. Every request opens its own websocket
+    (edge-tts closes the session and its connector afterwards, and
+    websocket connections are never pooled), so callers should send
+    whole runs of text rather than many small requests.
+    """
+
+    name = "edge-tts"
+    cacheable = True
+
+    def __init__(self, voice: str, rate: str, volume: str, pitch: str):
+        self.voice = voice
+        self.rate = rate
+        self.volume = volume
+        self.pitch = pitch
+
+    async def stream(self, sentence: str):
+        decoder = Mp3StreamDecoder()
+        communicate = edge_tts.Communicate(
+            text=sentence, voice=self.voice, rate=self.rate, volume=self.volume, pitch=self.pitch
+        )
+        stream = communicate.stream()
+
+        try:
+            async for chunk in stream:
+                if chunk["type"] == "audio":
+                    for pcm in decoder.feed(chunk["data"]):
+                        yield decoder.samplerate, pcm
+        finally:
+            await stream.aclose()
+
+        for pcm in decoder.flush():
+            yield decoder.samplerate, pcm
+
+
+class LocalBackend(SynthBackend):
+    """
+    Offline synthesis through a Piper voice when PIPER_MODEL is set,
+    otherwise espeak-ng (or espeak).
+    """
+
+    name = "local"
+
+    def __init__(self):
+        self.piper = shutil.which("piper") if PIPER_MODEL else None
+        self.espeak = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def available(self) -> bool:
+        return bool(self.piper or self.espeak)
+
+    async def stream(self, sentence: str):
+        if self.piper:
+            async for chunk in self._stream_piper(sentence):
+                yield chunk
+            return
+
+        # Text goes in on stdin, so a sentence starting with "-" isn't
+        # taken for an option.
+        process = await asyncio.create_subprocess_exec(
+            self.espeak, "-v", ESPEAK_VOICE, "-s", str(ESPEAK_WORDS_PER_MINUTE), "--stdout", "--stdin",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            wav, _ = await process.communicate(sentence.encode("utf-8"))
+        finally:
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+
+        if wav:
+            pcm, samplerate = sf.read(io.BytesIO(wav), dtype="float32", always_2d=True)
+            yield samplerate, pcm
+
+    async def _stream_piper(self, sentence: str):
+        process = await asyncio.create_subprocess_exec(
+            self.piper, "--model", PIPER_MODEL, "--output_raw",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            process.stdin.write(sentence.encode("utf-8") + b"\n")
+            process.stdin.close()
+
+            leftover = b""
+            while True:
+                data = await process.stdout.read(8192)
+                if not data:
+                    break
+                data = leftover + data
+                usable = len(data) - len(data) % 2
+                leftover = data[usable:]
+                pcm = np.frombuffer(data[:usable], dtype=np.int16).astype(np.float32) / 32768.0
+                yield PIPER_SAMPLERATE, pcm.reshape(-1, 1)
+        finally:
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+
+
+class BackendSelector:
+    """
+    Tracks per-backend time-to-first-byte and failures, and picks the
+    cloud backend unless it is currently too slow or failing.
+    """
+
+    def __init__(self, cloud: SynthBackend, local: SynthBackend):
+        self.cloud = cloud
+        self.local = local
+
+        self._lock = threading.Lock()
+        self._ttfb_ms: dict[str, float] = {}
+        self._stats = {
+            b.name: {"requests": 0, "failures": 0, "timeouts": 0}
+            for b in (cloud, local)
+        }
+        self._fallback_until = 0.0
+
+    def choose(self) -> SynthBackend:
+        if not self.local.available():
+            return self.cloud
+        with self._lock:
+            if time.monotonic() < self._fallback_until:
+                return self.local
+        return self.cloud
+
+    def record_ttfb(self, backend: SynthBackend, ms: float):
+        with self._lock:
+            self._stats[backend.name]["requests"] += 1
+            previous = self._ttfb_ms.get(backend.name)
+            if previous is None:
+                average = ms
+            else:
+                average = previous + LATENCY_SMOOTHING * (ms - previous)
+            self._ttfb_ms[backend.name] = average
+
+            if backend is self.cloud and average > CLOUD_TTFB_THRESHOLD_MS:
+                self._start_fallback(f"time-to-first-byte {average:.0f} ms")
+
+    def record_failure(self, backend: SynthBackend, timeout: bool = False):
+        with self._lock:
+            stats = self._stats[backend.name]
+            stats["requests"] += 1
+            stats["timeouts" if timeout else "failures"] += 1
+            if backend is self.cloud:
+                self._start_fallback("timeout" if timeout else "error")
+
+    def _start_fallback(self, reason: str):
+        if not self.local.available():
+            return
+        if time.monotonic() >= self._fallback_until:
+            print(f"⚠️ Cloud TTS degraded ({reason}), using local voice")
+        self._fallback_until = time.monotonic() + FALLBACK_COOLDOWN_SECONDS
+        # Forget the slow average so the next probe is judged on its own.
+        self._ttfb_ms.pop(self.cloud.name, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                name: {**values, "ttfb_ms": self._ttfb_ms.get(name)}
+                for name, values in self._stats.items()
+            } | {"on_fallback": time.monotonic() < self._fallback_until}
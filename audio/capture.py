@@ -0,0 +1,100 @@
+# audio/capture.py
+import sys
+import atexit
+import threading
+import numpy as np
+import sounddevice as sd
+from multiprocessing import shared_memory
+
+from audio.ring import AudioRing, ring_buffer_size
+
+SAMPLE_RATE = 16000
+
+# Samples per device callback (100 ms).
+CAPTURE_BLOCKSIZE = 1600
+
+# Audio kept in memory. Readers further behind than this lose the oldest audio.
+RING_SECONDS = 30
+
+
+class MicrophoneCapture:
+    """
+    One persistent input stream feeding an AudioRing.
+
+    playing: optional callable, True while our own voice is on the
+    speakers; every block is stamped with it (see AudioRing.write). It's
+    called from the audio callback, so it must not block.
+    """
+
+    def __init__(self, ring: AudioRing, samplerate: int = SAMPLE_RATE, blocksize: int = CAPTURE_BLOCKSIZE):
+        self.ring = ring
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.playing = None
+
+        self._stream = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._stream is not None:
+                return
+            stream = sd.RawInputStream(
+                samplerate=self.samplerate,
+                blocksize=self.blocksize,
+                dtype="int16",
+                channels=1,
+                callback=self._callback,
+            )
+            stream.start()
+            self._stream = stream
+
+    def is_running(self) -> bool:
+        return self._stream is not None
+
+    def _callback(self, indata, frames, time, status):
+        if status:
+            print(status, file=sys.stderr)
+        playback = self.playing() if self.playing else None
+        self.ring.write(np.frombuffer(indata, dtype=np.int16), playback)
+
+
+def create_shared_ring(capacity: int) -> tuple[AudioRing, shared_memory.SharedMemory]:
+    """
+    A ring backed by named shared memory, so a recognizer process can
+    attach to it with AudioRing(capacity, SharedMemory(name).buf, ...).
+    """
+    # New shared memory is zero-filled, i.e. an empty ring.
+    shm = shared_memory.SharedMemory(create=True, size=ring_buffer_size(capacity))
+
+    def _release():
+        try:
+            shm.close()
+        except BufferError:
+            pass                    # the ring's arrays still point into it
+        shm.unlink()
+
+    atexit.register(_release)
+    return AudioRing(capacity, shm.buf), shm
+
+
+_capture: MicrophoneCapture | None = None
+_capture_shm: shared_memory.SharedMemory | None = None
+_capture_lock = threading.Lock()
+
+
+def get_capture() -> MicrophoneCapture:
+    """Returns the process-wide microphone capture, starting it on first use."""
+    global _capture, _capture_shm
+
+    with _capture_lock:
+        if _capture is None:
+            ring, _capture_shm = create_shared_ring(RING_SECONDS * SAMPLE_RATE)
+            _capture = MicrophoneCapture(ring)
+    _capture.start()
+    return _capture
+
+def shared_ring_name() -> str:
+    """Shared memory name of the capture ring (starts the capture if needed)."""
+    get_capture()
+    return _capture_shm.name
@@ -0,0 +1,176 @@
+# audio/mp3_stream.py
+import io
+import soundfile as sf
+
+# Frames decoded per chunk. The first chunk is smaller so playback starts early.
+FIRST_CHUNK_FRAMES = 6
+FRAMES_PER_CHUNK = 16
+
+# Largest bit reservoir a Layer III frame can reach back into (MPEG 1).
+RESERVOIR_BYTES = 511
+
+_BITRATES_V1 = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320]
+_BITRATES_V2 = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+_SAMPLERATES = {
+    3: [44100, 48000, 32000],   # MPEG 1
+    2: [22050, 24000, 16000],   # MPEG 2
+    0: [11025, 12000, 8000],    # MPEG 2.5
+}
+
+
+def parse_frame_header(header: bytes) -> tuple[int, int] | None:
+    """
+    Parses a 4-byte MPEG audio Layer III header.
+    Returns (frame_length, samples_per_frame) or None if it isn't one.
+    """
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+
+    version = (header[1] >> 3) & 0x03
+    layer = (header[1] >> 1) & 0x03
+    bitrate_index = (header[2] >> 4) & 0x0F
+    samplerate_index = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+
+    if version == 1 or layer != 1:
+        return None
+    if bitrate_index in (0, 15) or samplerate_index == 3:
+        return None
+
+    samplerate = _SAMPLERATES[version][samplerate_index]
+
+    if version == 3:
+        bitrate = _BITRATES_V1[bitrate_index] * 1000
+        return 144 * bitrate // samplerate + padding, 1152
+
+    bitrate = _BITRATES_V2[bitrate_index] * 1000
+    return 72 * bitrate // samplerate + padding, 576
+
+
+class Mp3StreamDecoder:
+    """
+    Decodes an MP3 byte stream while it is still arriving.
+
+    Bytes are split on frame boundaries and decoded a few frames at a time.
+    The tail of the previous chunk (enough frames to cover the bit
+    reservoir, plus one for the overlap state) is decoded again in front of
+    each chunk and its samples dropped, which keeps boundaries click-free.
+
+    Only undecoded bytes are kept, so memory does not grow with the
+    length of the utterance.
+    """
+
+    def __init__(self, first_chunk_frames: int = FIRST_CHUNK_FRAMES, frames_per_chunk: int = FRAMES_PER_CHUNK):
+        self.first_chunk_frames = first_chunk_frames
+        self.frames_per_chunk = frames_per_chunk
+
+        self.samplerate: int | None = None
+        self.channels: int | None = None
+
+        self._buf = bytearray()
+        self._frames: list[bytes] = []
+        self._prime: list[bytes] = []
+        self._started = False
+        self._id3_checked = False
+
+    def feed(self, data: bytes) -> list:
+        """Adds bytes, returns the PCM chunks (float32, frames x channels) now decodable."""
+        self._buf.extend(data)
+        self._split_frames()
+
+        chunks = []
+        while True:
+            needed = self.frames_per_chunk if self._started else self.first_chunk_frames
+            if len(self._frames) < needed:
+                break
+            pcm = self._decode(self._frames[:needed])
+            del self._frames[:needed]
+            if pcm is not None:
+                chunks.append(pcm)
+        return chunks
+
+    def flush(self) -> list:
+        """Decodes whatever complete frames are left at the end of the stream."""
+        self._split_frames()
+        chunks = []
+        if self._frames:
+            pcm = self._decode(self._frames)
+            self._frames = []
+            if pcm is not None:
+                chunks.append(pcm)
+        self._buf.clear()
+        return chunks
+
+    def _skip_id3(self) -> bool:
+        if self._id3_checked:
+            return True
+        if len(self._buf) < 10:
+            return False
+        if self._buf[:3] == b"ID3":
+            size = 10 + (
+                (self._buf[6] << 21) | (self._buf[7] << 14) | (self._buf[8] << 7) | self._buf[9]
+            )
+            if len(self._buf) < size:
+                return False
+            del self._buf[:size]
+        self._id3_checked = True
+        return True
+
+    def _split_frames(self):
+        if not self._skip_id3():
+            return
+
+        buf = self._buf
+        pos = 0
+        while pos + 4 <= len(buf):
+            info = parse_frame_header(bytes(buf[pos:pos + 4]))
+            if info is None:
+                pos += 1
+                continue
+
+            length, _ = info
+            if pos + length > len(buf):
+                break
+
+            self._frames.append(bytes(buf[pos:pos + length]))
+            pos += length
+
+        del buf[:pos]
+
+    def _decode(self, frames: list[bytes]):
+        data = b"".join(self._prime) + b"".join(frames)
+
+        try:
+            pcm, samplerate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+        except Exception as e:
+            print(f"⚠️ MP3 chunk decode failed: {e}")
+            return None
+
+        self._started = True
+        self.samplerate = samplerate
+        self.channels = pcm.shape[1]
+
+        pcm = pcm[self._samples_in(self._prime):]
+
+        self._prime = self._tail(self._prime + frames)
+
+        return pcm if len(pcm) else None
+
+    @staticmethod
+    def _samples_in(frames: list[bytes]) -> int:
+        total = 0
+        for frame in frames:
+            info = parse_frame_header(frame[:4])
+            if info:
+                total += info[1]
+        return total
+
+    @staticmethod
+    def _tail(frames: list[bytes]) -> list[bytes]:
+        """Last frames covering RESERVOIR_BYTES, plus one more."""
+        size = 0
+        start = len(frames)
+        while start > 0 and size < RESERVOIR_BYTES:
+            start -= 1
+            size += len(frames[start])
+        return frames[max(0, start - 1):]
@@ -0,0 +1,149 @@
+# audio/phrase_cache.py
+import os
+import sys
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+import soundfile as sf
+
+def get_base_dir():
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).parent
+    return Path(__file__).resolve().parent.parent
+
+
+BASE_DIR = get_base_dir()
+CACHE_DIR = BASE_DIR / "cache" / "tts"
+
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Longer sentences are unlikely to be spoken twice, don't spend disk on them.
+MAX_CACHED_CHARS = 160
+
+
+def phrase_key(text: str, voice: str, rate: str, volume: str, pitch: str) -> str:
+    raw = "\x1f".join((text.strip(), voice, rate, volume, pitch))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PhraseCache:
+    """
+    Content-addressed cache of synthesized PCM, one float WAV per phrase.
+    Size-bounded; the least recently used files are deleted first.
+    """
+
+    def __init__(self, directory: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._index: dict[str, tuple[int, float]] = {}
+        self._total = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        self._scan()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.wav"
+
+    def _scan(self):
+        if not self.directory.exists():
+            return
+        for path in self.directory.glob("*.wav"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            self._index[path.stem] = (stat.st_size, stat.st_mtime)
+            self._total += stat.st_size
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            return key in self._index
+
+    def get(self, key: str):
+        """Returns (samplerate, pcm) or None. pcm is float32, frames x channels."""
+        with self._lock:
+            known = key in self._index
+
+        if not known:
+            self.misses += 1
+            return None
+
+        path = self._path(key)
+        try:
+            pcm, samplerate = sf.read(path, dtype="float32", always_2d=True)
+        except Exception:
+            self._forget(key)
+            self.misses += 1
+            return None
+
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+
+        with self._lock:
+            if key in self._index:
+                self._index[key] = (self._index[key][0], now)
+
+        self.hits += 1
+        return samplerate, pcm
+
+    def put(self, key: str, samplerate: int, pcm) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp_path = path.with_suffix(".tmp")
+            sf.write(tmp_path, pcm, samplerate, subtype="FLOAT", format="WAV")
+            os.replace(tmp_path, path)
+            size = path.stat().st_size
+        except Exception as e:
+            print(f"⚠️ TTS cache write failed: {e}")
+            return
+
+        with self._lock:
+            old = self._index.get(key)
+            if old:
+                self._total -= old[0]
+            self._index[key] = (size, time.time())
+            self._total += size
+            self._evict()
+
+    def _forget(self, key: str):
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old:
+                self._total -= old[0]
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+
+        for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total <= self.max_bytes:
+                break
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+            del self._index[key]
+            self._total -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": self._total,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,154 @@
+# audio/playback.py
+import time
+import queue
+import threading
+import numpy as np
+import sounddevice as sd
+
+OUTPUT_SAMPLERATE = 24000
+OUTPUT_BLOCKSIZE = 480          # 20 ms per callback
+
+# Chunks waiting between the synthesizer and the device (~0.4 s each).
+OUTPUT_QUEUE_CHUNKS = 6
+
+
+def to_output_format(samplerate: int, pcm) -> np.ndarray:
+    """Downmixes to mono and resamples to OUTPUT_SAMPLERATE, float32 1-D."""
+    data = np.asarray(pcm, dtype=np.float32)
+    if data.ndim > 1:
+        data = data.mean(axis=1) if data.shape[1] > 1 else data[:, 0]
+
+    if samplerate != OUTPUT_SAMPLERATE and len(data):
+        length = int(round(len(data) * OUTPUT_SAMPLERATE / samplerate))
+        positions = np.linspace(0, len(data) - 1, num=length)
+        data = np.interp(positions, np.arange(len(data)), data).astype(np.float32)
+
+    return np.ascontiguousarray(data, dtype=np.float32)
+
+
+class AudioOutput:
+    """
+    One persistent output stream for all speech.
+
+    Items are (utterance, pcm) where pcm is already in output format, or
+    (utterance, None) to mark the end of an utterance. Utterances are
+    objects with a "cancelled" threading.Event; their queued audio is
+    skipped as soon as it is set. on_start / on_finish are called from
+    the audio thread when an utterance begins and ends playing; they must
+    not block (no locks), or the device underruns.
+    """
+
+    def __init__(self, on_start=None, on_finish=None):
+        self.on_start = on_start
+        self.on_finish = on_finish
+
+        self._queue = queue.Queue(maxsize=OUTPUT_QUEUE_CHUNKS)
+        self._stream = None
+        self._lock = threading.Lock()
+
+        self._current = None            # (utterance, pcm, offset)
+        self._playing = None            # utterance whose audio is on the speaker
+        self.last_audio_at = 0.0        # time.monotonic() of the last non-silent block
+
+    def start(self):
+        with self._lock:
+            if self._stream is not None:
+                return
+            stream = sd.OutputStream(
+                samplerate=OUTPUT_SAMPLERATE,
+                channels=1,
+                dtype="float32",
+                blocksize=OUTPUT_BLOCKSIZE,
+                callback=self._callback,
+            )
+            stream.start()
+            self._stream = stream
+
+    def put(self, utterance, pcm, timeout: float = 0.05) -> bool:
+        """
+        Blocks while the queue is full. Returns False if the utterance was
+        cancelled before its audio could be queued.
+        """
+        self.start()
+        while not utterance.cancelled.is_set():
+            try:
+                self._queue.put((utterance, pcm), timeout=timeout)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def is_playing(self) -> bool:
+        return self._playing is not None
+
+    def stop(self):
+        """
+        Forgets the utterance on the speaker if it was cancelled, so
+        is_playing() drops right away; the callback discards its audio.
+        """
+        playing = self._playing
+        if playing is not None and playing.cancelled.is_set():
+            self._playing = None
+
+    def _next_item(self):
+        while True:
+            try:
+                utterance, pcm = self._queue.get_nowait()
+            except queue.Empty:
+                return None
+
+            if utterance.cancelled.is_set():
+                # A cancelled utterance's end marker may never be queued,
+                # so it's finished here rather than waited for.
+                if pcm is None or self._playing is utterance:
+                    self._finish(utterance)
+                continue
+
+            if pcm is None:
+                self._finish(utterance)
+                continue
+
+            if self._playing is not utterance:
+                self._playing = utterance
+                if self.on_start:
+                    self.on_start(utterance)
+
+            return utterance, pcm, 0
+
+    def _finish(self, utterance):
+        if self._playing is utterance:
+            self._playing = None
+        if self.on_finish:
+            self.on_finish(utterance)
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        filled = 0
+
+        playing = self._playing
+        if playing is not None and playing.cancelled.is_set():
+            if self._current is None or self._current[0] is not playing:
+                self._finish(playing)
+
+        while filled < frames:
+            if self._current is None:
+                self._current = self._next_item()
+                if self._current is None:
+                    break
+
+            utterance, pcm, offset = self._current
+            if utterance.cancelled.is_set():
+                self._current = None
+                self._finish(utterance)
+                continue
+
+            count = min(frames - filled, len(pcm) - offset)
+            out[filled:filled + count] = pcm[offset:offset + count]
+            filled += count
+            offset += count
+
+            self._current = None if offset >= len(pcm) else (utterance, pcm, offset)
+
+        out[filled:] = 0.0
+        if filled:
+            self.last_audio_at = time.monotonic()
@@ -0,0 +1,345 @@
+# audio/recognizer.py
+import json
+import time
+import threading
+from collections import deque
+
+import vosk
+
+from audio.ring import AudioRing, PREROLL_SECONDS
+from audio.vad import VoiceActivityDetector, Endpointer
+
+# Samples fed to the recognizer per AcceptWaveform call (100 ms at 16 kHz).
+# Smaller blocks let the endpointer react sooner.
+RECOGNIZER_BLOCK = 1600
+
+# Skip silent blocks instead of decoding them (see audio/vad.py).
+USE_VAD = True
+
+# Silent blocks kept and fed in front of detected speech, so onsets aren't lost.
+PRE_SPEECH_BLOCKS = 3
+
+# While our own voice was playing (as stamped on the ring when the audio
+# was captured), speech must be this much louder than usual to open the
+# gate, so the speakers alone don't.
+ECHO_GATE_DB = 12.0
+
+# Audio that arrived while we weren't listening (LLM, TTS) is still
+# recognized, up to this much of it.
+MAX_BACKLOG_SECONDS = 10
+
+# Samples per step when watching for interrupt commands (50 ms at 16 kHz).
+# Small steps keep the time between the word and the cut-off short.
+WATCH_BLOCK = 800
+
+
+def find_phrase(text: str, phrases: list[str]) -> str | None:
+    padded = f" {text} "
+    for phrase in phrases:
+        if f" {phrase} " in padded:
+            return phrase
+    return None
+
+
+class GatedRecognizer:
+    """
+    A KaldiRecognizer behind the VAD. Silence before speech is never
+    decoded, and an utterance ends once the endpointer's trailing silence
+    has passed (or Kaldi's own endpoint fires first).
+
+    feed() returns the text of a finished utterance ("" for noise) or None
+    while it goes on. After a result, `unfed` is the number of samples at
+    the end of what was fed that belong to the next utterance.
+
+    The same pipeline serves the microphone and recorded files.
+    """
+
+    def __init__(
+        self,
+        model,
+        samplerate: int,
+        grammar: list[str] | None = None,
+        vad: VoiceActivityDetector | None = None,
+        endpointer: Endpointer | None = None,
+        use_vad: bool = USE_VAD
+    ):
+        if grammar:
+            self.rec = vosk.KaldiRecognizer(model, samplerate, json.dumps(grammar))
+        else:
+            self.rec = vosk.KaldiRecognizer(model, samplerate)
+
+        self.samplerate = samplerate
+        self.vad = vad if vad is not None else VoiceActivityDetector(samplerate)
+        self.endpointer = endpointer if endpointer is not None else Endpointer()
+        self.use_vad = use_vad
+
+        self.in_speech = False
+        self.silence_ms = 0.0
+        self.endpoint_ms = 0.0          # trailing silence when the last utterance ended
+        self.unfed = 0
+        self._pre_speech = deque(maxlen=PRE_SPEECH_BLOCKS)
+
+        self.stats = {
+            "blocks": 0,
+            "skipped_blocks": 0,
+            "decoded_seconds": 0.0,
+            "decode_cpu_seconds": 0.0,
+        }
+
+    def feed(self, samples, extra_margin_db: float = 0.0) -> str | None:
+        """samples: int16 block. extra_margin_db is passed on to the VAD."""
+        self.unfed = 0
+        self.stats["blocks"] += 1
+
+        speech = self.vad.is_speech(samples, extra_margin_db) if self.use_vad else True
+
+        if not self.in_speech and not speech:
+            self.stats["skipped_blocks"] += 1
+            self._pre_speech.append(samples)
+            return None
+
+        if speech:
+            if self.in_speech and self.silence_ms:
+                self.endpointer.record_pause(self.silence_ms)
+            self.in_speech = True
+            self.silence_ms = 0.0
+            blocks = list(self._pre_speech) + [samples]
+            self.stats["skipped_blocks"] -= len(self._pre_speech)
+            self._pre_speech.clear()
+        else:
+            self.silence_ms += len(samples) * 1000 / self.samplerate
+            blocks = [samples]
+
+        for i, block in enumerate(blocks):
+            if self._accept(block):
+                self.unfed = sum(len(b) for b in blocks[i + 1:])
+                return self._finish(self.rec.Result())
+
+        if self.use_vad and self.silence_ms >= self.endpointer.trailing_silence_ms:
+            return self._finish(self.rec.FinalResult())
+        return None
+
+    def flush(self) -> str:
+        """Ends the current utterance now, e.g. at the end of a file."""
+        return self._finish(self.rec.FinalResult())
+
+    def partial(self) -> str:
+        return json.loads(self.rec.PartialResult()).get("partial", "")
+
+    def _accept(self, samples) -> bool:
+        start = time.thread_time()
+        finished = self.rec.AcceptWaveform(samples.tobytes())
+        self.stats["decode_cpu_seconds"] += time.thread_time() - start
+        self.stats["decoded_seconds"] += len(samples) / self.samplerate
+        return finished
+
+    def _finish(self, result: str) -> str:
+        self.endpoint_ms = self.silence_ms
+        self.in_speech = False
+        self.silence_ms = 0.0
+        return json.loads(result).get("text", "")
+
+
+class SpeechSession:
+    """
+    Listening state that outlives a single utterance: where in the ring
+    the last one ended, the VAD noise floor, the learned pause lengths
+    and the decode statistics. Lives wherever the model is loaded, in the
+    app itself or in the recognizer process (see stt_worker.py).
+
+    stop_event: any object with is_set(); ends the current listen.
+
+    last_span: ring positions (start, end) of the speech record() last
+    returned, None if it returned "".
+    """
+
+    def __init__(self, model, ring: AudioRing, samplerate: int, stop_event):
+        self.model = model
+        self.ring = ring
+        self.samplerate = samplerate
+        self.stop_event = stop_event
+
+        self.resume_position: int | None = None
+        self.last_span: tuple[int, int] | None = None
+        self.vad = VoiceActivityDetector(samplerate)
+        self.endpointer = Endpointer()
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "blocks": 0,
+            "skipped_blocks": 0,
+            "decoded_seconds": 0.0,
+            "decode_cpu_seconds": 0.0,
+            "utterances": 0,
+            "endpoint_latency_ms": 0.0,
+            "constrained_hits": 0,
+            "constrained_fallbacks": 0,
+        }
+
+    def record(self, on_partial=None, timeout: float | None = None, expected_phrases: list[str] | None = None) -> str:
+        """
+        Returns the first recognized sentence ("" when stopped, or when
+        no speech started within `timeout` seconds).
+
+        expected_phrases: likely answers (e.g. to a clarification question).
+        The utterance is decoded against just these first; when it isn't
+        one of them, the same audio is decoded again with the full
+        vocabulary.
+        """
+        grammar = [p.lower() for p in expected_phrases] + ["[unk]"] if expected_phrases else None
+        recognizer = self._recognizer(grammar)
+        cursor = self._open_cursor()
+        utterance_start = cursor.position
+        speech_start = None
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        self.last_span = None
+
+        while not self.stop_event.is_set():
+            if deadline is not None and not recognizer.in_speech and time.monotonic() > deadline:
+                break
+
+            samples = cursor.read(RECOGNIZER_BLOCK, timeout=0.1)
+            if not len(samples):
+                continue
+
+            block_start = cursor.position - len(samples)
+            if not recognizer.in_speech:
+                speech_start = block_start - PRE_SPEECH_BLOCKS * RECOGNIZER_BLOCK
+            text = recognizer.feed(samples, self._echo_margin(block_start, cursor.position))
+
+            if text is None:
+                if on_partial:
+                    on_partial(recognizer.partial())
+                continue
+
+            # Audio after the end of the utterance belongs to the next one.
+            utterance_end = cursor.position - recognizer.unfed
+
+            if grammar and text.strip():
+                if "[unk]" in text.split():
+                    text = self._redecode(utterance_start, utterance_end)
+                    self._count("constrained_fallbacks")
+                else:
+                    self._count("constrained_hits")
+
+            self._add_stats(recognizer, text.strip())
+            if text.strip():
+                self.resume_position = utterance_end
+                self.last_span = (max(speech_start, utterance_start), utterance_end)
+                return text
+            utterance_start = utterance_end
+
+        self._add_stats(recognizer, "")
+        self.resume_position = cursor.position
+        return ""
+
+    def spot(self, phrases: list[str], on_rejected=None) -> str:
+        """
+        Blocks until one of `phrases` is heard and returns it ("" when stopped).
+        The recognizer only knows the phrases, anything else decodes to [unk].
+        """
+        phrases = [p.lower() for p in phrases]
+        recognizer = self._recognizer(phrases + ["[unk]"])
+        cursor = self._open_cursor()
+
+        while not self.stop_event.is_set():
+            samples = cursor.read(RECOGNIZER_BLOCK, timeout=0.1)
+            if not len(samples):
+                continue
+
+            text = recognizer.feed(samples, self._echo_margin(cursor.position - len(samples), cursor.position))
+            final = text is not None
+            if not final:
+                text = recognizer.partial() if recognizer.in_speech else ""
+
+            heard = find_phrase(text, phrases)
+            if heard:
+                self._add_stats(recognizer, "")
+                # A command said in the same breath is left for record().
+                self.resume_position = cursor.position - len(samples)
+                return heard
+
+            if final:
+                self._add_stats(recognizer, "")
+                if text.strip() and on_rejected:
+                    on_rejected(text)
+
+        self._add_stats(recognizer, "")
+        self.resume_position = cursor.position
+        return ""
+
+    def watch(self, phrases: list[str], active):
+        """
+        Generator yielding (phrase, block_end) for every phrase heard while
+        active() is true, block_end being the time.monotonic() at which the
+        block that contained it was captured. Reads from the live edge of
+        the ring, independently of record() and spot().
+        """
+        phrases = [p.lower() for p in phrases]
+        rec = vosk.KaldiRecognizer(self.model, self.samplerate, json.dumps(phrases + ["[unk]"]))
+        cursor = self.ring.cursor()
+
+        while active():
+            samples = cursor.read(WATCH_BLOCK, timeout=0.05)
+            if not len(samples):
+                continue
+
+            block_end = time.monotonic() - (self.ring.write_pos - cursor.position) / self.samplerate
+
+            if rec.AcceptWaveform(samples.tobytes()):
+                text = json.loads(rec.Result()).get("text", "")
+            else:
+                text = json.loads(rec.PartialResult()).get("partial", "")
+
+            heard = find_phrase(text, phrases)
+            if heard:
+                rec.Reset()
+                yield heard, block_end
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def _redecode(self, start: int, end: int) -> str:
+        """Open-vocabulary decode of ring audio that is already known to hold speech."""
+        recognizer = GatedRecognizer(self.model, self.samplerate, use_vad=False)
+        cursor = self.ring.cursor(position=start)
+        texts = []
+
+        while cursor.position < end:
+            samples = cursor.read(min(RECOGNIZER_BLOCK, end - cursor.position))
+            if not len(samples):
+                break
+            text = recognizer.feed(samples)
+            if text:
+                texts.append(text)
+        texts.append(recognizer.flush())
+
+        self._add_stats(recognizer, "")
+        return " ".join(t for t in texts if t)
+
+    def _recognizer(self, grammar: list[str] | None = None) -> GatedRecognizer:
+        # The VAD and endpointer are shared, so what they learned carries over.
+        return GatedRecognizer(self.model, self.samplerate, grammar, vad=self.vad, endpointer=self.endpointer)
+
+    def _open_cursor(self):
+        oldest = self.ring.write_pos - MAX_BACKLOG_SECONDS * self.samplerate
+        if self.resume_position is None:
+            return self.ring.cursor(preroll=int(PREROLL_SECONDS * self.samplerate))
+        return self.ring.cursor(position=max(self.resume_position, oldest))
+
+    def _echo_margin(self, start: int, end: int) -> float:
+        return ECHO_GATE_DB if self.ring.played(start, end) else 0.0
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _add_stats(self, recognizer: GatedRecognizer, text: str):
+        with self._lock:
+            for key, value in recognizer.stats.items():
+                self._stats[key] += value
+            recognizer.stats = dict.fromkeys(recognizer.stats, 0)
+            if text:
+                self._stats["utterances"] += 1
+                self._stats["endpoint_latency_ms"] += recognizer.endpoint_ms
@@ -0,0 +1,168 @@
+# audio/ring.py
+import time
+import threading
+import numpy as np
+
+# Audio from before a brand new listener starts, so the first syllable isn't clipped.
+PREROLL_SECONDS = 0.5
+
+# Layout of the ring's backing buffer: int64 header, the int16 samples,
+# then one uint8 per sample stamped with the playback state it was
+# captured under.
+#   header[0]  total samples ever written (monotonic write position)
+#   header[1]  1 while our own speech is playing, as of the last write
+HEADER_SLOTS = 2
+HEADER_BYTES = HEADER_SLOTS * 8
+
+# How often a reader in another process checks for new samples; it can't
+# be woken by the writer's condition variable.
+SHARED_POLL_SECONDS = 0.01
+
+
+def ring_buffer_size(capacity: int) -> int:
+    """Bytes needed to back a ring of `capacity` samples."""
+    return HEADER_BYTES + capacity * 3
+
+
+class AudioRing:
+    """
+    Fixed-size, preallocated ring of int16 samples with a single writer
+    and any number of readers. Positions are absolute sample counts since
+    the ring was created, so readers just remember where they are.
+
+    buffer can be any writable buffer of ring_buffer_size(capacity) bytes,
+    e.g. shared memory, so another process can read the same ring. Readers
+    there pass poll_interval, since only same-process readers get notified.
+    """
+
+    def __init__(self, capacity: int, buffer=None, poll_interval: float | None = None):
+        if buffer is None:
+            buffer = bytearray(ring_buffer_size(capacity))
+
+        self.capacity = capacity
+        self.poll_interval = poll_interval
+        self._header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=buffer, offset=0)
+        self._data = np.ndarray((capacity,), dtype=np.int16, buffer=buffer, offset=HEADER_BYTES)
+        self._played = np.ndarray((capacity,), dtype=np.uint8, buffer=buffer, offset=HEADER_BYTES + capacity * 2)
+        self._cond = threading.Condition()
+
+    @property
+    def write_pos(self) -> int:
+        return int(self._header[0])
+
+    @property
+    def playback(self) -> bool:
+        return bool(self._header[1])
+
+    @playback.setter
+    def playback(self, playing: bool):
+        self._header[1] = int(playing)
+
+    def write(self, samples: np.ndarray, playback: bool | None = None):
+        """
+        playback: whether our own speech was playing while these samples
+        were captured (default: the last known state). Stamped on them,
+        so readers gate on what was playing then, not when they decode.
+        """
+        samples = samples[-self.capacity:]
+        count = len(samples)
+        if not count:
+            return
+
+        if playback is not None:
+            self.playback = playback
+        stamp = int(self.playback)
+
+        pos = self.write_pos
+        start = pos % self.capacity
+        first = min(count, self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        self._played[start:start + first] = stamp
+        if first < count:
+            self._data[:count - first] = samples[first:]
+            self._played[:count - first] = stamp
+
+        # Publish only after the samples are in place.
+        self._header[0] = pos + count
+
+        with self._cond:
+            self._cond.notify_all()
+
+    def read(self, start: int, count: int) -> np.ndarray:
+        """Copies `count` samples from absolute position `start` (must still be in the ring)."""
+        out = np.empty(count, dtype=np.int16)
+        offset = start % self.capacity
+        first = min(count, self.capacity - offset)
+        out[:first] = self._data[offset:offset + first]
+        if first < count:
+            out[first:] = self._data[:count - first]
+        return out
+
+    def played(self, start: int, end: int) -> bool:
+        """Whether our own speech was playing while any sample in [start, end) was captured."""
+        start = max(start, self.write_pos - self.capacity)
+        if end <= start:
+            return False
+        offset = start % self.capacity
+        count = min(end - start, self.capacity)
+        first = min(count, self.capacity - offset)
+        if self._played[offset:offset + first].any():
+            return True
+        return first < count and bool(self._played[:count - first].any())
+
+    def time_of(self, position: int, samplerate: int) -> float:
+        """Approximate time.monotonic() at which the sample at `position` was captured."""
+        return time.monotonic() - (self.write_pos - position) / samplerate
+
+    def wait_for(self, position: int, timeout: float | None) -> bool:
+        """Waits until the write position has passed `position`."""
+        if self.poll_interval is None:
+            with self._cond:
+                return self._cond.wait_for(lambda: self.write_pos > position, timeout)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.write_pos <= position:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def cursor(self, position: int | None = None, preroll: int = 0) -> "RingCursor":
+        if position is None:
+            position = self.write_pos - preroll
+        return RingCursor(self, position)
+
+
+class RingCursor:
+    """An independent read position in an AudioRing."""
+
+    def __init__(self, ring: AudioRing, position: int):
+        self.ring = ring
+        self.position = max(0, position, ring.write_pos - ring.capacity)
+        self.overruns = 0
+
+    def available(self) -> int:
+        return self.ring.write_pos - self.position
+
+    def read(self, max_samples: int, timeout: float | None = None) -> np.ndarray:
+        """
+        Returns up to max_samples new samples, waiting up to `timeout`
+        for a full block. May return fewer (or none) on timeout.
+        """
+        ring = self.ring
+        if ring.write_pos - self.position < max_samples:
+            ring.wait_for(self.position + max_samples - 1, timeout)
+
+        write_pos = ring.write_pos
+        oldest = write_pos - ring.capacity
+        if self.position < oldest:
+            self.overruns += 1
+            self.position = oldest
+
+        count = min(max_samples, write_pos - self.position)
+        if count <= 0:
+            return np.empty(0, dtype=np.int16)
+
+        samples = ring.read(self.position, count)
+        self.position += count
+        return samples
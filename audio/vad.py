@@ -0,0 +1,95 @@
+# audio/vad.py
+from collections import deque
+import numpy as np
+
+VAD_FRAME_MS = 20
+
+# A frame is speech when it is this much louder than the noise floor...
+ENERGY_MARGIN_DB = 10.0
+# ...never quieter than this absolute level...
+MIN_SPEECH_DBFS = -55.0
+# ...and its spectrum is peaky rather than flat like fans or hiss.
+MAX_SPECTRAL_FLATNESS = 0.45
+
+# Frames of a block that must be speech for the whole block to count.
+MIN_SPEECH_FRAMES = 2
+
+# How fast the noise floor follows louder background noise (per frame).
+NOISE_RISE = 0.02
+
+# Trailing silence that ends an utterance. Learned from the user's own
+# pauses between words, kept within these bounds.
+MIN_TRAILING_SILENCE_MS = 300
+DEFAULT_TRAILING_SILENCE_MS = 550
+MAX_TRAILING_SILENCE_MS = 1000
+PAUSE_HISTORY = 50
+
+
+class VoiceActivityDetector:
+    """
+    Energy + spectral flatness voice activity detector.
+    Works on whole blocks at once with NumPy, one row per frame.
+    """
+
+    def __init__(self, samplerate: int = 16000, frame_ms: int = VAD_FRAME_MS):
+        self.frame_len = samplerate * frame_ms // 1000
+        self.noise_db: float | None = None
+        self._window = np.hanning(self.frame_len).astype(np.float32)
+
+    def speech_frames(self, samples: np.ndarray, extra_margin_db: float = 0.0) -> np.ndarray:
+        """
+        Returns one bool per complete frame in samples (int16).
+        extra_margin_db raises the energy threshold, e.g. while our own
+        voice is coming out of the speakers.
+        """
+        count = len(samples) // self.frame_len
+        if not count:
+            return np.zeros(0, dtype=bool)
+
+        frames = samples[:count * self.frame_len].reshape(count, self.frame_len).astype(np.float32) / 32768.0
+
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+
+        power = np.abs(np.fft.rfft(frames * self._window, axis=1)) ** 2 + 1e-12
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+
+        if self.noise_db is None:
+            self.noise_db = float(np.min(energy_db))
+
+        speech = (
+            (energy_db > self.noise_db + ENERGY_MARGIN_DB + extra_margin_db)
+            & (energy_db > MIN_SPEECH_DBFS)
+            & (flatness < MAX_SPECTRAL_FLATNESS)
+        )
+
+        # Noise floor: drops immediately, rises slowly on non-speech frames.
+        for level, is_speech in zip(energy_db, speech):
+            if level < self.noise_db:
+                self.noise_db = float(level)
+            elif not is_speech:
+                self.noise_db += NOISE_RISE * (float(level) - self.noise_db)
+
+        return speech
+
+    def is_speech(self, samples: np.ndarray, extra_margin_db: float = 0.0) -> bool:
+        return int(np.count_nonzero(self.speech_frames(samples, extra_margin_db))) >= MIN_SPEECH_FRAMES
+
+
+class Endpointer:
+    """
+    Decides when trailing silence ends an utterance. The threshold adapts
+    to how long this user usually pauses between words mid-sentence.
+    """
+
+    def __init__(self):
+        self.pauses_ms = deque(maxlen=PAUSE_HISTORY)
+
+    def record_pause(self, ms: float):
+        self.pauses_ms.append(ms)
+
+    @property
+    def trailing_silence_ms(self) -> float:
+        if len(self.pauses_ms) < 5:
+            return DEFAULT_TRAILING_SILENCE_MS
+        typical = float(np.percentile(self.pauses_ms, 90)) * 1.3
+        return min(MAX_TRAILING_SILENCE_MS, max(MIN_TRAILING_SILENCE_MS, typical))
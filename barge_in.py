@@ -0,0 +1,104 @@
+import time
+import threading
+from collections import deque
+
+import speech_to_text
+from speech_to_text import get_session
+from audio.recognizer import find_phrase
+from audio.playback import OUTPUT_BLOCKSIZE, OUTPUT_SAMPLERATE
+from llm_cache import normalize_utterance
+from tts import is_speaking, stop_speaking, recent_speech
+
+# Listen for interrupt commands while Jarvis is talking.
+BARGE_IN = True
+
+# How often the idle listener checks whether speech started.
+SPEAKING_POLL_SECONDS = 0.05
+
+LATENCY_HISTORY = 50
+
+
+class BargeInListener:
+    """
+    Background thread that watches for the interrupt commands (see
+    SpeechSession.watch) on its own cursor into the capture ring, only
+    while the speech engine is playing. On a match in a partial result
+    it stops speech right away and calls on_interrupt(command).
+
+    Latency is measured from the end of the audio block that contained
+    the command to the moment the output goes silent.
+    """
+
+    def __init__(self, commands: list[str], on_interrupt=None):
+        self.commands = [c.lower() for c in commands]
+        self.on_interrupt = on_interrupt
+
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self._lock = threading.Lock()
+        self._latencies_ms = deque(maxlen=LATENCY_HISTORY)
+        self._stats = {"interrupts": 0, "echo_ignored": 0, "watched_seconds": 0.0}
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Never block on a model that is still loading.
+            session = get_session(wait=False)
+            if session is None and speech_to_text.model_ready.is_set():
+                return
+            if session is None or not is_speaking():
+                self._stop.wait(SPEAKING_POLL_SECONDS)
+                continue
+            self._watch(session)
+
+    def _watch(self, session):
+        started = time.perf_counter()
+        spotted = session.watch(self.commands, lambda: is_speaking() and not self._stop.is_set())
+
+        try:
+            for command, block_end in spotted:
+                if self._is_echo(command):
+                    with self._lock:
+                        self._stats["echo_ignored"] += 1
+                    continue
+                self._interrupt(command, block_end)
+                return
+        finally:
+            spotted.close()
+            with self._lock:
+                self._stats["watched_seconds"] += time.perf_counter() - started
+
+    def _is_echo(self, command: str) -> bool:
+        """The command word is part of what Jarvis itself is saying."""
+        return any(find_phrase(normalize_utterance(text), [command]) for text in recent_speech())
+
+    def _interrupt(self, command: str, block_end: float):
+        stop_speaking()
+
+        # The device callback picks up the cancel within one output block.
+        latency_ms = (time.monotonic() - block_end) * 1000 + OUTPUT_BLOCKSIZE / OUTPUT_SAMPLERATE * 1000
+        with self._lock:
+            self._stats["interrupts"] += 1
+            self._latencies_ms.append(latency_ms)
+
+        print(f"✋ Barge-in: {command} ({latency_ms:.0f} ms)")
+        if self.on_interrupt:
+            self.on_interrupt(command)
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = list(self._latencies_ms)
+            return {
+                **self._stats,
+                "avg_latency_ms": sum(latencies) / len(latencies) if latencies else 0.0,
+                "max_latency_ms": max(latencies, default=0.0),
+            }
@@ -0,0 +1,84 @@
+import time
+import threading
+from difflib import SequenceMatcher
+
+from llm_cache import normalize_utterance
+from tts import recent_speech, speech_between
+
+# Drop transcripts that are just Jarvis hearing itself.
+ECHO_SUPPRESSION = True
+
+# Speech that ended longer ago than this can't be echoing any more.
+ECHO_WINDOW_SECONDS = 4
+
+# Share of the transcript's words that must appear, in order, in something
+# Jarvis said for the transcript to count as echo.
+ECHO_SIMILARITY = 0.7
+
+# Short answers repeat words of the question they answer ("telegram" after
+# "which platform, WhatsApp or Telegram?"), so a transcript must have at
+# least this many words, and this share of the spoken sentence's length,
+# to be matched fuzzily. Shorter ones only count as echo when they are the
+# whole sentence ("Hello sir."). Echo picks up most of a sentence.
+ECHO_MIN_WORDS = 2
+ECHO_MIN_LENGTH_RATIO = 0.5
+
+# Room reverb keeps our voice in the microphone this long after playback.
+ECHO_TAIL_SECONDS = 0.5
+
+
+def echo_overlap(heard: str, spoken: str) -> float:
+    """
+    Share of heard's words found in spoken, in the same order. When heard
+    is too short, absolutely or next to spoken, to tell echo from an
+    answer, only an exact repeat of the sentence counts (1, otherwise 0).
+    """
+    heard_words = normalize_utterance(heard).split()
+    spoken_words = normalize_utterance(spoken).split()
+    if not heard_words or not spoken_words:
+        return 0.0
+    if len(heard_words) < ECHO_MIN_WORDS or len(heard_words) < ECHO_MIN_LENGTH_RATIO * len(spoken_words):
+        return 1.0 if heard_words == spoken_words else 0.0
+
+    matcher = SequenceMatcher(None, heard_words, spoken_words, autojunk=False)
+    matched = sum(block.size for block in matcher.get_matching_blocks())
+    return matched / len(heard_words)
+
+
+class EchoFilter:
+    """
+    Compares each transcript with what the speech engine played while it
+    was being heard. Vosk rarely gets our own voice word for word, so the
+    match is fuzzy rather than exact.
+    """
+
+    def __init__(self, window_seconds: float = ECHO_WINDOW_SECONDS, similarity: float = ECHO_SIMILARITY):
+        self.window_seconds = window_seconds
+        self.similarity = similarity
+
+        self._lock = threading.Lock()
+        self._stats = {"checked": 0, "suppressed": 0}
+
+    def is_echo(self, text: str, heard_from: float | None = None, heard_until: float | None = None) -> bool:
+        """
+        heard_from / heard_until: time.monotonic() span the transcript's
+        audio was captured in (speech_to_text.last_heard()); only speech
+        playing during it is compared. Without them, everything said in
+        the last window_seconds is.
+        """
+        if heard_from is not None:
+            until = heard_until if heard_until is not None else time.monotonic()
+            spoken = speech_between(heard_from - ECHO_TAIL_SECONDS, until)
+        else:
+            spoken = recent_speech(self.window_seconds)
+        echo = any(echo_overlap(text, s) >= self.similarity for s in spoken)
+
+        with self._lock:
+            self._stats["checked"] += 1
+            if echo:
+                self._stats["suppressed"] += 1
+        return echo
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,224 @@
+import re
+import time
+import threading
+from collections import deque
+
+# Matches at or above this confidence skip the LLM entirely.
+FAST_PATH_THRESHOLD = 0.8
+
+# Confidence for app names not in APP_ALIASES, and for "start"/"run",
+# which mostly aren't about apps ("start over", "run a quick test").
+# Both stay below the threshold, so the LLM decides.
+UNKNOWN_APP_CONFIDENCE = 0.6
+
+# Confidence for a weather city slot that isn't a plain place name
+# ("the evening", "my city", "london in fahrenheit"); the LLM decides.
+UNCLEAR_CITY_CONFIDENCE = 0.5
+
+_FILLER = r"(?:(?:hey|ok|okay)\s+)?(?:jarvis\s+)?(?:(?:can|could|would|will)\s+you\s+)?(?:please\s+)?"
+_TAIL = r"(?:\s+(?:please|for me|now|sir|jarvis))*"
+
+_OPEN_APP = re.compile(
+    rf"^{_FILLER}(?P<verb>open|launch|start|run)\s+(?:up\s+)?(?:the\s+|my\s+)?(?P<app>.+?)"
+    rf"(?:\s+(?:app|application|program))?{_TAIL}$"
+)
+_WEATHER = re.compile(
+    rf"^{_FILLER}(?:(?:what(?:'s| is)|how(?:'s| is)|tell me|show me|check)\s+)?(?:the\s+)?weather"
+    rf"(?:\s+(?:like|forecast))?(?:\s+(?P<time1>today|tonight|tomorrow|this weekend|this week))?"
+    rf"\s+(?:in|for|at)\s+(?P<city>.+?)"
+    rf"(?:\s+(?P<time2>today|tonight|tomorrow|this weekend|this week|on \w+day))?{_TAIL}$"
+)
+_SEARCH = re.compile(
+    rf"^{_FILLER}(?:search|google|look up)(?:\s+(?:the web|online|google))?(?:\s+(?:for|about))?"
+    rf"\s+(?P<query>.+?){_TAIL}$"
+)
+
+# A second preposition ends the city ("london in fahrenheit").
+_CITY_END = re.compile(r"\s+(?:in|for|at|on|with|using|from)\s+")
+
+# Words that make a city slot something other than a place name: time
+# words, possessives and determiners, units.
+_NOT_CITY_WORDS = {
+    "the", "a", "an", "my", "our", "your", "his", "her", "their", "this", "that", "these",
+    "here", "there", "me", "us", "it", "current", "local",
+    "now", "today", "tonight", "tomorrow", "morning", "afternoon", "evening", "night",
+    "weekend", "week", "day", "hour", "hours", "later", "next",
+    "fahrenheit", "celsius", "centigrade", "kelvin", "degrees", "metric", "imperial", "units",
+}
+
+# Search queries about another intent's subject ("look up the weather")
+# are left to the LLM, which knows to ask for the missing details.
+_OTHER_INTENT_WORDS = {"weather", "forecast", "message", "text", "whatsapp", "telegram"}
+
+# Words that suggest a compound or conditional request the LLM should handle.
+_COMPLEX_WORDS = {"and", "then", "if", "but", "or", "after", "before", "when", "not", "don't", "dont"}
+
+APP_ALIASES = {
+    "what's up": "WhatsApp",
+    "whats up": "WhatsApp",
+    "whatsapp": "WhatsApp",
+    "what's app": "WhatsApp",
+    "chrome": "Chrome",
+    "google chrome": "Chrome",
+    "spotify": "Spotify",
+    "telegram": "Telegram",
+    "discord": "Discord",
+    "vs code": "Visual Studio Code",
+    "vscode": "Visual Studio Code",
+    "notepad": "Notepad",
+    "calculator": "Calculator",
+    "file explorer": "File Explorer",
+    "explorer": "File Explorer",
+}
+
+_stats = {
+    "calls": 0,
+    "hits": 0,
+    "below_threshold": 0,
+    "no_match": 0,
+    "by_intent": {},
+    "total_ms": 0.0,
+}
+_recent = deque(maxlen=200)
+_stats_lock = threading.Lock()
+
+
+def _normalize(text: str) -> str:
+    text = text.lower().strip()
+    text = re.sub(r"[,.!?;:\"]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _confidence(slot: str, base: float, max_words: int) -> float:
+    words = slot.split()
+    if not words:
+        return 0.0
+
+    confidence = base
+    if len(words) > max_words:
+        confidence -= 0.1 * (len(words) - max_words)
+    if _COMPLEX_WORDS.intersection(words):
+        confidence -= 0.4
+    return round(max(0.0, min(1.0, confidence)), 3)
+
+
+def _result(intent: str, parameters: dict, text: str, confidence: float) -> dict:
+    return {
+        "intent": intent,
+        "parameters": parameters,
+        "needs_clarification": False,
+        "text": text,
+        "memory_update": None,
+        "confidence": confidence,
+    }
+
+
+def classify(user_text: str) -> dict | None:
+    """
+    Rule-based intent and slot extraction.
+    Returns an LLM-shaped dict with an extra "confidence" key, or None.
+    """
+    text = _normalize(user_text)
+    if not text:
+        return None
+
+    match = _WEATHER.match(text)
+    if match:
+        city, *rest = _CITY_END.split(match.group("city").strip(), maxsplit=1)
+        when = match.group("time1") or match.group("time2") or "today"
+        confidence = _confidence(city, 0.95, 3)
+        if rest or "'s" in city or _NOT_CITY_WORDS.intersection(city.split()):
+            confidence = min(confidence, UNCLEAR_CITY_CONFIDENCE)
+        return _result(
+            "weather_report",
+            {"city": city.title(), "time": when},
+            f"Checking the weather in {city.title()}, sir.",
+            confidence,
+        )
+
+    match = _SEARCH.match(text)
+    if match:
+        query = match.group("query").strip()
+        confidence = _confidence(query, 0.9, 12)
+        if _OTHER_INTENT_WORDS.intersection(query.split()):
+            confidence = min(confidence, 0.5)
+        return _result(
+            "search",
+            {"query": query},
+            f"Searching for {query}, sir.",
+            confidence,
+        )
+
+    match = _OPEN_APP.match(text)
+    if match:
+        app = match.group("app").strip()
+        app_name = APP_ALIASES.get(app, app.title())
+        if app in APP_ALIASES and match.group("verb") in ("open", "launch"):
+            confidence = _confidence(app, 0.95, 3)
+        else:
+            confidence = min(_confidence(app, 0.9, 3), UNKNOWN_APP_CONFIDENCE)
+        return _result(
+            "open_app",
+            {"app_name": app_name},
+            f"Opening {app_name}, sir.",
+            confidence,
+        )
+
+    return None
+
+
+def match_intent(user_text: str, threshold: float | None = None) -> dict | None:
+    """
+    Returns the fast-path result when it is confident enough to skip
+    the LLM, otherwise None. Every call is counted for get_stats().
+    """
+    if threshold is None:
+        threshold = FAST_PATH_THRESHOLD
+
+    start = time.perf_counter()
+    result = classify(user_text)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    confidence = result["confidence"] if result else 0.0
+    hit = result is not None and confidence >= threshold
+
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["total_ms"] += elapsed_ms
+        if result is None:
+            _stats["no_match"] += 1
+        elif hit:
+            _stats["hits"] += 1
+            by_intent = _stats["by_intent"]
+            by_intent[result["intent"]] = by_intent.get(result["intent"], 0) + 1
+        else:
+            _stats["below_threshold"] += 1
+
+        if result is not None:
+            _recent.append((result["intent"], round(confidence, 3), hit))
+
+    if hit:
+        print(f"⚡ Fast path: {result['intent']} ({confidence:.2f}, {elapsed_ms:.2f} ms)")
+        return result
+
+    return None
+
+
+def get_stats() -> dict:
+    """
+    Hit rate and confidence figures for tuning FAST_PATH_THRESHOLD.
+    "recent" holds (intent, confidence, hit) for the last matched utterances.
+    """
+    with _stats_lock:
+        calls = _stats["calls"]
+        return {
+            "calls": calls,
+            "hits": _stats["hits"],
+            "below_threshold": _stats["below_threshold"],
+            "no_match": _stats["no_match"],
+            "hit_rate": _stats["hits"] / calls if calls else 0.0,
+            "avg_ms": _stats["total_ms"] / calls if calls else 0.0,
+            "by_intent": dict(_stats["by_intent"]),
+            "threshold": FAST_PATH_THRESHOLD,
+            "recent": list(_recent),
+        }
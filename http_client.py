@@ -0,0 +1,104 @@
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+from memory.config_manager import get_serpapi_key
+
+OPENROUTER_BASE = "https://openrouter.ai"
+SERPAPI_BASE = "https://serpapi.com"
+
+# Keep-alive connections kept open per upstream.
+POOL_SIZE = 4
+
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+
+TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+_sessions: dict[str, requests.Session] = {}
+_serpapi_client = None
+_serpapi_client_key: str | None = None
+_lock = threading.Lock()
+
+
+def _mount_pool(session: requests.Session, base_url: str) -> None:
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+    session.mount(base_url, adapter)
+
+
+def get_session(base_url: str) -> requests.Session:
+    """
+    Returns the shared keep-alive session for an upstream.
+    Created once, reused by every request afterwards.
+    """
+    with _lock:
+        session = _sessions.get(base_url)
+        if session is None:
+            session = requests.Session()
+            _mount_pool(session, base_url)
+            _sessions[base_url] = session
+        return session
+
+
+def openrouter_session() -> requests.Session:
+    return get_session(OPENROUTER_BASE)
+
+
+def get_serpapi_client():
+    """
+    Returns a cached serpapi.Client for the configured key, or None.
+    Rebuilt only when the key changes.
+    """
+    global _serpapi_client, _serpapi_client_key
+
+    api_key = get_serpapi_key()
+    if not api_key:
+        return None
+
+    with _lock:
+        if _serpapi_client is None or _serpapi_client_key != api_key:
+            from serpapi import Client
+
+            client = Client(api_key=api_key, timeout=TIMEOUT)
+            session = getattr(client, "session", None)
+            if isinstance(session, requests.Session):
+                _mount_pool(session, SERPAPI_BASE)
+
+            _serpapi_client = client
+            _serpapi_client_key = api_key
+
+        return _serpapi_client
+
+
+def _warm(name: str, session: requests.Session, url: str) -> None:
+    start = time.perf_counter()
+    try:
+        session.head(url, timeout=(CONNECT_TIMEOUT, 5))
+        print(f"🌐 {name} connection ready ({(time.perf_counter() - start) * 1000:.0f} ms)")
+    except Exception as e:
+        print(f"⚠️ {name} warm-up failed: {e}")
+
+
+def warm_up() -> None:
+    """
+    Resolves DNS and completes the TLS handshake for every upstream
+    so the first voice turn reuses an open connection.
+    """
+    _warm("OpenRouter", openrouter_session(), OPENROUTER_BASE)
+
+    try:
+        client = get_serpapi_client()
+    except Exception as e:
+        print(f"⚠️ SerpAPI client couldn't be created: {e}")
+        client = None
+
+    session = getattr(client, "session", None)
+    if isinstance(session, requests.Session):
+        _warm("SerpAPI", session, SERPAPI_BASE)
+
+
+def warm_up_async() -> threading.Thread:
+    thread = threading.Thread(target=warm_up, daemon=True)
+    thread.start()
+    return thread
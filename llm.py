@@ -1,184 +1,446 @@
-import os
-import json
-import requests
-import sys
-from pathlib import Path
-
-OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
-MODEL = "arcee-ai/trinity-large-preview:free"
-
-def get_base_dir():
-    if getattr(sys, "frozen", False):
-        return Path(sys.executable).parent
-    return Path(__file__).resolve().parent
-
-BASE_DIR = get_base_dir()
-
-PROMPT_PATH = BASE_DIR / "core" / "prompt.txt"
-API_CONFIG_PATH = BASE_DIR / "config" / "api_keys.json"
-
-def load_api_keys() -> dict:
-    if not os.path.exists(API_CONFIG_PATH):
-        return {}
-
-    try:
-        with open(API_CONFIG_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"❌ Failed to read api_keys.json: {e}")
-        return {}
-
-
-def get_openrouter_key() -> str | None:
-    keys = load_api_keys()
-    return keys.get("openrouter_api_key")
-
-def load_system_prompt() -> str:
-    try:
-        with open(PROMPT_PATH, "r", encoding="utf-8") as f:
-            return f.read()
-    except Exception as e:
-        print(f"⚠️ prompt.txt couldn't be loaded: {e}")
-        return "You are Jarvis, a helpful AI assistant."
-
-
-SYSTEM_PROMPT = load_system_prompt()
-
-def safe_json_parse(text: str) -> dict | None:
-    if not text:
-        return None
-
-    text = text.strip()
-
-    if "```json" in text:
-        try:
-            start = text.index("```json") + 7
-            end = text.index("```", start)
-            text = text[start:end].strip()
-        except:
-            pass
-    elif "```" in text:
-        try:
-            start = text.index("```") + 3
-            end = text.index("```", start)
-            text = text[start:end].strip()
-        except:
-            pass
-
-    try:
-        start = text.index("{")
-        end = text.rindex("}") + 1
-        json_str = text[start:end]
-        return json.loads(json_str)
-    except Exception as e:
-        print(f"⚠️ JSON parse error: {e}")
-        print(f"⚠️ Raw text preview: {text[:200]}")
-        return None
-
-def get_llm_output(user_text: str, memory_block: dict | None = None) -> dict:
-
-    if not user_text or not user_text.strip():
-        return {
-            "intent": "chat",
-            "parameters": {},
-            "needs_clarification": False,
-            "text": "Sir, I didn't catch that.",
-            "memory_update": None
-        }
-
-    api_key = get_openrouter_key()
-    if not api_key:
-        print("❌ OPENROUTER API KEY NOT FOUND")
-        return {
-            "intent": "chat",
-            "parameters": {},
-            "needs_clarification": False,
-            "text": "OpenRouter API key is missing, Sir.",
-            "memory_update": None
-        }
-
-    memory_str = ""
-    if memory_block:
-        memory_str = "\n".join(f"{k}: {v}" for k, v in memory_block.items())
-
-    user_prompt = f"""User message: "{user_text}"
-
-Known user memory:
-{memory_str if memory_str else "No memory available"}"""
-
-    payload = {
-        "model": MODEL,
-        "messages": [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt}
-        ],
-        "temperature": 0.2,
-        "max_tokens": 500
-    }
-
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "http://localhost",
-        "X-Title": "Jarvis-Assistant"
-    }
-
-    try:
-        response = requests.post(
-            OPENROUTER_URL,
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-
-        if response.status_code != 200:
-            print(f"❌ OpenRouter API Error: {response.text}")
-            return {
-                "intent": "chat",
-                "parameters": {},
-                "needs_clarification": False,
-                "text": f"Sir, API error ({response.status_code}).",
-                "memory_update": None
-            }
-
-        data = response.json()
-        content = data["choices"][0]["message"]["content"]
-
-        parsed = safe_json_parse(content)
-
-        if parsed:
-            return {
-                "intent": parsed.get("intent", "chat"),
-                "parameters": parsed.get("parameters", {}),
-                "needs_clarification": parsed.get("needs_clarification", False),
-                "text": parsed.get("text"),
-                "memory_update": parsed.get("memory_update")
-            }
-
-        return {
-            "intent": "chat",
-            "parameters": {},
-            "needs_clarification": False,
-            "text": content,
-            "memory_update": None
-        }
-
-    except requests.exceptions.Timeout:
-        print("❌ OpenRouter timeout")
-        return {
-            "intent": "chat",
-            "parameters": {},
-            "needs_clarification": False,
-            "text": "Sir, the request timed out.",
-            "memory_update": None
-        }
-
-    except Exception as e:
-        print(f"❌ LLM ERROR: {e}")
-        return {
-            "intent": "chat",
-            "parameters": {},
-            "needs_clarification": False,
-            "text": "Sir, a system error occurred.",
-            "memory_update": None
-        }
\ No newline at end of file
+import re
+import json
+import atexit
+import hashlib
+import requests
+
+from http_client import TIMEOUT, openrouter_session
+from llm_cache import ResponseCache, is_follow_up
+from prompt_builder import prompt_builder
+from memory.config_manager import get_openrouter_key
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+MODEL = "arcee-ai/trinity-large-preview:free"
+
+# Stream the completion and speak the "text" field sentence by sentence
+# while the rest of the JSON is still being generated.
+STREAM_RESPONSES = True
+
+# Serve repeated requests from the on-disk response cache.
+USE_RESPONSE_CACHE = True
+
+# Intents whose text is spoken by the action itself, not by the main loop.
+ACTION_INTENTS = ("send_message", "open_app", "weather_report", "search")
+
+SYSTEM_PROMPT = prompt_builder.system_prompt
+
+# Changes whenever the prompt or the model does, invalidating cached replies.
+PROMPT_VERSION = hashlib.sha1(f"{MODEL}\n{SYSTEM_PROMPT}".encode("utf-8")).hexdigest()[:12]
+
+response_cache = ResponseCache()
+atexit.register(response_cache.flush)
+
+def safe_json_parse(text: str) -> dict | None:
+    if not text:
+        return None
+
+    text = text.strip()
+
+    if "```json" in text:
+        try:
+            start = text.index("```json") + 7
+            end = text.index("```", start)
+            text = text[start:end].strip()
+        except:
+            pass
+    elif "```" in text:
+        try:
+            start = text.index("```") + 3
+            end = text.index("```", start)
+            text = text[start:end].strip()
+        except:
+            pass
+
+    try:
+        start = text.index("{")
+        end = text.rindex("}") + 1
+        json_str = text[start:end]
+        return json.loads(json_str)
+    except Exception as e:
+        print(f"⚠️ JSON parse error: {e}")
+        print(f"⚠️ Raw text preview: {text[:200]}")
+        return None
+
+_SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s")
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class EnvelopeStream:
+    """
+    Incremental reader for the JSON envelope while it is being streamed.
+
+    Detects the intent as soon as it appears and decodes the "text" string
+    value on the fly, handing every finished sentence to on_sentence.
+    Sentences are only spoken for intents the main loop speaks itself.
+
+    Only top-level keys count: the raw stream is scanned for object depth
+    and strings, so a "text" key inside parameters or memory_update is
+    never mistaken for the reply.
+    """
+
+    def __init__(self, on_sentence=None):
+        self.on_sentence = on_sentence
+        self.raw = ""
+        self.intent: str | None = None
+        self.intent_known = False
+        self.spoken: list[str] = []
+
+        self._text_pos: int | None = None
+        self._text_done = False
+        self._text = ""
+        self._emitted = 0
+
+        # Scanner state over self.raw.
+        self._scan_pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._want_key = False
+        self._key: str | None = None
+        self._value_of: str | None = None
+        self._intent_start: int | None = None
+
+    def feed(self, delta: str):
+        self.raw += delta
+        self._scan()
+
+        if self._text_pos is not None and not self._text_done:
+            self._decode_text()
+
+        self._emit(final=self._text_done)
+
+    def _scan(self):
+        """Advances over the new part of raw, picking up top-level "intent" and "text"."""
+        raw = self.raw
+        i = self._scan_pos
+
+        while i < len(raw):
+            ch = raw[i]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._want_key:
+                        self._key = raw[self._string_start + 1:i]
+                        self._want_key = False
+                    elif self._intent_start is not None:
+                        self.intent = raw[self._intent_start:i] or "chat"
+                        self.intent_known = True
+                        self._intent_start = None
+                i += 1
+                continue
+
+            if ch.isspace():
+                i += 1
+                continue
+
+            if self._value_of is not None:
+                # First character of a top-level value.
+                if self._value_of == "text" and not self._text_done and self._text_pos is None:
+                    if ch == '"':
+                        self._text_pos = i + 1
+                    else:
+                        self._text_done = True
+                elif self._value_of == "intent" and not self.intent_known:
+                    if ch == '"':
+                        self._intent_start = i + 1
+                    else:
+                        self.intent = "chat"
+                        self.intent_known = True
+                self._value_of = None
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 1 and ch == "{":
+                    self._want_key = True
+            elif ch in "}]":
+                self._depth -= 1
+            elif self._depth == 1:
+                if ch == ":" and self._key is not None:
+                    self._value_of = self._key
+                    self._key = None
+                elif ch == ",":
+                    self._want_key = True
+            i += 1
+
+        self._scan_pos = i
+
+    @property
+    def text(self) -> str:
+        """The top-level "text" value decoded so far."""
+        return self._text
+
+    def finish(self):
+        self._text_done = True
+        self._emit(final=True)
+
+    def _decode_text(self):
+        raw = self.raw
+        i = self._text_pos
+        out = []
+
+        while i < len(raw):
+            ch = raw[i]
+            if ch == '"':
+                self._text_done = True
+                i += 1
+                break
+            if ch == "\\":
+                if i + 1 >= len(raw):
+                    break
+                esc = raw[i + 1]
+                if esc == "u":
+                    if i + 6 > len(raw):
+                        break
+                    try:
+                        code = int(raw[i + 2:i + 6], 16)
+                    except ValueError:
+                        i += 6
+                        continue
+                    if 0xD800 <= code < 0xDC00:
+                        # High surrogate: combined with the low one that follows.
+                        tail = raw[i + 6:i + 12]
+                        if len(tail) < 6 and "\\u".startswith(tail[:2]):
+                            break
+                        low = None
+                        if tail[:2] == "\\u":
+                            try:
+                                low = int(tail[2:], 16)
+                            except ValueError:
+                                pass
+                        if low is not None and 0xDC00 <= low < 0xE000:
+                            out.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                            i += 12
+                        else:
+                            out.append("\ufffd")
+                            i += 6
+                        continue
+                    out.append("\ufffd" if 0xDC00 <= code < 0xE000 else chr(code))
+                    i += 6
+                    continue
+                out.append(_ESCAPES.get(esc, esc))
+                i += 2
+                continue
+            out.append(ch)
+            i += 1
+
+        self._text += "".join(out)
+        self._text_pos = i
+
+    def _emit(self, final: bool = False):
+        if not self.on_sentence or not self.intent_known:
+            return
+        if self.intent in ACTION_INTENTS:
+            return
+
+        pending = self._text[self._emitted:]
+        if not pending:
+            return
+
+        cut = 0
+        for match in _SENTENCE_END.finditer(pending):
+            cut = match.end()
+        if final:
+            cut = len(pending)
+        if not cut:
+            return
+
+        sentence = pending[:cut].strip()
+        self._emitted += cut
+        if sentence:
+            self.spoken.append(sentence)
+            self.on_sentence(sentence)
+
+
+def _reply(text: str) -> dict:
+    return {
+        "intent": "chat",
+        "parameters": {},
+        "needs_clarification": False,
+        "text": text,
+        "memory_update": None
+    }
+
+
+def _build_output(content: str) -> tuple[dict, bool]:
+    """The output dict, and whether it came from a parsed envelope (False: raw content as text)."""
+    parsed = safe_json_parse(content)
+
+    if parsed:
+        return {
+            "intent": parsed.get("intent", "chat"),
+            "parameters": parsed.get("parameters", {}),
+            "needs_clarification": parsed.get("needs_clarification", False),
+            "text": parsed.get("text"),
+            "memory_update": parsed.get("memory_update")
+        }, True
+
+    return _reply(content), False
+
+
+def _stream_completion(payload: dict, headers: dict, on_sentence, cancel_event=None) -> tuple[dict, bool]:
+    """
+    Consumes the OpenRouter SSE stream. Returns the same dict as the
+    blocking call, plus "spoken" with the sentences already handed to TTS,
+    and whether the stream completed cleanly into a parsed envelope (only
+    then may it be cached).
+
+    Setting cancel_event closes the connection at the next chunk.
+    """
+    completed = False
+    envelope = EnvelopeStream(on_sentence)
+
+    with openrouter_session().post(
+        OPENROUTER_URL,
+        headers=headers,
+        json={**payload, "stream": True},
+        timeout=TIMEOUT,
+        stream=True
+    ) as response:
+
+        if response.status_code != 200:
+            print(f"❌ OpenRouter API Error: {response.text}")
+            return _reply(f"Sir, API error ({response.status_code})."), False
+
+        for line in response.iter_lines():
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            if not line:
+                continue
+            line = line.decode("utf-8", errors="replace")
+            if not line.startswith("data:"):
+                continue
+
+            data = line[5:].strip()
+            if data == "[DONE]":
+                completed = True
+                break
+
+            try:
+                chunk = json.loads(data)
+            except json.JSONDecodeError:
+                continue
+
+            if "error" in chunk:
+                print(f"❌ OpenRouter stream error: {chunk['error']}")
+                break
+
+            usage = chunk.get("usage") or {}
+            if usage.get("prompt_tokens"):
+                prompt_builder.record_usage(usage["prompt_tokens"])
+
+            choices = chunk.get("choices") or [{}]
+            delta = (choices[0].get("delta") or {}).get("content")
+            if delta:
+                envelope.feed(delta)
+
+    envelope.finish()
+
+    if not envelope.raw:
+        return _reply("Sir, a system error occurred."), False
+
+    if completed:
+        output, ok = _build_output(envelope.raw)
+    else:
+        # Cut short (cancelled or broken): raw is half an envelope, never
+        # a reply. Keep the top-level text decoded so far.
+        output, ok = _reply(envelope.text.strip() or "Sir, my reply was cut off."), False
+    output["spoken"] = envelope.spoken
+    return output, ok
+
+
+def get_llm_output(
+    user_text: str,
+    memory_block: dict | None = None,
+    on_sentence=None,
+    cancel_event=None
+) -> dict:
+    """
+    on_sentence: optional callback. When given (and STREAM_RESPONSES is on)
+    the reply is streamed and every finished sentence of a spoken reply is
+    passed to it before the full completion has arrived.
+
+    cancel_event: optional threading.Event. The reply is streamed so the
+    request can be abandoned mid-flight once the event is set.
+    """
+
+    if not user_text or not user_text.strip():
+        return _reply("Sir, I didn't catch that.")
+
+    # Follow-ups and answers to a clarification depend on the conversation.
+    cache_key = None
+    if (
+        USE_RESPONSE_CACHE
+        and not (memory_block or {}).get("_pending_intent")
+        and not is_follow_up(user_text)
+    ):
+        cache_key = response_cache.make_key(user_text, memory_block, PROMPT_VERSION)
+        cached = response_cache.get(cache_key)
+        if cached:
+            print("💾 LLM cache hit")
+            return cached
+
+    api_key = get_openrouter_key()
+    if not api_key:
+        print("❌ OPENROUTER API KEY NOT FOUND")
+        return _reply("OpenRouter API key is missing, Sir.")
+
+    payload = {
+        "model": MODEL,
+        "messages": prompt_builder.messages(user_text, memory_block),
+        "temperature": 0.2,
+        "max_tokens": 500
+    }
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "http://localhost",
+        "X-Title": "Jarvis-Assistant"
+    }
+
+    try:
+        if STREAM_RESPONSES and (on_sentence or cancel_event is not None):
+            output, ok = _stream_completion(payload, headers, on_sentence, cancel_event)
+            if ok and cache_key:
+                response_cache.put(cache_key, output)
+            return output
+
+        response = openrouter_session().post(
+            OPENROUTER_URL,
+            headers=headers,
+            json=payload,
+            timeout=TIMEOUT
+        )
+
+        if response.status_code != 200:
+            print(f"❌ OpenRouter API Error: {response.text}")
+            return _reply(f"Sir, API error ({response.status_code}).")
+
+        data = response.json()
+        content = data["choices"][0]["message"]["content"]
+
+        usage = data.get("usage") or {}
+        if usage.get("prompt_tokens"):
+            prompt_builder.record_usage(usage["prompt_tokens"])
+
+        output, parsed = _build_output(content)
+        if parsed and cache_key:
+            response_cache.put(cache_key, output)
+        return output
+
+    except requests.exceptions.Timeout:
+        print("❌ OpenRouter timeout")
+        return _reply("Sir, the request timed out.")
+
+    except Exception as e:
+        print(f"❌ LLM ERROR: {e}")
+        return _reply("Sir, a system error occurred.")
@@ -0,0 +1,231 @@
+import os
+import re
+import sys
+import copy
+import json
+import time
+import hashlib
+import threading
+from threading import Timer
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_MAX_ENTRIES = 256
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# New entries are written to disk this long after the first unsaved one,
+# batched and off the reply path (and at exit).
+CACHE_SAVE_DELAY_SECONDS = 5.0
+
+# Answers for these change with the outside world, never serve them from cache.
+UNCACHEABLE_INTENTS = ("search", "weather_report")
+
+
+def get_base_dir():
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).parent
+    return Path(__file__).resolve().parent
+
+BASE_DIR = get_base_dir()
+CACHE_PATH = BASE_DIR / "cache" / "llm_cache.json"
+
+
+def normalize_utterance(text: str) -> str:
+    text = text.lower().strip()
+    text = re.sub(r"[^\w\s']", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+# Utterances that only make sense after what was just said.
+_ANSWER_WORDS = {
+    "yes", "yeah", "yep", "no", "nope", "ok", "okay", "sure", "why", "how",
+    "really", "please", "thanks", "again", "continue", "go on",
+}
+_ANAPHORA_WORDS = {
+    "it", "its", "it's", "that", "this", "those", "these", "them", "they",
+    "he", "she", "him", "her", "his", "hers", "there", "then", "more", "else",
+    "also", "too", "same", "instead", "previous", "last", "one",
+}
+
+
+def is_follow_up(user_text: str) -> bool:
+    """
+    "yes", "why?", "tell me more", "open it": the reply depends on the
+    conversation, so it is never cached or served from cache.
+    """
+    text = normalize_utterance(user_text)
+    if text in _ANSWER_WORDS:
+        return True
+    return bool(_ANAPHORA_WORDS.intersection(text.split()))
+
+
+def memory_fingerprint(memory_block: dict | None) -> str:
+    """
+    Covers only the facts retrieved for the utterance. The conversation
+    changes every turn and would make every key unique; utterances that
+    depend on it are left out of the cache instead (is_follow_up).
+    """
+    facts = (memory_block or {}).get("facts", "")
+    return hashlib.sha1(str(facts).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of parsed LLM outputs, persisted as JSON write-behind
+    (call flush() before exiting).
+
+    Keys combine the normalized utterance, a fingerprint of the relevant
+    facts and the prompt version, so a changed prompt or changed memory
+    never serves an old answer.
+    """
+
+    def __init__(
+        self,
+        path: Path = CACHE_PATH,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl: float = CACHE_TTL_SECONDS,
+        save_delay: float = CACHE_SAVE_DELAY_SECONDS
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.save_delay = save_delay
+
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._timer: Timer | None = None
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        self._load()
+
+    @staticmethod
+    def make_key(user_text: str, memory_block: dict | None, prompt_version: str) -> str:
+        raw = "\x1f".join((
+            normalize_utterance(user_text),
+            memory_fingerprint(memory_block),
+            prompt_version,
+        ))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if time.time() - entry["created"] > self.ttl:
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            output = copy.deepcopy(entry["output"])
+
+        # The memory update was applied when the reply was first made.
+        output["memory_update"] = None
+        return output
+
+    def put(self, key: str, output: dict) -> bool:
+        """Stores output unless its intent is time-sensitive. Returns True if stored."""
+        if not isinstance(output, dict):
+            return False
+        if output.get("intent") in UNCACHEABLE_INTENTS:
+            return False
+        if output.get("needs_clarification"):
+            return False
+
+        output = {k: v for k, v in output.items() if k not in ("spoken", "memory_update")}
+
+        with self._lock:
+            self._entries[key] = {"created": time.time(), "output": output}
+            self._entries.move_to_end(key)
+            self.stores += 1
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+            self._dirty = True
+            if self._timer is None:
+                self._timer = Timer(self.save_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        return True
+
+    def flush(self):
+        """Writes unsaved entries now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            snapshot = dict(self._entries)
+        self._save(snapshot)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
+
+    def _load(self):
+        if not self.path.exists():
+            return
+
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"⚠️ LLM cache couldn't be loaded: {e}")
+            return
+
+        now = time.time()
+        entries = sorted(
+            (
+                (k, v) for k, v in data.items()
+                if isinstance(v, dict) and now - v.get("created", 0) <= self.ttl
+            ),
+            key=lambda item: item[1].get("last_used", item[1]["created"])
+        )
+        for key, entry in entries[-self.max_entries:]:
+            self._entries[key] = {"created": entry["created"], "output": entry["output"]}
+
+    def _save(self, entries: dict):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        k: {**v, "last_used": i}
+                        for i, (k, v) in enumerate(entries.items())
+                    },
+                    f,
+                    ensure_ascii=False
+                )
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"⚠️ LLM cache couldn't be saved: {e}")
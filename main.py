@@ -1,186 +1,371 @@
-import asyncio
-import threading
-
-from speech_to_text import record_voice
-from llm import get_llm_output
-from tts import edge_speak, stop_speaking
-from ui import JarvisUI
-import sys
-from pathlib import Path
-
-from actions.open_app import open_app
-from actions.web_search import web_search
-from actions.weather_report import weather_action
-from actions.send_message import send_message  
-
-from memory.memory_manager import load_memory, update_memory
-from memory.temporary_memory import TemporaryMemory
-
-interrupt_commands = ["mute", "quit", "exit", "stop"]
-
-temp_memory = TemporaryMemory()
-
-def get_base_dir():
-    if getattr(sys, "frozen", False):
-        return Path(sys.executable).parent
-    return Path(__file__).resolve().parent
-
-BASE_DIR = get_base_dir()
-
-async def get_voice_input():
-    return await asyncio.to_thread(record_voice)
-
-async def ai_loop(ui: JarvisUI):
-    while True:
-        
-        user_text = await get_voice_input()
-
-        if not user_text:
-            continue
-
-        if any(cmd in user_text.lower() for cmd in interrupt_commands):
-            stop_speaking()
-            temp_memory.reset()
-            continue
-
-        ui.write_log(f"You: {user_text}")
-
-        if temp_memory.get_current_question():
-            param = temp_memory.get_current_question()
-            temp_memory.update_parameters({param: user_text})
-            temp_memory.clear_current_question()
-            user_text = temp_memory.get_last_user_text()
-
-        temp_memory.set_last_user_text(user_text)
-
-        long_term_memory = load_memory()
-
-        def minimal_memory_for_prompt(memory: dict) -> dict:
-            result = {}
-
-            identity = memory.get("identity", {})
-            preferences = memory.get("preferences", {})
-            relationships = memory.get("relationships", {})
-            emotional_state = memory.get("emotional_state", {})
-
-            if "name" in identity:
-                result["user_name"] = identity["name"].get("value")
-
-            for k in ["favorite_color", "favorite_food", "favorite_music"]:
-                if k in preferences:
-                    val = preferences[k].get("value")
-                    if isinstance(val, dict) and "value" in val:
-                        val = val["value"]
-                    result[k] = val
-
-            for rel, info in relationships.items():
-                if isinstance(info, dict) and "name" in info and "value" in info["name"]:
-                    result[f"{rel}_name"] = info["name"]["value"]
-
-            for event, info in emotional_state.items():
-                if "value" in info:
-                    result[f"emotion_{event}"] = info["value"]
-
-            return {k: v for k, v in result.items() if v}
-
-        memory_for_prompt = minimal_memory_for_prompt(long_term_memory)
-
-        history_lines = temp_memory.get_history_for_prompt()
-        recent_history = "\n".join(history_lines.split("\n")[-5:])
-        if recent_history:
-            memory_for_prompt["recent_conversation"] = recent_history
-
-        if temp_memory.has_pending_intent():
-            memory_for_prompt["_pending_intent"] = temp_memory.pending_intent
-            memory_for_prompt["_collected_params"] = str(temp_memory.get_parameters())
-
-        try:
-            llm_output = get_llm_output(
-                user_text=user_text,
-                memory_block=memory_for_prompt
-            )
-        except Exception as e:
-            ui.write_log(f"AI ERROR: {e}")
-            continue
-
-        intent = llm_output.get("intent", "chat")
-        parameters = llm_output.get("parameters", {})
-        response = llm_output.get("text")
-        memory_update = llm_output.get("memory_update")
-
-        if memory_update and isinstance(memory_update, dict):
-            update_memory(memory_update)
-
-        temp_memory.set_last_ai_response(response)
-
-        if intent == "send_message":
-            temp_memory.set_pending_intent("send_message")
-            temp_memory.update_parameters(parameters)
-
-            if all(temp_memory.get_parameter(p) for p in ["receiver", "message_text", "platform"]):
-                threading.Thread(
-                    target=send_message,
-                    kwargs={
-                        "parameters": temp_memory.get_parameters(),
-                        "player": ui,
-                        "session_memory": temp_memory
-                    },
-                    daemon=True
-                ).start()
-
-        elif intent == "open_app":
-            if parameters.get("app_name"):
-                threading.Thread(
-                    target=open_app,
-                    kwargs={
-                        "parameters": parameters,
-                        "response": response,
-                        "player": ui,
-                        "session_memory": temp_memory
-                    },
-                    daemon=True
-                ).start()
-
-        elif intent == "weather_report":
-            if parameters.get("city"):
-                threading.Thread(
-                    target=weather_action,
-                    kwargs={
-                        "parameters": parameters,
-                        "player": ui,
-                        "session_memory": temp_memory
-                    },
-                    daemon=True
-                ).start()
-
-        elif intent == "search":
-            if parameters.get("query"):
-                threading.Thread(
-                    target=web_search,
-                    kwargs={
-                        "parameters": parameters,
-                        "player": ui,
-                        "session_memory": temp_memory
-                    },
-                    daemon=True
-                ).start()
-
-        else:
-            if response:
-                ui.write_log(f"AI: {response}")
-                edge_speak(response, ui)
-
-        await asyncio.sleep(0.01)
-
-def main():
-    ui = JarvisUI(BASE_DIR / "face.png", size=(900, 900))
-
-    def runner():
-        asyncio.run(ai_loop(ui))
-
-    threading.Thread(target=runner, daemon=True).start()
-    ui.root.mainloop()
-
-
-if __name__ == "__main__":
-    main()
+import time
+import asyncio
+import threading
+import multiprocessing
+
+_process_start = time.perf_counter()
+
+import http_client
+from speech_to_text import record_voice, load_model_async, last_heard, model_registry, get_stats as speech_stats
+from stt_models import AUTO_BENCHMARK
+from llm import get_llm_output, response_cache
+from prompt_builder import prompt_builder
+from fast_intent import match_intent, get_stats as fast_intent_stats
+from speculation import Speculator, SPECULATIVE_DISPATCH
+from wake_word import WakeWordGate, WAKE_WORD_MODE
+from barge_in import BargeInListener, BARGE_IN
+from echo_filter import EchoFilter, ECHO_SUPPRESSION
+from tts import edge_speak, speak_queued, stop_speaking, prewarm_phrase_cache_async, backends, phrase_cache
+from ui import JarvisUI
+import sys
+from pathlib import Path
+
+from actions.open_app import open_app
+from actions.web_search import web_search
+from actions.weather_report import weather_action
+from actions.send_message import send_message, ask_for_missing, expected_answers
+
+from memory.memory_manager import load_memory, update_memory
+from memory.temporary_memory import TemporaryMemory
+
+interrupt_commands = ["mute", "quit", "exit", "stop"]
+
+# The counters of the fast paths are printed this often, and once more on
+# shutdown. 0: only on shutdown.
+STATS_INTERVAL_SECONDS = 600
+
+# Created by main(). Spawned processes (the recognizer, the STT benchmark)
+# import this script again as __mp_main__, and must not build a second
+# assistant there.
+temp_memory: TemporaryMemory | None = None
+speculator: Speculator | None = None
+wake_gate: WakeWordGate | None = None
+barge_in: BargeInListener | None = None
+echo_filter: EchoFilter | None = None
+
+# Set when the user interrupts; the current turn stops streaming and acting.
+turn_cancelled = threading.Event()
+
+startup_times: dict[str, float] = {}
+
+def mark_startup(stage: str):
+    startup_times[stage] = time.perf_counter() - _process_start
+    print(f"⏱ {stage}: {startup_times[stage]:.2f} s after start")
+
+def get_base_dir():
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).parent
+    return Path(__file__).resolve().parent
+
+BASE_DIR = get_base_dir()
+
+def build_memory_for_prompt(user_text: str, preview: bool = False) -> dict:
+    """
+    preview: builds the block as if user_text had already been added to
+    the history (used for speculative requests).
+    """
+    history = temp_memory.get_history_lines()
+    if preview:
+        history = history + [f"User: {user_text}"]
+
+    return prompt_builder.memory_block(
+        user_text,
+        history,
+        temp_memory.pending_intent,
+        temp_memory.get_parameters(),
+        temp_memory.get_summary()
+    )
+
+def speculative_request(text: str, cancel_event: threading.Event) -> dict:
+    return get_llm_output(
+        user_text=text,
+        memory_block=build_memory_for_prompt(text, preview=True),
+        cancel_event=cancel_event
+    )
+
+def on_barge_in(command: str):
+    turn_cancelled.set()
+
+def _format_stats(stats: dict) -> str:
+    parts = []
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            parts.append(f"{key}({_format_stats(value)})")
+        elif isinstance(value, float):
+            parts.append(f"{key}={value:.2f}")
+        elif not isinstance(value, (list, tuple)):
+            parts.append(f"{key}={value}")
+    return " ".join(parts)
+
+def report_stats():
+    """Prints one 📊 line per component that collected something."""
+    sections = [
+        ("speculation", speculator.stats),
+        ("fast intent", fast_intent_stats),
+        ("llm cache", response_cache.stats),
+        ("prompt", prompt_builder.stats),
+        ("speech", speech_stats),
+        ("tts", backends.stats),
+        ("phrase cache", phrase_cache.stats),
+    ]
+    if WAKE_WORD_MODE:
+        sections.append(("wake word", wake_gate.stats))
+    if BARGE_IN:
+        sections.append(("barge-in", barge_in.stats))
+    if ECHO_SUPPRESSION:
+        sections.append(("echo filter", echo_filter.stats))
+
+    for name, stats in sections:
+        try:
+            values = stats()
+        except Exception as e:
+            print(f"⚠️ {name} stats unavailable: {e}")
+            continue
+        if values:
+            print(f"📊 {name}: {_format_stats(values)}")
+
+def report_stats_periodically(stop: threading.Event):
+    while not stop.wait(STATS_INTERVAL_SECONDS):
+        report_stats()
+
+async def get_voice_input(on_partial=None, timeout=None, expected_phrases=None):
+    return await asyncio.to_thread(
+        record_voice,
+        on_partial=on_partial,
+        timeout=timeout,
+        expected_phrases=expected_phrases
+    )
+
+async def ai_loop(ui: JarvisUI):
+    while True:
+
+        # Answers to a question Jarvis asked don't need the wake phrase.
+        need_wake = (
+            WAKE_WORD_MODE
+            and not temp_memory.get_current_question()
+            and not temp_memory.has_pending_intent()
+        )
+        if need_wake and not wake_gate.is_awake():
+            if not await asyncio.to_thread(wake_gate.wait):
+                continue
+            ui.set_status("LISTENING")
+
+        speculate = (
+            SPECULATIVE_DISPATCH
+            and not temp_memory.get_current_question()
+            and not temp_memory.has_pending_intent()
+        )
+        if speculate:
+            speculator.begin()
+
+        # Short answers to a clarification question are decoded against
+        # the likely ones first (platforms, known contacts).
+        expected_phrases = None
+        if temp_memory.get_current_question():
+            expected_phrases = expected_answers(temp_memory.get_current_question(), load_memory())
+
+        user_text = await get_voice_input(
+            speculator.on_partial if speculate else None,
+            timeout=wake_gate.window_seconds if need_wake else None,
+            expected_phrases=expected_phrases
+        )
+
+        # Jarvis's own voice picked up by the microphone, compared with what
+        # played while the audio was captured (it may have waited in the
+        # ring since before we listened). Answers to its question repeat
+        # the question's words, so they're never checked.
+        if (
+            ECHO_SUPPRESSION and user_text
+            and not temp_memory.get_current_question()
+            and user_text.lower().strip() not in interrupt_commands
+            and echo_filter.is_echo(user_text, *(last_heard() or (None, None)))
+        ):
+            print(f"🔁 Ignored echo: {user_text}")
+            user_text = ""
+
+        speculative_result = speculator.resolve(user_text) if speculate else None
+
+        if need_wake:
+            wake_gate.on_turn(user_text)
+            if not wake_gate.is_awake():
+                ui.set_status("ONLINE")
+            user_text = wake_gate.strip(user_text)
+
+        if not user_text:
+            continue
+
+        if any(cmd in user_text.lower() for cmd in interrupt_commands):
+            stop_speaking()
+            temp_memory.reset()
+            continue
+
+        ui.write_log(f"You: {user_text}")
+
+        if temp_memory.get_current_question():
+            param = temp_memory.get_current_question()
+            temp_memory.update_parameters({param: user_text})
+            temp_memory.clear_current_question()
+            user_text = temp_memory.get_last_user_text()
+
+        temp_memory.set_last_user_text(user_text)
+
+        memory_for_prompt = build_memory_for_prompt(user_text)
+
+        turn_cancelled.clear()
+
+        def speak_sentence(sentence: str):
+            if not turn_cancelled.is_set():
+                speak_queued(sentence, ui)
+
+        llm_output = None
+        if not temp_memory.has_pending_intent():
+            llm_output = match_intent(user_text)
+
+        try:
+            if llm_output is None and speculative_result is not None:
+                llm_output = await asyncio.wrap_future(speculative_result)
+
+            if llm_output is None:
+                llm_output = await asyncio.to_thread(
+                    get_llm_output,
+                    user_text=user_text,
+                    memory_block=memory_for_prompt,
+                    on_sentence=speak_sentence,
+                    cancel_event=turn_cancelled
+                )
+        except Exception as e:
+            ui.write_log(f"AI ERROR: {e}")
+            continue
+
+        if turn_cancelled.is_set():
+            ui.write_log("AI: (interrupted)")
+            continue
+
+        intent = llm_output.get("intent", "chat")
+        parameters = llm_output.get("parameters", {})
+        response = llm_output.get("text")
+        memory_update = llm_output.get("memory_update")
+        already_spoken = bool(llm_output.get("spoken"))
+
+        if memory_update and isinstance(memory_update, dict):
+            update_memory(memory_update)
+
+        temp_memory.set_last_ai_response(response)
+        prompt_builder.add_turn(user_text, response)
+
+        if intent == "send_message":
+            temp_memory.set_pending_intent("send_message")
+            temp_memory.update_parameters(parameters)
+
+            # Asked here rather than on the action's thread, so the next
+            # listen already knows the question (no wake phrase, expected
+            # answers, no echo check).
+            if not ask_for_missing(temp_memory, ui):
+                threading.Thread(
+                    target=send_message,
+                    kwargs={
+                        "parameters": temp_memory.get_parameters(),
+                        "player": ui,
+                        "session_memory": temp_memory
+                    },
+                    daemon=True
+                ).start()
+
+        elif intent == "open_app":
+            if parameters.get("app_name"):
+                threading.Thread(
+                    target=open_app,
+                    kwargs={
+                        "parameters": parameters,
+                        "response": response,
+                        "player": ui,
+                        "session_memory": temp_memory
+                    },
+                    daemon=True
+                ).start()
+
+        elif intent == "weather_report":
+            if parameters.get("city"):
+                threading.Thread(
+                    target=weather_action,
+                    kwargs={
+                        "parameters": parameters,
+                        "player": ui,
+                        "session_memory": temp_memory
+                    },
+                    daemon=True
+                ).start()
+
+        elif intent == "search":
+            if parameters.get("query"):
+                threading.Thread(
+                    target=web_search,
+                    kwargs={
+                        "parameters": parameters,
+                        "player": ui,
+                        "session_memory": temp_memory
+                    },
+                    daemon=True
+                ).start()
+
+        else:
+            if response:
+                ui.write_log(f"AI: {response}")
+                if not already_spoken:
+                    edge_speak(response, ui)
+
+        await asyncio.sleep(0.01)
+
+def main():
+    global temp_memory, speculator, wake_gate, barge_in, echo_filter
+
+    mark_startup("imports")
+
+    temp_memory = TemporaryMemory()
+    speculator = Speculator(speculative_request)
+    wake_gate = WakeWordGate()
+    barge_in = BargeInListener(interrupt_commands, on_interrupt=on_barge_in)
+    echo_filter = EchoFilter()
+
+    ui = None
+    ui_created = threading.Event()
+
+    def on_model_ready(model):
+        mark_startup("speech model ready" if model else "speech model failed")
+        if AUTO_BENCHMARK:
+            model_registry.benchmark_async()
+        ui_created.wait()
+        ui.set_status("ONLINE" if model else "SPEECH MODEL MISSING")
+
+    # The window doesn't wait for the model; network and TTS warm up meanwhile.
+    load_model_async(on_ready=on_model_ready)
+    http_client.warm_up_async()
+    prewarm_phrase_cache_async()
+
+    ui = JarvisUI(BASE_DIR / "face.png", size=(900, 900))
+    ui.set_status("LOADING SPEECH MODEL...")
+    ui_created.set()
+    mark_startup("window")
+
+    def runner():
+        asyncio.run(ai_loop(ui))
+
+    threading.Thread(target=runner, daemon=True).start()
+    if BARGE_IN:
+        barge_in.start()
+
+    stop_reporting = threading.Event()
+    if STATS_INTERVAL_SECONDS:
+        threading.Thread(target=report_stats_periodically, args=(stop_reporting,), daemon=True).start()
+
+    try:
+        ui.root.mainloop()
+    finally:
+        stop_reporting.set()
+        report_stats()
+
+
+if __name__ == "__main__":
+    # The recognizer runs in a spawned process, which frozen builds need this for.
+    multiprocessing.freeze_support()
+    main()
@@ -1,83 +1,283 @@
-# memory/memory_manager.py
-import json
-import os
-from threading import Lock
-from datetime import datetime
-
-MEMORY_PATH = "memory/memory.json"
-_lock = Lock()
-
-
-def _empty_memory() -> dict:
-    """Return an empty memory structure."""
-    return {
-        "identity": {},
-        "preferences": {},
-        "relationships": {},
-        "emotional_state": {}
-    }
-
-
-def load_memory() -> dict:
-    """Load memory from disk, return empty if not exists or invalid."""
-    if not os.path.exists(MEMORY_PATH):
-        return _empty_memory()
-
-    with _lock:
-        try:
-            with open(MEMORY_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    return data
-                return _empty_memory()
-        except Exception:
-            return _empty_memory()
-
-
-def save_memory(memory: dict) -> None:
-    """Save memory to disk safely."""
-    if not isinstance(memory, dict):
-        return
-
-    os.makedirs(os.path.dirname(MEMORY_PATH), exist_ok=True)
-
-    with _lock:
-        with open(MEMORY_PATH, "w", encoding="utf-8") as f:
-            json.dump(memory, f, indent=2, ensure_ascii=False)
-
-
-def _recursive_update(target: dict, updates: dict) -> bool:
-    """Recursively merge updates into target memory. Returns True if changed."""
-    changed = False
-    now = datetime.utcnow().isoformat() + "Z"
-
-    for key, value in updates.items():
-        if value is None or (isinstance(value, str) and not value.strip()):
-            continue
-
-        if isinstance(value, dict) and "value" not in value:
-            if key not in target or not isinstance(target[key], dict):
-                target[key] = {}
-                changed = True
-            if _recursive_update(target[key], value):
-                changed = True
-        else:
-
-            entry = value if isinstance(value, dict) and "value" in value else {"value": value}
-            if key not in target or target[key] != entry:
-                target[key] = entry
-                changed = True
-
-    return changed
-
-
-def update_memory(memory_update: dict) -> dict:
-    """Merge LLM memory update into global memory and save."""
-    if not isinstance(memory_update, dict):
-        return load_memory()
-
-    memory = load_memory()
-    if _recursive_update(memory, memory_update):
-        save_memory(memory)
-
-    return memory
+# memory/memory_manager.py
+import copy
+import json
+import os
+import sys
+import atexit
+import sqlite3
+from pathlib import Path
+from threading import Lock, Timer
+from datetime import datetime
+
+from memory.sqlite_store import SqliteMemoryStore
+
+
+def get_base_dir():
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).parent
+    return Path(__file__).resolve().parent.parent
+
+
+BASE_DIR = get_base_dir()
+MEMORY_PATH = BASE_DIR / "memory" / "memory.json"
+MEMORY_DB_PATH = BASE_DIR / "memory" / "memory.db"
+
+# "json" (default): the whole memory in MEMORY_PATH, editable by hand.
+# "sqlite": one row per fact with its history in MEMORY_DB_PATH, which
+# find_facts() and fact_history() need. On the first start with "sqlite"
+# memory.json is copied into the database (and logged); the file itself
+# is left alone, but from then on only the database is updated.
+MEMORY_BACKEND = "json"
+
+# Updates are written this long after the first unsaved change, so a burst
+# of updates costs one write.
+FLUSH_DELAY_SECONDS = 2.0
+
+
+def _empty_memory() -> dict:
+    """Return an empty memory structure."""
+    return {
+        "identity": {},
+        "preferences": {},
+        "relationships": {},
+        "emotional_state": {}
+    }
+
+
+def _read_file(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+            if isinstance(data, dict):
+                return data
+    except Exception:
+        pass
+    return _empty_memory()
+
+
+def _write_file_atomic(path: str, memory: dict) -> None:
+    """Writes a temp file next to the target and renames it over, so the file is never half-written."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(memory, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class MemoryStore:
+    """
+    Keeps the parsed memory document resident. The file is only re-read
+    when its mtime changes (edited by hand or by another process), and
+    updates are flushed write-behind, batched and atomically.
+
+    Updates not flushed yet are re-applied on top of an externally changed
+    file, so neither side's changes are lost.
+    """
+
+    def __init__(self, path: str, flush_delay: float = FLUSH_DELAY_SECONDS):
+        self.path = path
+        self.flush_delay = flush_delay
+
+        self._lock = Lock()
+        self._memory: dict | None = None
+        self._mtime: int | None = None
+        self._unsaved: list[dict] = []
+        self._timer: Timer | None = None
+
+        self.stats = {"reads": 0, "writes": 0, "updates": 0}
+
+    def _file_mtime(self) -> int | None:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _current(self) -> dict:
+        """The resident document, reloaded if the file changed. Caller holds the lock."""
+        mtime = self._file_mtime()
+        if self._memory is None or mtime != self._mtime:
+            memory = _read_file(self.path) if mtime is not None else _empty_memory()
+            for update in self._unsaved:
+                _recursive_update(memory, update)
+            self._memory = memory
+            self._mtime = mtime
+            self.stats["reads"] += 1
+        return self._memory
+
+    def load(self) -> dict:
+        """The memory document. Shared, treat it as read-only."""
+        with self._lock:
+            return self._current()
+
+    def snapshot(self) -> dict:
+        """A private copy of the document, safe to walk while others update it."""
+        with self._lock:
+            return copy.deepcopy(self._current())
+
+    def update(self, memory_update: dict) -> dict:
+        with self._lock:
+            memory = self._current()
+            if _recursive_update(memory, memory_update):
+                self._unsaved.append(memory_update)
+                self.stats["updates"] += 1
+                self._schedule_flush()
+            return memory
+
+    def replace(self, memory: dict) -> None:
+        """Replaces the whole document and writes it right away."""
+        with self._lock:
+            self._memory = memory
+            self._unsaved = []
+            self._write()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._unsaved:
+                self._write()
+
+    def _schedule_flush(self):
+        if self._timer is None:
+            self._timer = Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _write(self):
+        try:
+            _write_file_atomic(self.path, self._memory)
+        except OSError as e:
+            print(f"⚠️ Memory couldn't be saved: {e}")
+            return
+        self._unsaved = []
+        self._mtime = self._file_mtime()
+        self.stats["writes"] += 1
+
+
+def _open_store():
+    if MEMORY_BACKEND == "sqlite":
+        try:
+            store = SqliteMemoryStore(MEMORY_DB_PATH)
+        except sqlite3.Error as e:
+            print(f"⚠️ Memory database unavailable, using {MEMORY_PATH}: {e}")
+            return MemoryStore(MEMORY_PATH)
+        if store.needs_migration() and os.path.exists(MEMORY_PATH):
+            try:
+                count = store.migrate(_read_file(MEMORY_PATH), str(MEMORY_PATH))
+            except sqlite3.Error as e:
+                print(f"⚠️ Memory couldn't be moved to {MEMORY_DB_PATH}, using {MEMORY_PATH}: {e}")
+                return MemoryStore(MEMORY_PATH)
+            print(f"📦 Moved {count} facts from {MEMORY_PATH} to {MEMORY_DB_PATH} (the file is kept but no longer updated)")
+        return store
+    return MemoryStore(MEMORY_PATH)
+
+
+_store = None
+_store_lock = Lock()
+
+
+def _get_store():
+    """The memory store, opened on first use (not at import)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = _open_store()
+            atexit.register(_store.flush)
+        return _store
+
+_listeners = []
+
+
+def add_update_listener(callback) -> None:
+    """
+    callback(memory_update) runs after every update_memory() with the
+    update that was merged, or with None after save_memory() replaced
+    the whole memory.
+    """
+    _listeners.append(callback)
+
+
+def _notify(memory_update: dict | None) -> None:
+    for callback in _listeners:
+        try:
+            callback(memory_update)
+        except Exception as e:
+            print(f"⚠️ Memory listener failed: {e}")
+
+
+def load_memory() -> dict:
+    """Return the long-term memory (resident; reloaded only when the store changed)."""
+    return _get_store().load()
+
+
+def snapshot_memory() -> dict:
+    """A copy of the long-term memory that later updates don't touch."""
+    return _get_store().snapshot()
+
+
+def save_memory(memory: dict) -> None:
+    """Replace the whole memory and save it to disk safely."""
+    if not isinstance(memory, dict):
+        return
+    _get_store().replace(memory)
+    _notify(None)
+
+
+def flush_memory() -> None:
+    """Write pending updates now instead of after FLUSH_DELAY_SECONDS."""
+    if _store is not None:
+        _store.flush()
+
+
+def find_facts(category: str | None = None, key: str | None = None) -> list[dict]:
+    """Current facts by category and/or key. Needs the sqlite backend."""
+    store = _get_store()
+    if not isinstance(store, SqliteMemoryStore):
+        return []
+    return store.find(category, key)
+
+
+def fact_history(path: list[str]) -> list[dict]:
+    """Every recorded version of one fact, oldest first. Needs the sqlite backend."""
+    store = _get_store()
+    if not isinstance(store, SqliteMemoryStore):
+        return []
+    return store.history(path)
+
+
+def _recursive_update(target: dict, updates: dict) -> bool:
+    """Recursively merge updates into target memory. Returns True if changed."""
+    changed = False
+    now = datetime.utcnow().isoformat() + "Z"
+
+    for key, value in updates.items():
+        if value is None or (isinstance(value, str) and not value.strip()):
+            continue
+
+        if isinstance(value, dict) and "value" not in value:
+            if key not in target or not isinstance(target[key], dict):
+                target[key] = {}
+                changed = True
+            if _recursive_update(target[key], value):
+                changed = True
+        else:
+
+            entry = value if isinstance(value, dict) and "value" in value else {"value": value}
+            if key not in target or target[key] != entry:
+                target[key] = entry
+                changed = True
+
+    return changed
+
+
+def update_memory(memory_update: dict) -> dict:
+    """Merge LLM memory update into global memory; only changed facts are written."""
+    if not isinstance(memory_update, dict):
+        return load_memory()
+
+    memory = _get_store().update(memory_update)
+    _notify(memory_update)
+    return memory
@@ -0,0 +1,303 @@
+# memory/retrieval.py
+import re
+import math
+import threading
+from collections import Counter, deque
+
+import numpy as np
+
+from memory.memory_manager import load_memory, snapshot_memory, add_update_listener
+from memory.sqlite_store import flatten_update
+
+# How many entries, and roughly how many tokens, of long-term memory and
+# earlier conversation go into one prompt.
+RETRIEVAL_TOP_K = 8
+MEMORY_TOKEN_BUDGET = 200
+
+# Facts sent with every prompt, relevant or not.
+PINNED_FACTS = (("identity", "name"),)
+
+# Past exchanges kept searchable; older ones are forgotten.
+MAX_INDEXED_TURNS = 500
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_STOPWORDS = frozenset("""
+a an the and or but if of to in on at for with from by as is are was were be been am
+i me my you your he him his she her it its we our they them their this that these those
+do does did have has had will would can could should what who whom which when where why how
+""".split())
+
+_WORD = re.compile(r"[a-z0-9']+")
+_SENTENCE = re.compile(r"[^.!?…]+[.!?…]*")
+
+
+def tokenize(text: str) -> list[str]:
+    words = _WORD.findall(str(text).lower().replace("_", " "))
+    return [w.strip("'") for w in words if w.strip("'") and w not in _STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English text (about four characters per token)."""
+    return max(1, math.ceil(len(text) / 4)) if text else 0
+
+
+def uncovered(exchange: str, covered: str) -> str:
+    """
+    The "Speaker: text" lines of exchange without the sentences that
+    `covered` (the extractive conversation summary, "Speaker: sentence"
+    entries) already holds.
+    """
+    if not covered:
+        return exchange
+    lines = []
+    for line in exchange.split("\n"):
+        speaker, sep, said = line.partition(": ")
+        if not sep:
+            speaker, said = "", line
+        kept = [s.strip() for s in _SENTENCE.findall(said) if s.strip() and f": {s.strip()}" not in covered]
+        if kept:
+            lines.append(speaker + sep + " ".join(kept))
+    return "\n".join(lines)
+
+
+class Bm25Index:
+    """
+    Okapi BM25 over short documents, updated one document at a time.
+
+    Documents live in reusable slots; postings map a term to {slot: tf}
+    and are turned into NumPy arrays (cached until the term changes), so
+    scoring is a few vector operations per query term.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._slots: dict = {}
+        self._keys: dict[int, object] = {}
+        self._terms: dict[int, Counter] = {}
+        self._free: list[int] = []
+        self._lengths = np.zeros(64, dtype=np.float32)
+        self._postings: dict[str, dict[int, int]] = {}
+        self._arrays: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key) -> bool:
+        return key in self._slots
+
+    def add(self, key, text: str):
+        self.remove(key)
+        terms = Counter(tokenize(text))
+        if not terms:
+            return
+
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._slots)
+            if slot >= len(self._lengths):
+                self._lengths = np.concatenate([self._lengths, np.zeros_like(self._lengths)])
+
+        self._slots[key] = slot
+        self._keys[slot] = key
+        self._terms[slot] = terms
+        self._lengths[slot] = sum(terms.values())
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[slot] = tf
+            self._arrays.pop(term, None)
+
+    def remove(self, key):
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        del self._keys[slot]
+        for term in self._terms.pop(slot):
+            postings = self._postings[term]
+            del postings[slot]
+            if not postings:
+                del self._postings[term]
+            self._arrays.pop(term, None)
+        self._lengths[slot] = 0
+        self._free.append(slot)
+
+    def keys(self) -> list:
+        return list(self._slots)
+
+    def _term_arrays(self, term: str) -> tuple[np.ndarray, np.ndarray]:
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self._postings[term]
+            arrays = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float32, count=len(postings)),
+            )
+            self._arrays[term] = arrays
+        return arrays
+
+    def search(self, query: str, limit: int) -> list[tuple[object, float]]:
+        """Best matching (key, score) pairs, best first; only documents sharing a term."""
+        terms = [t for t in set(tokenize(query)) if t in self._postings]
+        if not terms or not self._slots:
+            return []
+
+        count = len(self._slots)
+        avg_length = float(self._lengths.sum()) / count
+        scores = np.zeros(len(self._lengths), dtype=np.float32)
+
+        for term in terms:
+            slots, tf = self._term_arrays(term)
+            idf = math.log(1 + (count - len(slots) + 0.5) / (len(slots) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[slots] / avg_length)
+            scores[slots] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        hits = np.flatnonzero(scores)
+        if len(hits) > limit:
+            hits = hits[np.argpartition(scores[hits], -limit)[-limit:]]
+        hits = hits[np.argsort(scores[hits])[::-1]]
+        return [(self._keys[int(slot)], float(scores[slot])) for slot in hits]
+
+
+def _fact_value(entry) -> str:
+    value = entry.get("value") if isinstance(entry, dict) else entry
+    if isinstance(value, dict) and "value" in value:
+        value = value["value"]
+    return "" if value is None else str(value)
+
+
+class MemoryRetriever:
+    """
+    Picks the long-term facts and earlier exchanges most relevant to what
+    the user just said, so the prompt stays the same size however much
+    is remembered.
+
+    Facts are indexed from the memory document and kept current by
+    memory_manager's update listeners; a reloaded document (edited
+    outside the app) is re-indexed on the next query.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = Bm25Index()
+        self._facts: dict[tuple, str] = {}
+        self._source: dict | None = None
+        self._turns: deque[tuple[int, str]] = deque()
+        self._turn_ids = 0
+
+        self.stats = {"queries": 0, "rebuilds": 0, "fact_updates": 0}
+
+        add_update_listener(self._on_memory_update)
+
+    # ---------- indexing ----------
+
+    def _rebuild(self, memory: dict):
+        """
+        Re-indexes every fact. `memory` is only remembered to notice the
+        next reload; the facts come from a snapshot, since the shared
+        document may be updated by another thread while it's walked.
+        """
+        for path in list(self._facts):
+            self._index.remove(("fact", path))
+        self._facts = {}
+        self._add_facts(flatten_update(snapshot_memory()))
+        self._source = memory
+        self.stats["rebuilds"] += 1
+
+    def _add_facts(self, facts: list[tuple[tuple, dict]]):
+        for path, entry in facts:
+            # A fact replaces whatever was stored under or above its path.
+            stale = [p for p in self._facts if p[:len(path)] == path or path[:len(p)] == p]
+            for p in stale:
+                del self._facts[p]
+                self._index.remove(("fact", p))
+
+            value = _fact_value(entry)
+            if not value:
+                continue
+            line = f"{'.'.join(path)}: {value}"
+            self._facts[path] = line
+            self._index.add(("fact", path), f"{' '.join(path)} {value}")
+
+    def _on_memory_update(self, memory_update: dict | None):
+        with self._lock:
+            if memory_update is None or self._source is None:
+                self._source = None
+                return
+            self._add_facts(flatten_update(memory_update))
+            self.stats["fact_updates"] += 1
+
+    def _ensure_facts(self):
+        memory = load_memory()
+        if memory is not self._source:
+            self._rebuild(memory)
+
+    def add_turn(self, user_text: str, ai_text: str | None):
+        """Makes a finished exchange searchable for later turns."""
+        if not user_text:
+            return
+        text = f"User: {user_text}" + (f"\nAI: {ai_text}" if ai_text else "")
+        with self._lock:
+            self._turn_ids += 1
+            self._turns.append((self._turn_ids, text))
+            self._index.add(("turn", self._turn_ids), text)
+            while len(self._turns) > MAX_INDEXED_TURNS:
+                old_id, _ = self._turns.popleft()
+                self._index.remove(("turn", old_id))
+
+    # ---------- querying ----------
+
+    def retrieve(
+        self,
+        query: str,
+        top_k: int = RETRIEVAL_TOP_K,
+        token_budget: int = MEMORY_TOKEN_BUDGET,
+        skip_recent_turns: int = 0,
+        covered: str = ""
+    ) -> tuple[list[str], list[str]]:
+        """
+        (fact lines, earlier exchanges) relevant to `query`, at most top_k
+        entries within token_budget. The newest skip_recent_turns exchanges
+        are left out, they are in the prompt verbatim already. So are the
+        sentences of exchanges that `covered` (the conversation summary)
+        already contains.
+        """
+        with self._lock:
+            self._ensure_facts()
+            self.stats["queries"] += 1
+
+            recent = {turn_id for turn_id, _ in list(self._turns)[-skip_recent_turns:]} if skip_recent_turns else set()
+            turns = dict(self._turns)
+
+            facts: list[str] = []
+            exchanges: list[str] = []
+            used = 0
+
+            for path in PINNED_FACTS:
+                line = self._facts.get(path)
+                if line:
+                    facts.append(line)
+                    used += estimate_tokens(line)
+
+            for (kind, key), _ in self._index.search(query, top_k + len(recent) + len(facts)):
+                if len(facts) + len(exchanges) >= top_k:
+                    break
+                if kind == "fact":
+                    text = self._facts[key]
+                    if text in facts:
+                        continue
+                else:
+                    if key in recent:
+                        continue
+                    text = uncovered(turns[key], covered)
+                    if not text:
+                        continue
+
+                cost = estimate_tokens(text)
+                if used + cost > token_budget:
+                    continue
+                used += cost
+                (facts if kind == "fact" else exchanges).append(text)
+
+            return facts, exchanges
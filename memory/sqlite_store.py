@@ -0,0 +1,279 @@
+# memory/sqlite_store.py
+import os
+import copy
+import json
+import sqlite3
+from threading import Lock
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS facts (
+    id            INTEGER PRIMARY KEY,
+    path          TEXT NOT NULL,
+    category      TEXT NOT NULL,
+    key           TEXT NOT NULL,
+    value         TEXT NOT NULL,
+    recorded_at   TEXT NOT NULL,
+    superseded_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS facts_current_path ON facts(path) WHERE superseded_at IS NULL;
+CREATE INDEX IF NOT EXISTS facts_category_key ON facts(category, key) WHERE superseded_at IS NULL;
+CREATE INDEX IF NOT EXISTS facts_history ON facts(path, recorded_at);
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+CATEGORIES = ("identity", "preferences", "relationships", "emotional_state")
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def _path_text(path: tuple) -> str:
+    return json.dumps(list(path), ensure_ascii=False)
+
+
+def _is_leaf(node) -> bool:
+    return not isinstance(node, dict) or "value" in node
+
+
+def flatten_update(updates: dict, prefix: tuple = ()) -> list[tuple[tuple, dict]]:
+    """(path, entry) for every fact in an update, by the rules of memory_manager._recursive_update."""
+    facts = []
+    for key, value in updates.items():
+        if value is None or (isinstance(value, str) and not value.strip()):
+            continue
+        path = prefix + (str(key),)
+        if isinstance(value, dict) and "value" not in value:
+            facts.extend(flatten_update(value, path))
+        else:
+            facts.append((path, value if isinstance(value, dict) else {"value": value}))
+    return facts
+
+
+def _leaf_paths(node: dict, prefix: tuple) -> list[tuple]:
+    paths = []
+    for key, child in node.items():
+        if _is_leaf(child):
+            paths.append(prefix + (key,))
+        else:
+            paths.extend(_leaf_paths(child, prefix + (key,)))
+    return paths
+
+
+class SqliteMemoryStore:
+    """
+    Long-term memory in SQLite (WAL), one row per fact path. A changed fact
+    supersedes its previous row instead of overwriting it, so every fact
+    keeps its history. An update only touches the rows it changes.
+
+    The nested document load() returns is kept resident and rebuilt only
+    after a write, here or by another connection (PRAGMA data_version).
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+        self._memory: dict | None = None
+        self._data_version: int | None = None
+
+        self.stats = {"reads": 0, "writes": 0, "updates": 0, "rows_written": 0}
+
+    # ---------- reading ----------
+
+    def _current(self) -> dict:
+        """The resident document, rebuilt if the database changed. Caller holds the lock."""
+        data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if self._memory is None or data_version != self._data_version:
+            memory = {category: {} for category in CATEGORIES}
+            rows = self._db.execute(
+                "SELECT path, value FROM facts WHERE superseded_at IS NULL ORDER BY path"
+            )
+            for path_text, value in rows:
+                self._set(memory, tuple(json.loads(path_text)), json.loads(value))
+            self._memory = memory
+            self._data_version = data_version
+            self.stats["reads"] += 1
+        return self._memory
+
+    @staticmethod
+    def _set(memory: dict, path: tuple, entry: dict):
+        node = memory
+        for key in path[:-1]:
+            if not isinstance(node.get(key), dict) or _is_leaf(node[key]):
+                node[key] = {}
+            node = node[key]
+        node[path[-1]] = entry
+
+    def load(self) -> dict:
+        """The memory document. Shared, treat it as read-only."""
+        with self._lock:
+            return self._current()
+
+    def snapshot(self) -> dict:
+        """A private copy of the document, safe to walk while others update it."""
+        with self._lock:
+            return copy.deepcopy(self._current())
+
+    def find(self, category: str | None = None, key: str | None = None) -> list[dict]:
+        """Current facts by category and/or key (last path element), via the indexes."""
+        query = "SELECT path, value, recorded_at FROM facts WHERE superseded_at IS NULL"
+        args = []
+        if category is not None:
+            query += " AND category = ?"
+            args.append(category)
+        if key is not None:
+            query += " AND key = ?"
+            args.append(key)
+        with self._lock:
+            rows = self._db.execute(query, args).fetchall()
+        return [
+            {"path": json.loads(p), "entry": json.loads(v), "recorded_at": t}
+            for p, v, t in rows
+        ]
+
+    def history(self, path: list[str]) -> list[dict]:
+        """Every version of one fact, oldest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT value, recorded_at, superseded_at FROM facts WHERE path = ? ORDER BY id",
+                (_path_text(tuple(path)),)
+            ).fetchall()
+        return [
+            {"entry": json.loads(v), "recorded_at": t, "superseded_at": s}
+            for v, t, s in rows
+        ]
+
+    # ---------- writing ----------
+
+    def update(self, memory_update: dict) -> dict:
+        with self._lock:
+            memory = self._current()
+            changes = [
+                (path, entry) for path, entry in flatten_update(memory_update)
+                if self._lookup(memory, path) != entry
+            ]
+            if changes:
+                self._apply(memory, changes, [])
+                self.stats["updates"] += 1
+            return memory
+
+    def replace(self, memory: dict) -> None:
+        """Replaces the whole document; facts missing from it are superseded."""
+        with self._lock:
+            current = self._current()
+            wanted = dict(flatten_update(memory))
+            changes = [
+                (path, entry) for path, entry in wanted.items()
+                if self._lookup(current, path) != entry
+            ]
+            removed = [path for path in _leaf_paths(current, ()) if path not in wanted]
+            if changes or removed:
+                self._apply(current, changes, removed)
+
+    def flush(self) -> None:
+        """Writes are committed as they happen; nothing to do."""
+
+    @staticmethod
+    def _lookup(memory: dict, path: tuple):
+        node = memory
+        for key in path:
+            if not isinstance(node, dict) or _is_leaf(node) or key not in node:
+                return None
+            node = node[key]
+        return node
+
+    def _apply(self, memory: dict, changes: list[tuple[tuple, dict]], removed: list[tuple]):
+        """Supersedes and inserts rows in one transaction, then mirrors it in `memory`."""
+        now = _now()
+        superseded = set(removed)
+        for path, _ in changes:
+            superseded.add(path)
+            # A fact replacing a branch drops the branch, like the JSON
+            # merge does. A branch growing under a fact supersedes the fact
+            # here; the JSON merge keeps it and merges the children into its
+            # entry, a leaf-with-children that has no row to live in.
+            for i in range(1, len(path)):
+                if _is_leaf(self._lookup(memory, path[:i]) or {}):
+                    superseded.add(path[:i])
+            node = self._lookup(memory, path)
+            if isinstance(node, dict) and not _is_leaf(node):
+                superseded.update(_leaf_paths(node, path))
+
+        rows = [
+            (_path_text(path), path[0], path[-1], json.dumps(entry, ensure_ascii=False), now)
+            for path, entry in changes
+        ]
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            closed = self._db.executemany(
+                "UPDATE facts SET superseded_at = ? WHERE path = ? AND superseded_at IS NULL",
+                [(now, _path_text(path)) for path in superseded]
+            ).rowcount
+            self._db.executemany(
+                "INSERT INTO facts (path, category, key, value, recorded_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._db.execute("COMMIT")
+        except sqlite3.Error as e:
+            if self._db.in_transaction:
+                self._db.execute("ROLLBACK")
+            print(f"⚠️ Memory couldn't be saved: {e}")
+            return
+
+        for path in removed:
+            parent = self._lookup(memory, path[:-1]) if len(path) > 1 else memory
+            if isinstance(parent, dict):
+                parent.pop(path[-1], None)
+        for path, entry in changes:
+            self._set(memory, path, entry)
+
+        # data_version only moves for other connections' commits, so the
+        # resident document stays valid after our own.
+        self.stats["writes"] += 1
+        self.stats["rows_written"] += len(rows) + max(closed, 0)
+
+    # ---------- migration ----------
+
+    def needs_migration(self) -> bool:
+        with self._lock:
+            done = self._db.execute("SELECT 1 FROM meta WHERE name = 'migrated_from'").fetchone()
+            has_facts = self._db.execute("SELECT 1 FROM facts LIMIT 1").fetchone()
+        return not done and not has_facts
+
+    def migrate(self, memory: dict, source: str) -> int:
+        """Imports a memory.json document into the (empty) database. Returns the number of facts."""
+        facts = flatten_update(memory)
+        now = _now()
+        with self._lock:
+            try:
+                self._db.execute("BEGIN IMMEDIATE")
+                self._db.executemany(
+                    "INSERT INTO facts (path, category, key, value, recorded_at) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (_path_text(path), path[0], path[-1], json.dumps(entry, ensure_ascii=False), now)
+                        for path, entry in facts
+                    ]
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO meta (name, value) VALUES ('migrated_from', ?)",
+                    (source,)
+                )
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                # Left open, the transaction would hold the write lock for
+                # whoever uses this connection next.
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+                raise
+            self._memory = None
+        return len(facts)
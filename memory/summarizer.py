@@ -0,0 +1,59 @@
+# memory/summarizer.py
+import re
+import math
+from collections import Counter
+
+from memory.retrieval import tokenize, estimate_tokens
+
+SUMMARY_TOKEN_BUDGET = 80
+
+# Later sentences win ties; each turn back costs this much of the score.
+RECENCY_DECAY = 0.97
+
+# What the user said matters more than Jarvis's replies to it.
+USER_WEIGHT = 1.5
+
+_SENTENCE = re.compile(r"[^.!?…]+[.!?…]*")
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s.strip() for s in _SENTENCE.findall(text or "") if len(s.strip()) > 2]
+
+
+def summarize_turns(turns: list[dict], max_tokens: int = SUMMARY_TOKEN_BUDGET) -> str:
+    """
+    Extractive summary of conversation turns ({"role", "text"}, oldest
+    first): the sentences whose words recur most across the conversation,
+    favouring the user's and recent ones, in their original order.
+    """
+    sentences = []
+    for index, turn in enumerate(turns):
+        for sentence in split_sentences(turn["text"]):
+            words = tokenize(sentence)
+            if words:
+                sentences.append((index, turn["role"], sentence, words))
+    if not sentences:
+        return ""
+
+    frequency = Counter(w for _, _, _, words in sentences for w in set(words))
+    last = len(turns) - 1
+
+    def score(item) -> float:
+        index, role, _, words = item
+        weight = sum(math.log(1 + frequency[w]) for w in set(words)) / math.sqrt(len(words))
+        weight *= RECENCY_DECAY ** (last - index)
+        return weight * (USER_WEIGHT if role == "user" else 1.0)
+
+    chosen = []
+    used = 0
+    for position in sorted(range(len(sentences)), key=lambda i: score(sentences[i]), reverse=True):
+        _, role, sentence, _ = sentences[position]
+        text = f"{role.capitalize()}: {sentence}"
+        cost = estimate_tokens(text)
+        if used + cost > max_tokens:
+            continue
+        chosen.append((position, text))
+        used += cost
+
+    chosen.sort()
+    return " ".join(text for _, text in chosen)
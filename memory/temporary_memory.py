@@ -1,136 +1,193 @@
-# memory/temporary_memory.py
-from typing import Any
-
-
-class TemporaryMemory:
-    """
-    Temporary runtime memory (session-only).
-    Resets when program restarts.
-
-    Purpose:
-      - Track multi-step intents
-      - Keep short conversation context
-      - Store last actions (search / open_app)
-      - Support follow-up questions like:
-          "why did he executed?"
-    """
-
-    def __init__(self, max_history: int = 5):
-        self.max_history = max_history
-        self.reset()
-
-
-    def reset(self):
-        self.pending_intent: str | None = None
-        self.parameters: dict[str, Any] = {}
-        self.current_question: str | None = None
-
-        self.last_user_text: str | None = None
-        self.last_ai_response: str | None = None
-
-        # --- Action memory ---
-        self.last_search: dict | None = None   
-        self.last_opened_app: str | None = None
-
-        # --- Conversation ---
-        self.conversation_history: list[dict[str, str]] = []
-
-
-    def set_pending_intent(self, intent: str):
-        self.pending_intent = intent
-
-    def clear_pending_intent(self):
-        self.pending_intent = None
-        self.parameters = {}
-        self.current_question = None
-
-    def has_pending_intent(self) -> bool:
-        return self.pending_intent is not None
-
-
-    def update_parameters(self, new_params: dict):
-        if not isinstance(new_params, dict):
-            return
-        for k, v in new_params.items():
-            if v not in (None, ""):
-                self.parameters[k] = v
-
-    def get_parameters(self) -> dict:
-        return self.parameters.copy()
-
-    def get_parameter(self, key: str):
-        return self.parameters.get(key)
-
-    def set_current_question(self, param_name: str):
-        self.current_question = param_name
-
-    def get_current_question(self) -> str | None:
-        return self.current_question
-
-    def clear_current_question(self):
-        self.current_question = None
-
-    def set_last_user_text(self, text: str):
-        self.last_user_text = text
-        self._add_to_history("user", text)
-
-    def set_last_ai_response(self, text: str):
-        self.last_ai_response = text
-        self._add_to_history("ai", text)
-
-    def get_last_user_text(self):
-        return self.last_user_text
-
-    def get_last_ai_response(self):
-        return self.last_ai_response
-
-
-    def set_last_search(self, query: str, answer: str):
-        self.last_search = {
-            "query": query,
-            "answer": answer
-        }
-
-    def get_last_search(self):
-        return self.last_search
-
-    def set_open_app(self, app_name: str):
-        self.last_opened_app = app_name
-
-    def get_last_opened_app(self):
-        return self.last_opened_app
-
-    def _add_to_history(self, role: str, text: str):
-        if role not in ("user", "ai"):
-            return
-
-        self.conversation_history.append({
-            "role": role,
-            "text": text
-        })
-
-        if len(self.conversation_history) > self.max_history:
-            self.conversation_history.pop(0)
-
-    def get_history_for_prompt(self) -> str:
-        """
-        Returns compact history for LLM prompt.
-        """
-        return "\n".join(
-            f"{m['role'].capitalize()}: {m['text']}"
-            for m in self.conversation_history
-        )
-
-
-    def get_context_summary(self) -> dict:
-        """
-        Useful for debugging or smarter LLM prompts.
-        """
-        return {
-            "pending_intent": self.pending_intent,
-            "parameters": self.parameters,
-            "last_search": self.last_search,
-            "last_opened_app": self.last_opened_app,
-            "last_user_text": self.last_user_text,
-            "last_ai_response": self.last_ai_response,
-        }
+# memory/temporary_memory.py
+import threading
+from typing import Any
+from collections import deque
+
+from memory.summarizer import summarize_turns
+
+# Turns that fell out of the verbatim history and still feed the summary.
+SUMMARY_SOURCE_TURNS = 40
+
+
+class TemporaryMemory:
+    """
+    Temporary runtime memory (session-only).
+    Resets when program restarts.
+
+    Purpose:
+      - Track multi-step intents
+      - Keep short conversation context
+      - Store last actions (search / open_app)
+      - Support follow-up questions like:
+          "why did he executed?"
+    """
+
+    def __init__(self, max_history: int = 5):
+        self.max_history = max_history
+        self._summary_lock = threading.Lock()
+        self._summarizing = False
+        self._generation = 0
+        self.reset()
+
+
+    def reset(self):
+        self.pending_intent: str | None = None
+        self.parameters: dict[str, Any] = {}
+        self.current_question: str | None = None
+
+        self.last_user_text: str | None = None
+        self.last_ai_response: str | None = None
+
+        # --- Action memory ---
+        self.last_search: dict | None = None   
+        self.last_opened_app: str | None = None
+
+        # --- Conversation ---
+        # Newest turns verbatim; older ones only live on in the summary,
+        # which a background thread refreshes so turns never wait for it.
+        self.conversation_history: deque[dict[str, str]] = deque(maxlen=self.max_history)
+        with self._summary_lock:
+            self._generation += 1
+            self._older_turns: deque[dict[str, str]] = deque(maxlen=SUMMARY_SOURCE_TURNS)
+            self._summary_dirty = False
+            self.summary = ""
+
+
+    def set_pending_intent(self, intent: str):
+        self.pending_intent = intent
+
+    def clear_pending_intent(self):
+        self.pending_intent = None
+        self.parameters = {}
+        self.current_question = None
+
+    def has_pending_intent(self) -> bool:
+        return self.pending_intent is not None
+
+
+    def update_parameters(self, new_params: dict):
+        if not isinstance(new_params, dict):
+            return
+        for k, v in new_params.items():
+            if v not in (None, ""):
+                self.parameters[k] = v
+
+    def get_parameters(self) -> dict:
+        return self.parameters.copy()
+
+    def get_parameter(self, key: str):
+        return self.parameters.get(key)
+
+    def set_current_question(self, param_name: str):
+        self.current_question = param_name
+
+    def get_current_question(self) -> str | None:
+        return self.current_question
+
+    def clear_current_question(self):
+        self.current_question = None
+
+    def set_last_user_text(self, text: str):
+        self.last_user_text = text
+        self._add_to_history("user", text)
+
+    def set_last_ai_response(self, text: str):
+        self.last_ai_response = text
+        self._add_to_history("ai", text)
+
+    def get_last_user_text(self):
+        return self.last_user_text
+
+    def get_last_ai_response(self):
+        return self.last_ai_response
+
+
+    def set_last_search(self, query: str, answer: str):
+        self.last_search = {
+            "query": query,
+            "answer": answer
+        }
+
+    def get_last_search(self):
+        return self.last_search
+
+    def set_open_app(self, app_name: str):
+        self.last_opened_app = app_name
+
+    def get_last_opened_app(self):
+        return self.last_opened_app
+
+    def _add_to_history(self, role: str, text: str):
+        if role not in ("user", "ai"):
+            return
+
+        if self.conversation_history and len(self.conversation_history) == self.conversation_history.maxlen:
+            with self._summary_lock:
+                self._older_turns.append(self.conversation_history[0])
+            self._schedule_summary()
+
+        self.conversation_history.append({
+            "role": role,
+            "text": text
+        })
+
+    def _schedule_summary(self):
+        with self._summary_lock:
+            self._summary_dirty = True
+            if self._summarizing:
+                return
+            self._summarizing = True
+        threading.Thread(target=self._refresh_summary, daemon=True).start()
+
+    def _refresh_summary(self):
+        # Turns that drop out while a summary is being made are picked up
+        # by the next pass of this loop instead of starting more threads.
+        while True:
+            with self._summary_lock:
+                if not self._summary_dirty:
+                    self._summarizing = False
+                    return
+                self._summary_dirty = False
+                turns = list(self._older_turns)
+                generation = self._generation
+
+            summary = summarize_turns(turns)
+
+            with self._summary_lock:
+                if generation == self._generation:
+                    self.summary = summary
+
+    def get_summary(self) -> str:
+        """
+        Compact summary of the turns older than the verbatim history.
+        """
+        return self.summary
+
+    def get_history_lines(self) -> list[str]:
+        """
+        History as prompt lines, oldest first.
+        """
+        return [
+            f"{m['role'].capitalize()}: {m['text']}"
+            for m in self.conversation_history
+        ]
+
+    def get_history_for_prompt(self) -> str:
+        """
+        Returns compact history for LLM prompt.
+        """
+        return "\n".join(self.get_history_lines())
+
+
+    def get_context_summary(self) -> dict:
+        """
+        Useful for debugging or smarter LLM prompts.
+        """
+        return {
+            "pending_intent": self.pending_intent,
+            "parameters": self.parameters,
+            "last_search": self.last_search,
+            "last_opened_app": self.last_opened_app,
+            "last_user_text": self.last_user_text,
+            "last_ai_response": self.last_ai_response,
+        }
@@ -0,0 +1,234 @@
+import sys
+import threading
+from collections import OrderedDict, deque
+from pathlib import Path
+
+from llm_cache import normalize_utterance
+from memory.memory_manager import add_update_listener
+from memory.retrieval import MemoryRetriever, MEMORY_TOKEN_BUDGET, estimate_tokens
+from memory.summarizer import SUMMARY_TOKEN_BUDGET
+
+# Token budget per prompt section (memory's is MEMORY_TOKEN_BUDGET in
+# memory/retrieval.py). Memory and history are cut to fit.
+# The system prompt and the pending intent are only checked: the LLM
+# echoes collected parameters back, so cutting them would corrupt them.
+SYSTEM_TOKEN_BUDGET = 600
+HISTORY_TOKEN_BUDGET = 160
+PENDING_TOKEN_BUDGET = 120
+
+# Newest history lines sent verbatim (user and AI lines).
+HISTORY_LINES = 5
+
+# Retrieved memory kept per utterance; the speculative request and the
+# final one for the same words share it. Cleared on every memory update.
+MEMORY_CACHE_ENTRIES = 32
+
+# Requests whose token counts are kept for stats().
+TOKEN_HISTORY = 100
+
+def get_base_dir():
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).parent
+    return Path(__file__).resolve().parent
+
+BASE_DIR = get_base_dir()
+
+PROMPT_PATH = BASE_DIR / "core" / "prompt.txt"
+
+def load_system_prompt() -> str:
+    try:
+        with open(PROMPT_PATH, "r", encoding="utf-8") as f:
+            return f.read()
+    except Exception as e:
+        print(f"⚠️ prompt.txt couldn't be loaded: {e}")
+        return "You are Jarvis, a helpful AI assistant."
+
+
+def fit_tokens(text: str, budget: int, keep_end: bool = False) -> str:
+    """
+    text cut (from the end) to roughly `budget` tokens. keep_end: cut from
+    the front instead, for conversation, where the newest words matter most.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    size = max(0, budget * 4 - 1)
+    if keep_end:
+        return "…" + text[len(text) - size:].lstrip()
+    return text[:size].rstrip() + "…"
+
+
+def fit_line(line: str, budget: int) -> str:
+    """A "Speaker: text" history line cut from the front, keeping the speaker."""
+    speaker, sep, said = line.partition(": ")
+    if not sep:
+        return fit_tokens(line, budget, keep_end=True)
+    return speaker + sep + fit_tokens(said, max(0, budget - estimate_tokens(speaker + sep)), keep_end=True)
+
+
+class PromptBuilder:
+    """
+    Assembles the messages for one LLM request.
+
+    The system message is built once. Retrieved memory is cached per
+    utterance until memory changes. Memory and history are cut to their
+    token budgets, so the prompt stays the same size however long the
+    session or the memory gets.
+    """
+
+    def __init__(self):
+        self.system_prompt = load_system_prompt()
+        self.system_tokens = estimate_tokens(self.system_prompt)
+        self._system_message = {"role": "system", "content": self.system_prompt}
+        if self.system_tokens > SYSTEM_TOKEN_BUDGET:
+            print(f"⚠️ System prompt is ~{self.system_tokens} tokens, over its budget of {SYSTEM_TOKEN_BUDGET}")
+
+        self.retriever = MemoryRetriever()
+        self._lock = threading.Lock()
+        self._memory_cache: OrderedDict[tuple[str, str], tuple[list[str], list[str]]] = OrderedDict()
+        self._token_counts: deque[dict] = deque(maxlen=TOKEN_HISTORY)
+
+        add_update_listener(self._invalidate)
+
+    # ---------- memory ----------
+
+    def _invalidate(self, memory_update=None):
+        with self._lock:
+            self._memory_cache.clear()
+
+    def add_turn(self, user_text: str, ai_text: str | None):
+        self.retriever.add_turn(user_text, ai_text)
+        self._invalidate()
+
+    def _retrieve(self, user_text: str, skip_recent_turns: int, covered: str = "") -> tuple[list[str], list[str]]:
+        key = (normalize_utterance(user_text), covered)
+        with self._lock:
+            cached = self._memory_cache.get(key)
+            if cached is not None:
+                self._memory_cache.move_to_end(key)
+                return cached
+
+        result = self.retriever.retrieve(
+            user_text,
+            token_budget=MEMORY_TOKEN_BUDGET,
+            skip_recent_turns=skip_recent_turns,
+            covered=covered
+        )
+        with self._lock:
+            self._memory_cache[key] = result
+            while len(self._memory_cache) > MEMORY_CACHE_ENTRIES:
+                self._memory_cache.popitem(last=False)
+        return result
+
+    # ---------- sections ----------
+
+    def memory_block(
+        self,
+        user_text: str,
+        history: list[str],
+        pending_intent: str | None = None,
+        parameters: dict | None = None,
+        summary: str | None = None
+    ) -> dict:
+        """
+        The per-request context: relevant memory, a summary of the older
+        conversation, recent history (newest lines, oldest first) and the
+        pending intent.
+        """
+        block = {}
+        summary = fit_tokens(summary, SUMMARY_TOKEN_BUDGET, keep_end=True) if summary else ""
+
+        # Exchanges in the verbatim history don't need to be retrieved, and
+        # what the summary already says isn't repeated.
+        facts, earlier = self._retrieve(user_text, skip_recent_turns=HISTORY_LINES // 2, covered=summary)
+        if facts:
+            block["facts"] = "; ".join(facts)
+        if earlier:
+            block["earlier_conversation"] = "\n".join(earlier)
+
+        if summary:
+            block["conversation_summary"] = summary
+
+        recent = []
+        used = 0
+        for line in reversed(history[-HISTORY_LINES:]):
+            cost = estimate_tokens(line)
+            if used + cost > HISTORY_TOKEN_BUDGET:
+                if not recent:
+                    recent.append(fit_line(line, HISTORY_TOKEN_BUDGET))
+                break
+            recent.append(line)
+            used += cost
+        if recent:
+            block["recent_conversation"] = "\n".join(reversed(recent))
+
+        if pending_intent:
+            block["_pending_intent"] = pending_intent
+            block["_collected_params"] = str(parameters or {})
+
+        return block
+
+    def messages(self, user_text: str, memory_block: dict | None) -> list[dict]:
+        """System and user message for one request; token counts are recorded."""
+        memory_str = ""
+        if memory_block:
+            memory_str = "\n".join(f"{k}: {v}" for k, v in memory_block.items())
+
+        user_prompt = f"""User message: "{user_text}"
+
+Known user memory:
+{memory_str if memory_str else "No memory available"}"""
+
+        sections = {k: estimate_tokens(str(v)) for k, v in (memory_block or {}).items()}
+        counts = {
+            "system": self.system_tokens,
+            "user_text": estimate_tokens(user_text),
+            "memory": sum(v for k, v in sections.items() if k in ("facts", "earlier_conversation")),
+            "history": sections.get("recent_conversation", 0) + sections.get("conversation_summary", 0),
+            "pending": sections.get("_pending_intent", 0) + sections.get("_collected_params", 0),
+            "total": self.system_tokens + estimate_tokens(user_prompt),
+        }
+        counts["over_budget"] = [
+            section for section, budget in (
+                ("system", SYSTEM_TOKEN_BUDGET), ("memory", MEMORY_TOKEN_BUDGET),
+                ("history", HISTORY_TOKEN_BUDGET + SUMMARY_TOKEN_BUDGET), ("pending", PENDING_TOKEN_BUDGET),
+            )
+            if counts[section] > budget
+        ]
+        with self._lock:
+            self._token_counts.append(counts)
+
+        return [self._system_message, {"role": "user", "content": user_prompt}]
+
+    def record_usage(self, prompt_tokens: int):
+        """Token count reported by the API for the last request."""
+        with self._lock:
+            if self._token_counts:
+                self._token_counts[-1]["reported"] = prompt_tokens
+
+    def stats(self) -> dict:
+        """Estimated prompt tokens of the recent requests, per section."""
+        with self._lock:
+            counts = list(self._token_counts)
+        if not counts:
+            return {}
+
+        totals = [c["total"] for c in counts]
+        reported = [c for c in counts if "reported" in c]
+        return {
+            "requests": len(counts),
+            "avg_tokens": sum(totals) / len(totals),
+            "max_tokens": max(totals),
+            "avg_by_section": {
+                section: sum(c[section] for c in counts) / len(counts)
+                for section in ("system", "user_text", "memory", "history", "pending")
+            },
+            # How far the estimate is off, where the API reported usage.
+            "estimate_ratio": (
+                sum(c["total"] for c in reported) / sum(c["reported"] for c in reported)
+                if reported and sum(c["reported"] for c in reported) else None
+            ),
+            "last": counts[-1],
+        }
+
+
+prompt_builder = PromptBuilder()
@@ -0,0 +1,136 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from fast_intent import classify, FAST_PATH_THRESHOLD
+from llm_cache import normalize_utterance
+
+# Opt-in: start the LLM request before Vosk finalizes the utterance.
+SPECULATIVE_DISPATCH = False
+
+# How long a partial transcript must stay unchanged before we fire.
+SPECULATION_STABLE_MS = 400
+
+MIN_SPECULATION_WORDS = 2
+
+# Upper bound on requests per utterance, protects the free-tier quota.
+MAX_SPECULATIONS_PER_UTTERANCE = 2
+
+
+class Speculator:
+    """
+    Watches Vosk partial results and dispatches the LLM request once the
+    partial transcript has been stable for SPECULATION_STABLE_MS.
+
+    dispatch(text, cancel_event) runs on a worker thread and must return
+    the LLM output dict. When the final transcript matches the speculated
+    one the result is kept, otherwise the request is cancelled and the
+    caller issues a fresh one.
+    """
+
+    def __init__(self, dispatch, stable_ms: int = SPECULATION_STABLE_MS):
+        self.dispatch = dispatch
+        self.stable_ms = stable_ms
+
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculation")
+        self._lock = threading.Lock()
+
+        self._stats = {
+            "utterances": 0,
+            "fired": 0,
+            "wins": 0,
+            "mismatches": 0,
+            "superseded": 0,
+            "head_start_ms": 0.0,
+        }
+
+        self._reset_utterance()
+
+    def _reset_utterance(self):
+        self._partial = ""
+        self._changed_at = time.perf_counter()
+        self._pending: tuple[str, Future, threading.Event, float] | None = None
+        self._fired_count = 0
+
+    def begin(self):
+        """Call before listening for a new utterance."""
+        with self._lock:
+            self._cancel_pending()
+            self._reset_utterance()
+
+    def on_partial(self, partial: str):
+        """Feed every partial result from the recognizer."""
+        text = normalize_utterance(partial or "")
+        now = time.perf_counter()
+
+        with self._lock:
+            if text != self._partial:
+                self._partial = text
+                self._changed_at = now
+                return
+
+            if (now - self._changed_at) * 1000 < self.stable_ms:
+                return
+            if len(text.split()) < MIN_SPECULATION_WORDS:
+                return
+            if self._pending and self._pending[0] == text:
+                return
+            if self._fired_count >= MAX_SPECULATIONS_PER_UTTERANCE:
+                return
+
+            # Commands the fast path will answer don't need the LLM at all.
+            fast = classify(text)
+            if fast and fast["confidence"] >= FAST_PATH_THRESHOLD:
+                return
+
+            if self._pending:
+                self._cancel_pending()
+                self._stats["superseded"] += 1
+
+            cancel_event = threading.Event()
+            future = self._executor.submit(self.dispatch, partial, cancel_event)
+            self._pending = (text, future, cancel_event, now)
+            self._fired_count += 1
+            self._stats["fired"] += 1
+
+        print(f"🔮 Speculating on: {partial}")
+
+    def resolve(self, final_text: str) -> Future | None:
+        """
+        Returns the in-flight future when it was issued for final_text,
+        otherwise cancels it and returns None.
+        """
+        text = normalize_utterance(final_text or "")
+
+        with self._lock:
+            self._stats["utterances"] += 1
+            pending = self._pending
+            self._pending = None
+
+            if pending is None:
+                return None
+
+            spec_text, future, cancel_event, fired_at = pending
+            if spec_text == text:
+                self._stats["wins"] += 1
+                self._stats["head_start_ms"] += (time.perf_counter() - fired_at) * 1000
+                return future
+
+            cancel_event.set()
+            self._stats["mismatches"] += 1
+            return None
+
+    def _cancel_pending(self):
+        if self._pending:
+            self._pending[2].set()
+            self._pending = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            fired = self._stats["fired"]
+            wins = self._stats["wins"]
+            return {
+                **self._stats,
+                "win_rate": wins / fired if fired else 0.0,
+                "avg_head_start_ms": self._stats["head_start_ms"] / wins if wins else 0.0,
+            }
@@ -1,50 +1,280 @@
-import sounddevice as sd
-import vosk
-import queue
-import sys
-import json
-import threading
-from pathlib import Path
-
-def get_base_dir():
-    if getattr(sys, "frozen", False):
-        return Path(sys.executable).parent
-    return Path(__file__).resolve().parent
-
-BASE_DIR = get_base_dir()
-
-MODEL_PATH = BASE_DIR / "vosk-model-small-en-us-0.15"
-
-if not MODEL_PATH.exists():
-    MODEL_PATH = Path("C:/Users/90553/Downloads/vosk/vosk-model-small-en-us-0.15")
-
-model = vosk.Model(str(MODEL_PATH))
-
-q = queue.Queue()
-stop_listening_flag = threading.Event()
-
-def callback(indata, frames, time, status):
-    if status:
-        print(status, file=sys.stderr)
-    q.put(bytes(indata))
-
-def record_voice(prompt="🎙 I'm listening, sir..."):
-    """
-    Blocking call, returns the first recognized sentence.
-    """
-    print(prompt)
-    rec = vosk.KaldiRecognizer(model, 16000)
-    with sd.RawInputStream(samplerate=16000, blocksize=8000, dtype='int16',
-                           channels=1, callback=callback):
-        while not stop_listening_flag.is_set():
-            try:
-                data = q.get(timeout=0.1)
-            except queue.Empty:
-                continue
-            if rec.AcceptWaveform(data):
-                result = json.loads(rec.Result())
-                text = result.get("text", "")
-                if text.strip():
-                    print("👤 You:", text)
-                    return text
-    return ""
+import vosk
+import sys
+import time
+import threading
+from pathlib import Path
+
+from audio.capture import get_capture, shared_ring_name, SAMPLE_RATE
+from audio.recognizer import SpeechSession, RECOGNIZER_BLOCK
+from stt_worker import RecognizerProcess
+from stt_models import ModelRegistry, DEFAULT_MODEL_NAME
+from tts import is_playing
+
+def get_base_dir():
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).parent
+    return Path(__file__).resolve().parent
+
+BASE_DIR = get_base_dir()
+
+# Picked among the installed models from measurements on this machine
+# (see stt_models.py) when the model is loaded; new models are measured
+# after startup. Set MODEL_PATH to skip the choice.
+model_registry = ModelRegistry()
+MODEL_PATH: Path | None = None
+
+# Loaded in the background by load_model_async(); one instance is shared
+# by every KaldiRecognizer, so the model is only ever in memory once.
+model: vosk.Model | None = None
+model_ready = threading.Event()
+model_load_seconds: float | None = None
+model_error: Exception | None = None
+_model_lock = threading.Lock()
+
+def model_path() -> Path:
+    """
+    The model to load. Choosing scans the model directories, so it's
+    done on the loading thread rather than at import time.
+    """
+    global MODEL_PATH
+    if MODEL_PATH is None:
+        MODEL_PATH = model_registry.choose() or BASE_DIR / DEFAULT_MODEL_NAME
+    return MODEL_PATH
+
+def load_model() -> vosk.Model | None:
+    """Loads the shared model once. Safe to call from several threads."""
+    global model, model_load_seconds, model_error
+
+    with _model_lock:
+        if model_ready.is_set():
+            return model
+        try:
+            return _load_vosk_model()
+        finally:
+            model_ready.set()
+
+def _load_vosk_model() -> vosk.Model | None:
+    """Loads the model into this process. The caller holds _model_lock."""
+    global model, model_load_seconds, model_error
+
+    path = model_path()
+    start = time.perf_counter()
+    try:
+        model = vosk.Model(str(path))
+        model_load_seconds = time.perf_counter() - start
+        model_error = None
+        print(f"🎙 Speech model loaded in {model_load_seconds:.2f} s")
+    except Exception as e:
+        model_error = e
+        print(f"❌ Speech model couldn't be loaded from {path}: {e}")
+    return model
+
+def load_model_async(on_ready=None):
+    """
+    Starts loading the model in the background: in the recognizer process
+    when STT_PROCESS is on, otherwise on a thread of this one.
+    on_ready(model) is called once it finished (None on failure); with
+    STT_PROCESS it gets the session instead.
+    """
+    def _load():
+        loaded = get_session() if STT_PROCESS else load_model()
+        if on_ready:
+            on_ready(loaded)
+
+    thread = threading.Thread(target=_load, daemon=True)
+    thread.start()
+    return thread
+
+def get_model() -> vosk.Model | None:
+    """Returns the shared model, waiting for (or starting) the load if needed."""
+    if not model_ready.is_set():
+        load_model()
+    return model
+
+# Decode in a separate process (see stt_worker.py) so recognition doesn't
+# compete with the UI animation and TTS decoding for the GIL.
+STT_PROCESS = True
+
+# While Jarvis is talking (and shortly after, for room echo) the VAD gate
+# is raised by ECHO_GATE_DB (audio/recognizer.py).
+ECHO_GATE = True
+ECHO_TAIL_SECONDS = 0.3
+
+stop_listening_flag = threading.Event()
+
+# SpeechSession in this process, or the RecognizerProcess handle.
+_session: SpeechSession | RecognizerProcess | None = None
+_process: RecognizerProcess | None = None
+_fallen_back = False
+_session_lock = threading.Lock()
+
+def _playing() -> bool:
+    return ECHO_GATE and is_playing(ECHO_TAIL_SECONDS)
+
+def _capture():
+    """The microphone capture, stamping each block with whether we were talking."""
+    capture = get_capture()
+    capture.playing = _playing
+    return capture
+
+def start_recognizer_process() -> RecognizerProcess:
+    """
+    Starts the recognizer process, which loads the model itself; see
+    get_session() for waiting on it.
+    """
+    global _process
+
+    def _ready(ok: bool):
+        global _session, model_load_seconds, model_error
+        if ok:
+            model_load_seconds = process.load_seconds
+            print(f"🎙 Speech model loaded in {model_load_seconds:.2f} s (recognizer process)")
+            with _session_lock:
+                _session = process
+        else:
+            model_error = RuntimeError(process.error)
+            print(f"❌ Speech model couldn't be loaded from {path}: {process.error}")
+        model_ready.set()
+
+    # Started under the lock, so nobody sees a process that isn't alive yet.
+    with _model_lock:
+        if _process is not None:
+            return _process
+        path = model_path()
+        process = RecognizerProcess(_capture().ring, shared_ring_name(), SAMPLE_RATE, stop_listening_flag)
+        process.start(str(path), on_ready=_ready)
+        _process = process
+        return process
+
+def _check_recognizer_process():
+    """
+    Once the recognizer process died, recognition moves into this process
+    (loaded on a thread) instead of every request failing right away.
+    """
+    global _session, _fallen_back
+
+    with _session_lock:
+        process = _process
+        if process is None or _fallen_back or process.is_alive() or process.error:
+            return
+        _fallen_back = True
+        if _session is process:
+            _session = None
+        # Waiters block (and the barge-in listener idles) until it's loaded.
+        model_ready.clear()
+
+    print("❌ Speech recognizer process exited, recognizing in this process instead")
+
+    def _load():
+        with _model_lock:
+            if model is None:
+                _load_vosk_model()
+        model_ready.set()
+
+    threading.Thread(target=_load, daemon=True).start()
+
+def get_session(wait: bool = True) -> SpeechSession | RecognizerProcess | None:
+    """
+    The object recognition runs through. Waits for (or starts) the model
+    load unless wait is False. None if the model isn't available (yet).
+    """
+    global _session
+
+    if STT_PROCESS:
+        _check_recognizer_process()
+
+    if not model_ready.is_set():
+        if not wait:
+            return None
+        if STT_PROCESS:
+            process = start_recognizer_process()
+            # The process may die before it reports back.
+            while not model_ready.wait(1.0):
+                if not process.is_alive():
+                    _check_recognizer_process()
+        else:
+            load_model()
+
+    with _session_lock:
+        if _session is None and model is not None:
+            _session = SpeechSession(model, _capture().ring, SAMPLE_RATE, stop_listening_flag)
+        return _session
+
+def last_heard() -> tuple[float, float] | None:
+    """
+    time.monotonic() span in which the audio of the last record_voice()
+    result was captured (None if it returned ""). It may lie well before
+    the call, when the speech waited in the ring.
+    """
+    session = get_session(wait=False)
+    span = session.last_span if session else None
+    if span is None:
+        return None
+    ring = session.ring
+    return ring.time_of(span[0], SAMPLE_RATE), ring.time_of(span[1], SAMPLE_RATE)
+
+def get_stats() -> dict:
+    """
+    Recognition cost and endpointing figures, empty until the model is ready.
+    cpu_saved_seconds estimates the decode time avoided by skipping silence.
+    """
+    session = get_session(wait=False)
+    stats = session.stats() if session else {}
+    if not stats:
+        return {}
+
+    block_seconds = RECOGNIZER_BLOCK / SAMPLE_RATE
+    skipped_seconds = stats["skipped_blocks"] * block_seconds
+    rtf = stats["decode_cpu_seconds"] / stats["decoded_seconds"] if stats["decoded_seconds"] else 0.0
+
+    stats["skipped_ratio"] = stats["skipped_blocks"] / stats["blocks"] if stats["blocks"] else 0.0
+    stats["real_time_factor"] = rtf
+    stats["cpu_saved_seconds"] = skipped_seconds * rtf
+    stats["avg_endpoint_latency_ms"] = (
+        stats["endpoint_latency_ms"] / stats["utterances"] if stats["utterances"] else 0.0
+    )
+    stats["in_process"] = isinstance(session, SpeechSession)
+    return stats
+
+def record_voice(
+    prompt="🎙 I'm listening, sir...",
+    on_partial=None,
+    timeout: float | None = None,
+    expected_phrases: list[str] | None = None
+):
+    """
+    Blocking call, returns the first recognized sentence.
+
+    on_partial: optional callback, called with the current partial
+    transcript after every audio block that doesn't finish the utterance.
+    timeout: give up and return "" if no speech started within this many seconds.
+    expected_phrases: likely answers, decoded against first with an
+    open-vocabulary fallback (see SpeechSession.record).
+    """
+    session = get_session()
+    if session is None:
+        stop_listening_flag.wait(1.0)
+        return ""
+
+    print(prompt)
+    text = session.record(on_partial, timeout, expected_phrases)
+    if text:
+        print("👤 You:", text)
+    return text
+
+def listen_for_phrases(phrases: list[str], on_rejected=None) -> str:
+    """
+    Cheap keyword spotting: blocks until one of `phrases` is heard and
+    returns it ("" when listening was stopped).
+
+    Uses a recognizer restricted to the phrases, so everything else only
+    decodes to [unk]. on_rejected(text) is called for each utterance that
+    wasn't one of them. Audio from the block the phrase was spotted in
+    onwards is left for the next record_voice() call, so a command said
+    in the same breath isn't lost.
+    """
+    session = get_session()
+    if session is None:
+        stop_listening_flag.wait(1.0)
+        return ""
+    return session.spot(phrases, on_rejected)
@@ -0,0 +1,234 @@
+"""
+Offline speech recognition benchmark.
+
+Streams recorded WAV/FLAC files through the same VAD-gated recognizer the
+microphone path uses and reports real-time factor, endpoint latency and
+word error rate. Needs no audio device.
+
+    python stt_benchmark.py path/to/corpus --model vosk-model-small-en-us-0.15
+
+Reference transcripts are read from <name>.txt next to each audio file,
+or from LibriSpeech style *.trans.txt files ("<name> <TEXT>" per line).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import soundfile as sf
+import vosk
+
+from audio.recognizer import GatedRecognizer, RECOGNIZER_BLOCK
+from llm_cache import normalize_utterance
+
+# The rate live capture runs at (audio/capture.py); files are resampled to it.
+SAMPLE_RATE = 16000
+
+AUDIO_SUFFIXES = (".wav", ".flac")
+
+# Silence appended to every file so its last utterance ends through the
+# endpointer, like it would live, instead of being cut off at EOF.
+END_PADDING_SECONDS = 1.5
+
+
+def get_base_dir():
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).parent
+    return Path(__file__).resolve().parent
+
+
+DEFAULT_MODEL = get_base_dir() / "vosk-model-small-en-us-0.15"
+
+
+def load_references(directory: Path) -> dict[str, str]:
+    references = {}
+    for trans in directory.glob("*.trans.txt"):
+        for line in trans.read_text(encoding="utf-8").splitlines():
+            name, _, text = line.partition(" ")
+            if name:
+                references[name] = text.strip()
+    return references
+
+
+def find_corpus(root: Path) -> list[tuple[Path, str | None]]:
+    """Audio files under root with their reference transcript (None if missing)."""
+    files = sorted(p for p in root.rglob("*") if p.suffix.lower() in AUDIO_SUFFIXES)
+
+    references_by_dir = {}
+    corpus = []
+    for path in files:
+        if path.parent not in references_by_dir:
+            references_by_dir[path.parent] = load_references(path.parent)
+
+        reference = references_by_dir[path.parent].get(path.stem)
+        text_file = path.with_suffix(".txt")
+        if reference is None and text_file.exists():
+            reference = text_file.read_text(encoding="utf-8").strip()
+
+        corpus.append((path, reference))
+    return corpus
+
+
+def read_audio(path: Path) -> np.ndarray:
+    """Mono int16 samples at SAMPLE_RATE."""
+    data, samplerate = sf.read(str(path), dtype="float32", always_2d=True)
+    data = data.mean(axis=1)
+
+    if samplerate != SAMPLE_RATE and len(data):
+        length = int(round(len(data) * SAMPLE_RATE / samplerate))
+        positions = np.linspace(0, len(data) - 1, num=length)
+        data = np.interp(positions, np.arange(len(data)), data)
+
+    return (np.clip(data, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def word_errors(reference: str, hypothesis: str) -> tuple[int, int]:
+    """(substitutions + deletions + insertions, reference word count)."""
+    ref = normalize_utterance(reference).split()
+    hyp = normalize_utterance(hypothesis).split()
+
+    row = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(
+                row[j] + 1,
+                row[j - 1] + 1,
+                previous + (ref_word != hyp_word),
+            )
+    return row[len(hyp)], len(ref)
+
+
+_model = None
+
+
+def load_model(model_path: str):
+    """Loads the model transcribe_file() uses in this process (pool initializer)."""
+    global _model
+    vosk.SetLogLevel(-1)
+    _model = vosk.Model(model_path)
+
+
+def transcribe_file(path: Path, use_vad: bool = True) -> dict:
+    """Runs in a pool worker; the model was loaded by load_model()."""
+    samples = read_audio(path)
+    padded = np.concatenate([samples, np.zeros(int(END_PADDING_SECONDS * SAMPLE_RATE), dtype=np.int16)])
+
+    recognizer = GatedRecognizer(_model, SAMPLE_RATE, use_vad=use_vad)
+    texts = []
+    endpoints_ms = []
+
+    start = time.perf_counter()
+    for offset in range(0, len(padded), RECOGNIZER_BLOCK):
+        text = recognizer.feed(padded[offset:offset + RECOGNIZER_BLOCK])
+        if text:
+            texts.append(text)
+            endpoints_ms.append(recognizer.endpoint_ms)
+
+    text = recognizer.flush()
+    if text:
+        texts.append(text)
+    wall = time.perf_counter() - start
+
+    # The padding is decoded (and timed) too, so it counts towards RTF.
+    processed = len(padded) / SAMPLE_RATE
+    return {
+        "file": str(path),
+        "audio_seconds": len(samples) / SAMPLE_RATE,
+        "processed_seconds": processed,
+        "decode_seconds": wall,
+        "rtf": wall / processed if processed else 0.0,
+        "utterances": len(texts),
+        "endpoint_latency_ms": sum(endpoints_ms) / len(endpoints_ms) if endpoints_ms else None,
+        "skipped_blocks": recognizer.stats["skipped_blocks"],
+        "blocks": recognizer.stats["blocks"],
+        "hypothesis": " ".join(texts),
+    }
+
+
+def run_benchmark(corpus_dir: Path, model_path: Path, workers: int | None = None, use_vad: bool = True) -> dict:
+    corpus = find_corpus(corpus_dir)
+    if not corpus:
+        raise FileNotFoundError(f"No {'/'.join(AUDIO_SUFFIXES)} files under {corpus_dir}")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_model, initargs=(str(model_path),)) as pool:
+        results = list(pool.map(transcribe_file, [p for p, _ in corpus], [use_vad] * len(corpus)))
+    elapsed = time.perf_counter() - start
+
+    edits = words = 0
+    for result, (_, reference) in zip(results, corpus):
+        result["reference"] = reference
+        result["wer"] = None
+        if reference is not None:
+            file_edits, file_words = word_errors(reference, result["hypothesis"])
+            result["wer"] = file_edits / file_words if file_words else 0.0
+            edits += file_edits
+            words += file_words
+
+    audio = sum(r["audio_seconds"] for r in results)
+    processed = sum(r["processed_seconds"] for r in results)
+    decode = sum(r["decode_seconds"] for r in results)
+    endpoints = [r["endpoint_latency_ms"] for r in results if r["endpoint_latency_ms"] is not None]
+    blocks = sum(r["blocks"] for r in results)
+
+    return {
+        "model": str(model_path),
+        "files": results,
+        "aggregate": {
+            "files": len(results),
+            "audio_seconds": audio,
+            "rtf": decode / processed if processed else 0.0,
+            "wall_seconds": elapsed,
+            "throughput_x_realtime": audio / elapsed if elapsed else 0.0,
+            "endpoint_latency_ms": sum(endpoints) / len(endpoints) if endpoints else None,
+            "skipped_ratio": sum(r["skipped_blocks"] for r in results) / blocks if blocks else 0.0,
+            "wer": edits / words if words else None,
+        },
+    }
+
+
+def _format_ms(value) -> str:
+    return "-" if value is None else f"{value:.0f} ms"
+
+
+def _format_wer(value) -> str:
+    return "-" if value is None else f"{value * 100:.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Vosk recognition on recorded audio.")
+    parser.add_argument("corpus", type=Path, help="directory with .wav/.flac files")
+    parser.add_argument("--model", type=Path, default=DEFAULT_MODEL, help="Vosk model directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="parallel worker processes")
+    parser.add_argument("--no-vad", action="store_true", help="decode every block, like before VAD gating")
+    parser.add_argument("--json", type=Path, help="also write the full report here")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.corpus, args.model, args.workers, use_vad=not args.no_vad)
+
+    for r in report["files"]:
+        print(
+            f"{Path(r['file']).name:<40} {r['audio_seconds']:6.1f} s  "
+            f"RTF {r['rtf']:.3f}  endpoint {_format_ms(r['endpoint_latency_ms']):>7}  "
+            f"WER {_format_wer(r['wer']):>6}"
+        )
+
+    agg = report["aggregate"]
+    print(
+        f"\n📊 {agg['files']} files, {agg['audio_seconds']:.1f} s of audio in {agg['wall_seconds']:.1f} s "
+        f"({agg['throughput_x_realtime']:.1f}x real time)\n"
+        f"   RTF {agg['rtf']:.3f}  endpoint {_format_ms(agg['endpoint_latency_ms'])}  "
+        f"WER {_format_wer(agg['wer'])}  skipped {agg['skipped_ratio'] * 100:.0f}% of blocks"
+    )
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
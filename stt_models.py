@@ -0,0 +1,255 @@
+import os
+import sys
+import json
+import time
+import platform
+import threading
+import multiprocessing as mp
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+def get_base_dir():
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).parent
+    return Path(__file__).resolve().parent
+
+BASE_DIR = get_base_dir()
+
+# Where installed Vosk models are looked for (each model is a directory).
+MODEL_DIRS = [
+    BASE_DIR,
+    BASE_DIR / "models",
+    Path.home() / "Downloads" / "vosk",
+]
+
+# Fallback before anything was measured.
+DEFAULT_MODEL_NAME = "vosk-model-small-en-us-0.15"
+
+# A model must decode at least this much faster than real time to be picked.
+LATENCY_BUDGET_RTF = 0.5
+
+# Optional cap on the memory a model may take (MB). None = no limit.
+MEMORY_BUDGET_MB: float | None = None
+
+# Measure new models in the background after startup; picked next launch.
+AUTO_BENCHMARK = True
+
+# Recorded speech used for measuring: stt_benchmark corpus layout, with
+# references for word error rate. Falls back to the cached TTS phrases.
+BENCHMARK_CORPUS = BASE_DIR / "benchmark"
+TTS_CACHE_DIR = BASE_DIR / "cache" / "tts"
+BENCHMARK_SECONDS = 30
+
+REGISTRY_PATH = BASE_DIR / "cache" / "stt_models.json"
+
+
+def is_vosk_model(path: Path) -> bool:
+    return path.is_dir() and ((path / "am" / "final.mdl").exists() or (path / "conf" / "model.conf").exists())
+
+
+def discover_models(dirs: list[Path] | None = None) -> list[Path]:
+    found = []
+    for directory in dirs or MODEL_DIRS:
+        if not directory.is_dir():
+            continue
+        for path in sorted(directory.iterdir()):
+            if is_vosk_model(path) and path.resolve() not in found:
+                found.append(path.resolve())
+    return found
+
+
+def model_size_mb(path: Path) -> float:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file()) / (1024 * 1024)
+
+
+def machine_id() -> str:
+    """Measurements are only valid on the machine they were taken on."""
+    return f"{platform.node()}|{platform.machine()}|{platform.processor()}|{os.cpu_count()}"
+
+
+def _model_id(path: Path) -> str:
+    return f"{path}|{int(path.stat().st_mtime)}"
+
+
+def _memory_mb() -> float | None:
+    """Resident memory of this process, peak where only that is available."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return None
+
+
+def _measure(model_path: str, clips: list[tuple[str, str | None]]) -> dict:
+    """Runs in a fresh process, so memory and load time are the model's own."""
+    import stt_benchmark
+
+    memory_before = _memory_mb()
+    start = time.perf_counter()
+    stt_benchmark.load_model(model_path)
+    load_seconds = time.perf_counter() - start
+    memory_after = _memory_mb()
+
+    audio = decode = 0.0
+    edits = words = 0
+    for path, reference in clips:
+        result = stt_benchmark.transcribe_file(Path(path))
+        audio += result["processed_seconds"]
+        decode += result["decode_seconds"]
+        if reference is not None:
+            file_edits, file_words = stt_benchmark.word_errors(reference, result["hypothesis"])
+            edits += file_edits
+            words += file_words
+
+    return {
+        "load_seconds": load_seconds,
+        "memory_mb": memory_after - memory_before if memory_before is not None else None,
+        "rtf": decode / audio if audio else None,
+        "wer": edits / words if words else None,
+    }
+
+
+def benchmark_clips(max_seconds: float = BENCHMARK_SECONDS) -> list[tuple[str, str | None]]:
+    """Speech to measure on: the benchmark corpus if there is one, else cached TTS phrases."""
+    import soundfile as sf
+    from stt_benchmark import find_corpus
+
+    if BENCHMARK_CORPUS.is_dir():
+        candidates = [(str(p), ref) for p, ref in find_corpus(BENCHMARK_CORPUS)]
+    else:
+        candidates = [(str(p), None) for p in sorted(TTS_CACHE_DIR.glob("*.wav"))]
+
+    clips = []
+    total = 0.0
+    for path, reference in candidates:
+        if total >= max_seconds:
+            break
+        try:
+            total += sf.info(path).duration
+        except Exception:
+            continue
+        clips.append((path, reference))
+    return clips
+
+
+class ModelRegistry:
+    """
+    Installed Vosk models and how they perform on this machine, cached in
+    REGISTRY_PATH so startup never waits for a benchmark.
+    """
+
+    def __init__(self, path: Path = REGISTRY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("machine") == machine_id():
+            self._entries = data.get("models", {})
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"machine": machine_id(), "models": self._entries}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def models(self) -> list[dict]:
+        """Every installed model with its measurements (None until measured)."""
+        with self._lock:
+            return [
+                {"path": path, "measured": self._entries.get(_model_id(path))}
+                for path in discover_models()
+            ]
+
+    def unmeasured(self) -> list[Path]:
+        return [m["path"] for m in self.models() if m["measured"] is None]
+
+    def choose(self) -> Path | None:
+        """
+        The most accurate measured model within the latency (and memory)
+        budget. Accuracy is the measured word error rate when the corpus
+        has references, model size otherwise. Before anything was measured,
+        the default model or else the smallest one.
+        """
+        models = self.models()
+        if not models:
+            return None
+
+        measured = [m for m in models if m["measured"] and m["measured"].get("rtf") is not None]
+        if not measured:
+            for m in models:
+                if m["path"].name == DEFAULT_MODEL_NAME:
+                    return m["path"]
+            return min(models, key=lambda m: model_size_mb(m["path"]))["path"]
+
+        def within_budget(m) -> bool:
+            stats = m["measured"]
+            if stats["rtf"] > LATENCY_BUDGET_RTF:
+                return False
+            if MEMORY_BUDGET_MB is not None and stats.get("memory_mb") and stats["memory_mb"] > MEMORY_BUDGET_MB:
+                return False
+            return True
+
+        candidates = [m for m in measured if within_budget(m)]
+        if not candidates:
+            return min(measured, key=lambda m: m["measured"]["rtf"])["path"]
+
+        # Models without a word error rate sort after every measured one.
+        def accuracy_key(m):
+            stats = m["measured"]
+            wer = stats.get("wer")
+            return (wer is None, wer or 0.0, -stats["size_mb"])
+
+        return min(candidates, key=accuracy_key)["path"]
+
+    def benchmark(self, paths: list[Path] | None = None) -> int:
+        """Measures the given (default: unmeasured) models one process each. Returns how many."""
+        paths = self.unmeasured() if paths is None else paths
+        clips = benchmark_clips()
+        if not paths or not clips:
+            return 0
+
+        measured = 0
+        for path in paths:
+            try:
+                with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as pool:
+                    stats = pool.submit(_measure, str(path), clips).result()
+            except Exception as e:
+                print(f"⚠️ Couldn't benchmark speech model {path.name}: {e}")
+                continue
+
+            stats["size_mb"] = model_size_mb(path)
+            stats["clips"] = len(clips)
+            print(
+                f"🎙 {path.name}: "
+                + (f"RTF {stats['rtf']:.2f}" if stats["rtf"] is not None else "RTF n/a")
+                + f", loads in {stats['load_seconds']:.1f} s"
+                + (f", WER {stats['wer'] * 100:.1f}%" if stats["wer"] is not None else "")
+            )
+            with self._lock:
+                self._entries[_model_id(path)] = stats
+                self._save()
+            measured += 1
+        return measured
+
+    def benchmark_async(self) -> threading.Thread | None:
+        """Measures new models in the background; the choice applies next launch."""
+        # With a single model installed there is nothing to choose between.
+        if len(self.models()) < 2 or not self.unmeasured():
+            return None
+        thread = threading.Thread(target=self.benchmark, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,260 @@
+import time
+import queue
+import itertools
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+from audio.ring import AudioRing, SHARED_POLL_SECONDS
+
+# How often the app side checks the stop flag while a request is running.
+REPLY_POLL_SECONDS = 0.05
+
+
+def _worker_main(shm_name: str, capacity: int, samplerate: int, model_path: str, commands, results):
+    """
+    Entry point of the recognizer process. Attaches to the capture ring in
+    shared memory, loads the model and serves requests:
+
+        (id, "record", {"timeout", "partials", "phrases"}) -> "partial"*, "span", "done" text
+        (id, "spot", phrases)                               -> "rejected"*, "done" phrase
+        (id, "watch", phrases)                              -> "spotted"*, "done"
+        (id, "unwatch" | "cancel", None)
+        (id, "stats", None)                                 -> "done" stats
+        None                                                -> exit
+
+    record and spot run one at a time; watches run next to them. "span"
+    is SpeechSession.last_span, in positions of the shared ring.
+    """
+    import vosk
+    from audio.recognizer import SpeechSession
+
+    vosk.SetLogLevel(-1)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = AudioRing(capacity, shm.buf, poll_interval=SHARED_POLL_SECONDS)
+
+    start = time.perf_counter()
+    try:
+        model = vosk.Model(model_path)
+    except Exception as e:
+        results.put((None, "ready", (False, 0.0, str(e))))
+        return
+    results.put((None, "ready", (True, time.perf_counter() - start, None)))
+
+    cancel = threading.Event()
+    job_lock = threading.Lock()
+    current = [None]
+    last_started = [0]
+    # Cancels that arrived before their job started.
+    cancelled: set[int] = set()
+    session = SpeechSession(model, ring, samplerate, cancel)
+    jobs = queue.Queue()
+    watches: dict[int, threading.Event] = {}
+
+    def run_jobs():
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            request_id, kind, args = job
+            with job_lock:
+                current[0] = request_id
+                last_started[0] = request_id
+                cancel.clear()
+                skip = request_id in cancelled
+                cancelled.discard(request_id)
+
+            if skip:
+                text = ""
+            elif kind == "record":
+                on_partial = None
+                if args["partials"]:
+                    on_partial = lambda text: results.put((request_id, "partial", text))
+                text = session.record(on_partial, args["timeout"], args["phrases"])
+                results.put((request_id, "span", session.last_span))
+            else:
+                text = session.spot(args, lambda text: results.put((request_id, "rejected", text)))
+
+            with job_lock:
+                current[0] = None
+            results.put((request_id, "done", text))
+
+    def run_watch(request_id: int, phrases: list[str], active: threading.Event):
+        for spotted in session.watch(phrases, active.is_set):
+            results.put((request_id, "spotted", spotted))
+        results.put((request_id, "done", None))
+
+    threading.Thread(target=run_jobs, daemon=True).start()
+
+    while True:
+        command = commands.get()
+        if command is None:
+            jobs.put(None)
+            return
+
+        request_id, kind, args = command
+        if kind in ("record", "spot"):
+            jobs.put(command)
+        elif kind == "cancel":
+            with job_lock:
+                if current[0] == request_id:
+                    cancel.set()
+                elif request_id > last_started[0]:
+                    cancelled.add(request_id)
+        elif kind == "watch":
+            active = threading.Event()
+            active.set()
+            watches[request_id] = active
+            threading.Thread(target=run_watch, args=(request_id, args, active), daemon=True).start()
+        elif kind == "unwatch":
+            active = watches.pop(request_id, None)
+            if active:
+                active.clear()
+        elif kind == "stats":
+            results.put((request_id, "done", session.stats()))
+
+
+class RecognizerProcess:
+    """
+    App-side handle of the recognizer process. Same interface as
+    audio.recognizer.SpeechSession, so callers don't care where decoding
+    happens. Audio goes over the shared-memory ring, transcripts come back
+    over a multiprocessing queue; the GIL of this process is only held for
+    the short moments of passing messages around.
+    """
+
+    def __init__(self, ring: AudioRing, shm_name: str, samplerate: int, stop_event):
+        self.ring = ring
+        self.shm_name = shm_name
+        self.samplerate = samplerate
+        self.stop_event = stop_event
+        self.last_span: tuple[int, int] | None = None
+
+        self.ready = threading.Event()
+        self.load_seconds: float | None = None
+        self.error: str | None = None
+
+        self._ids = itertools.count(1)
+        self._pending: dict[int, queue.Queue] = {}
+        self._lock = threading.Lock()
+        self._process = None
+        self._commands = None
+        self._results = None
+
+    def start(self, model_path: str, on_ready=None):
+        """on_ready(ok) is called from a background thread once the model loaded (or failed)."""
+        ctx = mp.get_context("spawn")
+        self._commands = ctx.Queue()
+        self._results = ctx.Queue()
+        self._process = ctx.Process(
+            target=_worker_main,
+            args=(self.shm_name, self.ring.capacity, self.samplerate, model_path, self._commands, self._results),
+            name="stt-worker",
+            daemon=True,
+        )
+        self._process.start()
+        threading.Thread(target=self._read_results, args=(on_ready,), daemon=True).start()
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def close(self):
+        if self.is_alive():
+            self._commands.put(None)
+
+    def record(self, on_partial=None, timeout: float | None = None, expected_phrases: list[str] | None = None) -> str:
+        self.last_span = None
+        request_id, replies = self._request(
+            "record",
+            {"timeout": timeout, "partials": on_partial is not None, "phrases": expected_phrases}
+        )
+        return self._wait(request_id, replies, on_partial=on_partial) or ""
+
+    def spot(self, phrases: list[str], on_rejected=None) -> str:
+        request_id, replies = self._request("spot", [p.lower() for p in phrases])
+        return self._wait(request_id, replies, on_rejected=on_rejected) or ""
+
+    def watch(self, phrases: list[str], active):
+        request_id, replies = self._request("watch", [p.lower() for p in phrases])
+        try:
+            while active() and self.is_alive():
+                try:
+                    kind, payload = replies.get(timeout=REPLY_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+                if kind == "done":
+                    return
+                yield tuple(payload)
+        finally:
+            self._commands.put((request_id, "unwatch", None))
+            self._forget(request_id)
+
+    def stats(self, timeout: float = 1.0) -> dict:
+        request_id, replies = self._request("stats", None)
+        try:
+            kind, payload = replies.get(timeout=timeout)
+            return payload
+        except queue.Empty:
+            return {}
+        finally:
+            self._forget(request_id)
+
+    def _request(self, kind: str, args) -> tuple[int, queue.Queue]:
+        request_id = next(self._ids)
+        replies = queue.Queue()
+        with self._lock:
+            self._pending[request_id] = replies
+        self._commands.put((request_id, kind, args))
+        return request_id, replies
+
+    def _forget(self, request_id: int):
+        with self._lock:
+            self._pending.pop(request_id, None)
+
+    def _wait(self, request_id: int, replies: queue.Queue, on_partial=None, on_rejected=None):
+        cancelled = False
+        try:
+            while True:
+                if not cancelled and self.stop_event.is_set():
+                    self._commands.put((request_id, "cancel", None))
+                    cancelled = True
+
+                try:
+                    kind, payload = replies.get(timeout=REPLY_POLL_SECONDS)
+                except queue.Empty:
+                    if not self.is_alive():
+                        # Reported once by the owner (see speech_to_text.get_session).
+                        return None
+                    continue
+
+                if kind == "done":
+                    return payload
+                if kind == "span":
+                    self.last_span = tuple(payload) if payload else None
+                elif kind == "partial" and on_partial:
+                    on_partial(payload)
+                elif kind == "rejected" and on_rejected:
+                    on_rejected(payload)
+        finally:
+            self._forget(request_id)
+
+    def _read_results(self, on_ready):
+        while True:
+            try:
+                request_id, kind, payload = self._results.get()
+            except (EOFError, OSError):
+                return
+
+            if request_id is None:
+                ok, self.load_seconds, self.error = payload
+                self.ready.set()
+                if on_ready:
+                    on_ready(ok)
+                if not ok:
+                    return
+                continue
+
+            with self._lock:
+                replies = self._pending.get(request_id)
+            if replies is not None:
+                replies.put((kind, payload))
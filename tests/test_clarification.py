@@ -0,0 +1,106 @@
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("vosk")
+pytest.importorskip("pyautogui")
+pytest.importorskip("sounddevice")
+pytest.importorskip("edge_tts")
+
+
+@pytest.fixture
+def send_message(tmp_path, monkeypatch):
+    # Keep the memory store out of the repo.
+    from memory import memory_manager
+    monkeypatch.setattr(memory_manager, "MEMORY_PATH", tmp_path / "memory.json")
+    monkeypatch.setattr(memory_manager, "MEMORY_DB_PATH", tmp_path / "memory.db")
+    monkeypatch.setattr(memory_manager, "_store", None)
+    from actions import send_message
+    spoken = []
+    monkeypatch.setattr(send_message, "edge_speak", lambda text, *args, **kwargs: spoken.append(text))
+    send_message.spoken = spoken
+    return send_message
+
+
+@pytest.fixture
+def session_memory(send_message):
+    from memory.temporary_memory import TemporaryMemory
+    memory = TemporaryMemory()
+    memory.set_pending_intent("send_message")
+    return memory
+
+
+class GrammarRecognizer:
+    """Stands in for KaldiRecognizer: answers the first grammar phrase once it heard speech."""
+
+    grammars = []
+
+    def __init__(self, model, samplerate, grammar=None):
+        self.grammar = json.loads(grammar) if grammar else None
+        self.grammars.append(self.grammar)
+        self.samples = 0
+
+    def AcceptWaveform(self, data):
+        self.samples += len(data) // 2
+        return False
+
+    def PartialResult(self):
+        return json.dumps({"partial": ""})
+
+    def Result(self):
+        return self.FinalResult()
+
+    def FinalResult(self):
+        heard = self.grammar[0] if self.grammar and self.samples else ""
+        self.samples = 0
+        return json.dumps({"text": heard})
+
+
+def test_incomplete_intent_asks_and_sets_the_question(send_message, session_memory):
+    session_memory.update_parameters({"receiver": "mom", "message_text": "on my way"})
+
+    assert send_message.ask_for_missing(session_memory)
+    assert session_memory.get_current_question() == "platform"
+    assert send_message.spoken == [send_message.QUESTIONS["platform"]]
+
+
+def test_complete_intent_asks_nothing(send_message, session_memory):
+    session_memory.update_parameters({"receiver": "mom", "message_text": "hi", "platform": "telegram"})
+
+    assert not send_message.ask_for_missing(session_memory)
+    assert session_memory.get_current_question() is None
+    assert send_message.spoken == []
+
+
+def test_receiver_answers_come_from_memory(send_message):
+    memory = {"relationships": {"best_friend": {"name": {"value": "Anna"}}}}
+    assert send_message.expected_answers("receiver", memory) == ["best friend", "anna"]
+    assert send_message.expected_answers("message_text", memory) is None
+
+
+def test_answer_is_decoded_against_expected_phrases(send_message, session_memory, monkeypatch):
+    import threading
+    from audio import recognizer
+    from audio.ring import AudioRing
+
+    session_memory.update_parameters({"receiver": "mom", "message_text": "on my way"})
+    send_message.ask_for_missing(session_memory)
+    expected = send_message.expected_answers(session_memory.get_current_question())
+
+    GrammarRecognizer.grammars = []
+    monkeypatch.setattr(recognizer.vosk, "KaldiRecognizer", GrammarRecognizer)
+
+    samplerate = 16000
+    ring = AudioRing(samplerate * 5)
+    quiet = (np.random.default_rng(0).standard_normal(samplerate) * 5).astype(np.int16)
+    tone = (np.sin(np.arange(samplerate) * 0.12) * 8000).astype(np.int16)
+    for block in (quiet, tone, quiet):
+        ring.write(block)
+
+    session = recognizer.SpeechSession(None, ring, samplerate, threading.Event())
+    session.resume_position = 0
+
+    assert session.record(timeout=1.0, expected_phrases=expected) == expected[0]
+    assert GrammarRecognizer.grammars[0] == expected + ["[unk]"]
+    assert session.stats()["constrained_hits"] == 1
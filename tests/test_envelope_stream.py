@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+pytest.importorskip("requests")
+
+
+@pytest.fixture
+def llm(tmp_path, monkeypatch):
+    # Keep the memory store out of the repo.
+    from memory import memory_manager
+    monkeypatch.setattr(memory_manager, "MEMORY_PATH", tmp_path / "memory.json")
+    monkeypatch.setattr(memory_manager, "MEMORY_DB_PATH", tmp_path / "memory.db")
+    monkeypatch.setattr(memory_manager, "_store", None)
+    import llm
+    return llm
+
+
+def stream(llm, raw: str, chunk: int = 3):
+    spoken = []
+    envelope = llm.EnvelopeStream(spoken.append)
+    for i in range(0, len(raw), chunk):
+        envelope.feed(raw[i:i + chunk])
+    envelope.finish()
+    return envelope, spoken
+
+
+def test_speaks_top_level_text(llm):
+    envelope, spoken = stream(llm, '{"intent": "chat", "text": "Hello Sir. How are you?"}')
+    assert envelope.intent == "chat"
+    assert spoken == ["Hello Sir.", "How are you?"]
+
+
+def test_nested_text_key_is_not_spoken(llm):
+    raw = '{"intent":"chat","memory_update":{"identity":{"text":"oops"}},"text":"Real. answer"}'
+    for chunk in (1, 3, len(raw)):
+        envelope, spoken = stream(llm, raw, chunk)
+        assert " ".join(spoken) == "Real. answer"
+
+
+def test_nested_intent_key_is_ignored(llm):
+    raw = '{"parameters":{"intent":"open_app"},"intent":"chat","text":"Sure."}'
+    envelope, spoken = stream(llm, raw)
+    assert envelope.intent == "chat"
+    assert spoken == ["Sure."]
+
+
+def test_escaped_quotes_in_text(llm):
+    envelope, spoken = stream(llm, '{"intent":"chat","text":"He said \\"hi\\". Done."}')
+    assert spoken == ['He said "hi".', "Done."]
+
+
+def test_null_text_and_action_intent(llm):
+    _, spoken = stream(llm, '{"intent":"chat","text":null}')
+    assert spoken == []
+    _, spoken = stream(llm, '{"intent":"open_app","text":"Opening Spotify."}')
+    assert spoken == []
+
+
+def test_surrogate_pairs_are_combined(llm):
+    raw = '{"intent":"chat","text":"Nice \\ud83d\\ude00 sir."}'
+    for chunk in (1, 3, 7, len(raw)):
+        envelope, spoken = stream(llm, raw, chunk)
+        assert envelope.text == "Nice \U0001F600 sir."
+
+
+def test_lone_surrogate_is_replaced(llm):
+    envelope, _ = stream(llm, '{"intent":"chat","text":"a\\ud83d b"}')
+    assert envelope.text == "a� b"
+
+
+def test_unparsed_content_is_flagged(llm):
+    output, parsed = llm._build_output('{"intent": "chat", "text": "cut')
+    assert not parsed
+    output, parsed = llm._build_output('{"intent": "chat", "text": "Hi."}')
+    assert parsed and output["text"] == "Hi."
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, deltas):
+        self.lines = [
+            ("data: " + json.dumps({"choices": [{"delta": {"content": d}}]})).encode("utf-8")
+            for d in deltas
+        ]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_lines(self):
+        return iter(self.lines)
+
+
+def test_broken_stream_keeps_decoded_text_and_is_not_cacheable(llm, monkeypatch):
+    deltas = ['{"intent":"chat","text":"First part. Sec', 'ond']
+    session = type("Session", (), {"post": lambda self, *a, **k: FakeResponse(deltas)})()
+    monkeypatch.setattr(llm, "openrouter_session", lambda: session)
+
+    output, ok = llm._stream_completion({}, {}, on_sentence=lambda s: None)
+    assert not ok
+    assert output["text"] == "First part. Second"
+    assert "{" not in output["text"]
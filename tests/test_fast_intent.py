@@ -0,0 +1,66 @@
+import pytest
+
+from fast_intent import classify, match_intent
+
+
+@pytest.mark.parametrize("text, city, when", [
+    ("What's the weather in London?", "London", "today"),
+    ("Jarvis, what is the weather like in New York tomorrow", "New York", "tomorrow"),
+    ("weather forecast for paris this weekend please", "Paris", "this weekend"),
+])
+def test_weather_slots(text, city, when):
+    result = match_intent(text)
+    assert result["intent"] == "weather_report"
+    assert result["parameters"] == {"city": city, "time": when}
+
+
+@pytest.mark.parametrize("text", [
+    "what's the weather in the evening",
+    "what's the weather in my city",
+    "what's the weather for the weekend in paris",
+    "what's the weather in london in fahrenheit",
+    "what's the weather in london and paris",
+])
+def test_unclear_weather_city_goes_to_the_llm(text):
+    assert classify(text)["intent"] == "weather_report"
+    assert match_intent(text) is None
+
+
+@pytest.mark.parametrize("text, app", [
+    ("open WhatsApp", "WhatsApp"),
+    ("Hey Jarvis, could you please launch google chrome", "Chrome"),
+    ("open up what's up for me", "WhatsApp"),
+])
+def test_known_apps(text, app):
+    result = match_intent(text)
+    assert result["intent"] == "open_app"
+    assert result["parameters"] == {"app_name": app}
+
+
+@pytest.mark.parametrize("text", [
+    "start over",
+    "run a quick test",
+    "open my presentation about sales",
+    "open spotify and play some jazz",
+])
+def test_unclear_app_requests_go_to_the_llm(text):
+    assert match_intent(text) is None
+
+
+def test_search_query_slot():
+    result = match_intent("search for the tallest building in the world")
+    assert result["intent"] == "search"
+    assert result["parameters"] == {"query": "the tallest building in the world"}
+
+
+@pytest.mark.parametrize("text", [
+    "look up the weather",
+    "search for flights and then book a hotel",
+])
+def test_unclear_searches_go_to_the_llm(text):
+    assert match_intent(text) is None
+
+
+@pytest.mark.parametrize("text", ["", "hello there", "send a message to john", "how are you doing"])
+def test_no_match(text):
+    assert classify(text) is None
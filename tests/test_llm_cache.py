@@ -0,0 +1,86 @@
+import pytest
+
+import llm_cache
+from llm_cache import ResponseCache, is_follow_up
+
+
+def reply(text: str, intent: str = "chat") -> dict:
+    return {"intent": intent, "parameters": {}, "text": text, "memory_update": {"identity": {"name": "Tony"}}}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return ResponseCache(tmp_path / "llm_cache.json", max_entries=2, ttl=60, save_delay=60)
+
+
+def test_least_recently_used_is_evicted(cache):
+    cache.put("a", reply("A"))
+    cache.put("b", reply("B"))
+    assert cache.get("a")["text"] == "A"
+
+    cache.put("c", reply("C"))
+
+    assert cache.get("b") is None
+    assert cache.get("a")["text"] == "A"
+    assert cache.get("c")["text"] == "C"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.put("a", reply("A"))
+    clock[0] += 59
+    assert cache.get("a") is not None
+
+    clock[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_memory_update_is_not_replayed(cache):
+    cache.put("a", reply("A"))
+    assert cache.get("a")["memory_update"] is None
+
+
+def test_time_sensitive_and_clarifying_replies_are_not_stored(cache):
+    assert not cache.put("w", reply("Sunny.", intent="weather_report"))
+    assert not cache.put("s", reply("Found it.", intent="search"))
+    assert not cache.put("q", {**reply("Who to?"), "needs_clarification": True})
+    assert cache.stats()["entries"] == 0
+
+
+def test_flush_persists_in_recency_order(tmp_path, cache, clock):
+    cache.put("a", reply("A"))
+    cache.put("b", reply("B"))
+    cache.get("a")
+    cache.flush()
+
+    reloaded = ResponseCache(tmp_path / "llm_cache.json", max_entries=1, ttl=60, save_delay=60)
+    assert reloaded.get("a")["text"] == "A"
+    assert reloaded.get("b") is None
+
+
+def test_key_ignores_case_and_punctuation():
+    block = {"facts": "name: Tony"}
+    assert (
+        ResponseCache.make_key("What's the time?", block, "v1")
+        == ResponseCache.make_key("what's the time", block, "v1")
+    )
+    assert ResponseCache.make_key("What's the time?", block, "v1") != ResponseCache.make_key("What's the time?", block, "v2")
+    assert ResponseCache.make_key("hi", block, "v1") != ResponseCache.make_key("hi", {"facts": "name: Pepper"}, "v1")
+
+
+@pytest.mark.parametrize("text", ["yes", "Why?", "what about him", "open it", "tell me more"])
+def test_follow_ups(text):
+    assert is_follow_up(text)
+
+
+@pytest.mark.parametrize("text", ["what is the capital of france", "tell me a joke", "how far is the moon"])
+def test_standalone_questions(text):
+    assert not is_follow_up(text)
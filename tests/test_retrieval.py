@@ -0,0 +1,87 @@
+import math
+
+import pytest
+
+from memory.retrieval import Bm25Index, tokenize, uncovered
+
+
+DOCS = {
+    "pizza": "I love pizza from Naples",
+    "pasta": "Pasta with pizza sauce is fine",
+    "car": "My car is a red sports car",
+    "long": "pizza " + " ".join(f"filler{i}" for i in range(30)),
+}
+
+
+@pytest.fixture
+def index():
+    index = Bm25Index()
+    for key, text in DOCS.items():
+        index.add(key, text)
+    return index
+
+
+def reference_scores(query: str, docs: dict, k1: float = 1.5, b: float = 0.75) -> dict:
+    terms = {key: tokenize(text) for key, text in docs.items()}
+    avg_length = sum(len(t) for t in terms.values()) / len(terms)
+    scores = {}
+    for key, words in terms.items():
+        score = 0.0
+        for term in set(tokenize(query)):
+            containing = sum(term in t for t in terms.values())
+            tf = words.count(term)
+            if not tf:
+                continue
+            idf = math.log(1 + (len(terms) - containing + 0.5) / (containing + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(words) / avg_length))
+        if score:
+            scores[key] = score
+    return scores
+
+
+def test_scores_match_okapi_bm25(index):
+    for query in ("pizza", "red car", "pizza from naples", "pasta sauce"):
+        expected = reference_scores(query, DOCS)
+        results = dict(index.search(query, limit=10))
+        assert results.keys() == expected.keys()
+        for key, score in expected.items():
+            assert results[key] == pytest.approx(score, rel=1e-5)
+
+
+def test_ranking(index):
+    assert [key for key, _ in index.search("pizza naples", limit=10)][0] == "pizza"
+    # Same term frequency, the shorter document ranks higher.
+    ranked = [key for key, _ in index.search("pizza", limit=10)]
+    assert ranked.index("long") == len(ranked) - 1
+    assert [key for key, _ in index.search("car", limit=1)] == ["car"]
+
+
+def test_unknown_and_stopword_queries(index):
+    assert index.search("spaceship", limit=5) == []
+    assert index.search("the and of", limit=5) == []
+
+
+def test_remove_and_slot_reuse(index):
+    index.remove("pizza")
+    assert "pizza" not in index
+    assert "pizza" not in dict(index.search("naples", limit=10))
+
+    index.add("boat", "A boat from Naples")
+    assert len(index) == len(DOCS)
+    assert [key for key, _ in index.search("naples", limit=10)] == ["boat"]
+    assert dict(index.search("pizza", limit=10)).keys() == {"pasta", "long"}
+
+
+def test_readding_a_key_replaces_its_text(index):
+    index.add("car", "A blue bicycle")
+    assert index.search("sports", limit=5) == []
+    assert [key for key, _ in index.search("bicycle", limit=5)] == ["car"]
+
+
+def test_summarized_sentences_are_dropped():
+    exchange = "User: I love pizza from Naples. Do you?\nAI: Pizza from Naples is great, Sir."
+    summary = "User: I love pizza from Naples. Ai: Pizza from Naples is great, Sir."
+
+    assert uncovered(exchange, summary) == "User: Do you?"
+    assert uncovered(exchange, "") == exchange
+    assert uncovered("AI: It is.", "User: It is. Really") == ""
@@ -0,0 +1,64 @@
+import numpy as np
+
+from audio.ring import AudioRing
+
+
+def samples(start: int, count: int) -> np.ndarray:
+    return np.arange(start, start + count, dtype=np.int16)
+
+
+def test_read_across_wraparound():
+    ring = AudioRing(10)
+    ring.write(samples(0, 7))
+    ring.write(samples(7, 6))
+
+    assert ring.write_pos == 13
+    assert ring.read(5, 8).tolist() == list(range(5, 13))
+
+
+def test_oversized_write_keeps_the_newest_samples():
+    ring = AudioRing(4)
+    ring.write(samples(0, 10))
+
+    assert ring.write_pos == 4
+    assert ring.read(0, 4).tolist() == [6, 7, 8, 9]
+
+
+def test_cursor_reads_in_order_over_the_edge():
+    ring = AudioRing(8)
+    ring.write(samples(0, 6))
+    cursor = ring.cursor(position=4)
+    ring.write(samples(6, 5))
+
+    assert cursor.read(3).tolist() == [4, 5, 6]
+    assert cursor.read(10, timeout=0).tolist() == [7, 8, 9, 10]
+    assert cursor.position == 11
+
+
+def test_playback_stamps_survive_wraparound():
+    ring = AudioRing(10)
+    ring.write(samples(0, 8), playback=False)
+    ring.write(samples(8, 4), playback=True)      # positions 8-11, wraps at 10
+    ring.write(samples(12, 3), playback=False)
+
+    assert not ring.played(2, 8)
+    assert ring.played(7, 9)
+    assert ring.played(10, 12)
+    assert not ring.played(12, 15)
+
+
+def test_stamps_follow_the_last_known_state():
+    ring = AudioRing(10)
+    ring.write(samples(0, 2), playback=True)
+    ring.write(samples(2, 2))
+
+    assert ring.played(2, 4)
+
+
+def test_overwritten_positions_are_not_reported():
+    ring = AudioRing(4)
+    ring.write(samples(0, 4), playback=True)
+    ring.write(samples(4, 4), playback=False)
+
+    # Positions 0-3 are gone; what is left of the range wasn't played.
+    assert not ring.played(0, 8)
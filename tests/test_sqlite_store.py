@@ -0,0 +1,77 @@
+import pytest
+
+from memory.sqlite_store import SqliteMemoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SqliteMemoryStore(str(tmp_path / "memory.db"))
+
+
+def test_migration_imports_every_fact_once(tmp_path, store):
+    memory = {
+        "identity": {"name": {"value": "Tony"}, "age": {"value": 48}},
+        "relationships": {"friends": {"rhodey": {"value": "best friend"}}},
+    }
+    assert store.needs_migration()
+
+    assert store.migrate(memory, "memory.json") == 3
+
+    assert not store.needs_migration()
+    loaded = store.load()
+    assert loaded["identity"] == memory["identity"]
+    assert loaded["relationships"]["friends"]["rhodey"] == {"value": "best friend"}
+    assert loaded["preferences"] == {}
+
+    reopened = SqliteMemoryStore(store.path)
+    assert not reopened.needs_migration()
+    assert reopened.load()["identity"]["name"] == {"value": "Tony"}
+
+
+def test_changed_fact_supersedes_the_old_row(store):
+    store.update({"preferences": {"color": "red"}})
+    store.update({"preferences": {"color": "blue"}})
+
+    assert store.load()["preferences"]["color"] == {"value": "blue"}
+    history = store.history(["preferences", "color"])
+    assert [h["entry"]["value"] for h in history] == ["red", "blue"]
+    assert history[0]["superseded_at"] is not None
+    assert history[1]["superseded_at"] is None
+    assert [f["entry"]["value"] for f in store.find("preferences", "color")] == ["blue"]
+
+
+def test_unchanged_fact_writes_nothing(store):
+    store.update({"identity": {"name": "Tony"}})
+    writes = store.stats["writes"]
+
+    store.update({"identity": {"name": "Tony"}})
+
+    assert store.stats["writes"] == writes
+    assert len(store.history(["identity", "name"])) == 1
+
+
+def test_branch_replacing_a_fact_supersedes_it(store):
+    store.update({"relationships": {"pepper": "girlfriend"}})
+    store.update({"relationships": {"pepper": {"role": "wife"}}})
+
+    assert store.load()["relationships"]["pepper"] == {"role": {"value": "wife"}}
+    assert store.history(["relationships", "pepper"])[-1]["superseded_at"] is not None
+
+
+def test_replace_supersedes_missing_facts(store):
+    store.update({"identity": {"name": "Tony", "city": "Malibu"}})
+
+    store.replace({"identity": {"name": {"value": "Tony"}}})
+
+    assert "city" not in store.load()["identity"]
+    assert store.find("identity", "city") == []
+    assert len(store.history(["identity", "city"])) == 1
+
+
+def test_other_connections_see_updates(store):
+    other = SqliteMemoryStore(store.path)
+    other.load()
+
+    store.update({"identity": {"name": "Tony"}})
+
+    assert other.load()["identity"]["name"] == {"value": "Tony"}
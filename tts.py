@@ -1,78 +1,442 @@
-import io
-import threading
-import asyncio
-import sounddevice as sd
-import soundfile as sf
-import edge_tts
-
-VOICE = "en-US-AndrewMultilingualNeural"  
-
-RATE = "+0%"     
-VOLUME = "+0%"   
-PITCH = "+0Hz"   
-
-stop_speaking_flag = threading.Event()
-
-def edge_speak(text: str, ui=None, blocking=False):
-    if not text or not text.strip():
-        return
-
-    finished_event = threading.Event()
-
-    def _thread():
-        if ui:
-            ui.start_speaking()
-
-        stop_speaking_flag.clear()
-
-        try:
-            asyncio.run(_speak_async(text))
-        except Exception as e:
-            print("EDGE TTS ERROR:", e)
-        finally:
-            if ui:
-                ui.stop_speaking()
-            finished_event.set()
-
-    threading.Thread(target=_thread, daemon=True).start()
-
-    if blocking:
-        finished_event.wait()
-
-async def _speak_async(text: str):
-    communicate = edge_tts.Communicate(
-        text=text.strip(),
-        voice=VOICE,
-        rate=RATE,
-        volume=VOLUME,
-        pitch=PITCH,
-    )
-
-    audio_bytes = io.BytesIO()
-
-    async for chunk in communicate.stream():
-        if stop_speaking_flag.is_set():
-            return
-
-        if chunk["type"] == "audio":
-            audio_bytes.write(chunk["data"])
-
-    audio_bytes.seek(0)
-
-    data, samplerate = sf.read(audio_bytes, dtype="float32")
-
-    channels = data.shape[1] if len(data.shape) > 1 else 1
-
-    with sd.OutputStream(
-        samplerate=samplerate,
-        channels=channels,
-        dtype="float32",
-    ) as stream:
-        block_size = 1024
-        for start in range(0, len(data), block_size):
-            if stop_speaking_flag.is_set():
-                break
-            stream.write(data[start:start + block_size])
-
-def stop_speaking():
-    stop_speaking_flag.set()
\ No newline at end of file
+import re
+import time
+import heapq
+import itertools
+import threading
+import asyncio
+import numpy as np
+from collections import deque
+from contextlib import aclosing
+
+from audio.backends import EdgeTTSBackend, LocalBackend, BackendSelector, CLOUD_TTFB_TIMEOUT_MS
+from audio.phrase_cache import PhraseCache, phrase_key, MAX_CACHED_CHARS
+from audio.playback import AudioOutput, to_output_format
+
+VOICE = "en-US-AndrewMultilingualNeural"  
+
+RATE = "+0%"     
+VOLUME = "+0%"   
+PITCH = "+0Hz"   
+
+# Utterance priorities, lower plays first.
+#   INTERRUPT      cuts off whatever is playing and drops everything queued
+#   CLARIFICATION  goes ahead of queued normal speech, never cuts it off
+#   NORMAL         first come, first served
+PRIORITY_INTERRUPT = 0
+PRIORITY_CLARIFICATION = 1
+PRIORITY_NORMAL = 2
+
+# Shorter sentences are merged with the next one into a single request.
+MIN_SENTENCE_CHARS = 20
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?…])\s+")
+
+# Spoken utterances remembered for echo suppression.
+RECENT_SPEECH_ITEMS = 8
+
+# Cached phrases are fed to the player in chunks of this many frames.
+CACHED_CHUNK_FRAMES = 4096
+
+# Fixed strings spoken by the assistant, synthesized into the cache at startup.
+PREWARM_PHRASES = [
+    "Sir, I didn't catch that.",
+    "Sir, a system error occurred.",
+    "Sir, the request timed out.",
+    "OpenRouter API key is missing, Sir.",
+    "Sir, who should I send the message to?",
+    "Sir, what should I say?",
+    "Sir, which platform should I use? (WhatsApp, Telegram, etc.)",
+    "Sir, I couldn't determine which application to open.",
+    "Sir, I couldn't understand the search request.",
+    "Sir, the web search system is not configured.",
+    "Sir, I couldn't connect to the search service.",
+    "Sir, I couldn't find any recent news about that.",
+    "Sir, I found some results but they weren't clear news stories.",
+    "Sir, the city is missing for the weather report.",
+    "Sir, I couldn't open the browser for the weather report.",
+]
+
+phrase_cache = PhraseCache()
+
+_cloud = EdgeTTSBackend(VOICE, RATE, VOLUME, PITCH)
+backends = BackendSelector(_cloud, LocalBackend())
+
+
+class Utterance:
+    """One queued piece of speech with its own cancel token."""
+
+    def __init__(self, text: str, ui=None, priority: int = PRIORITY_NORMAL):
+        self.text = text
+        self.ui = ui
+        self.priority = priority
+
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+        self._started = False
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def start(self):
+        with self._lock:
+            if self._started or self.finished.is_set():
+                return
+            self._started = True
+            self.started_at = time.monotonic()
+        if self.ui:
+            self.ui.start_speaking()
+
+    def finish(self):
+        with self._lock:
+            if self.finished.is_set():
+                return
+            started = self._started
+            self.finished_at = time.monotonic()
+            self.finished.set()
+        if self.ui and started:
+            self.ui.stop_speaking()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self.finished.wait(timeout)
+
+
+class SpeechEngine:
+    """
+    Long-lived speech scheduler: one thread, one event loop, one output
+    stream. Utterances are synthesized one after another in priority
+    order; the next one starts downloading while the previous one plays.
+    """
+
+    def __init__(self):
+        self.output = AudioOutput(on_start=self._on_start, on_finish=self._on_finish)
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._ready = threading.Event()
+        self._start_lock = threading.Lock()
+
+        self._lock = threading.Lock()
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._active: set[Utterance] = set()
+        self._played = deque(maxlen=RECENT_SPEECH_ITEMS)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop
+
+    def start(self):
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            threading.Thread(target=self._thread, daemon=True).start()
+            self._ready.wait()
+
+    def _thread(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._wakeup = asyncio.Event()
+        self._loop = loop
+        self._ready.set()
+        loop.run_until_complete(self._run())
+
+    def speak(self, text: str, ui=None, priority: int = PRIORITY_NORMAL) -> Utterance:
+        utterance = Utterance(text.strip(), ui, priority)
+        self.start()
+
+        with self._lock:
+            if priority == PRIORITY_INTERRUPT:
+                self._cancel_all_locked()
+            heapq.heappush(self._heap, (priority, next(self._seq), utterance))
+
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+        return utterance
+
+    def stop(self):
+        """Cancels the current utterance and everything queued, immediately."""
+        with self._lock:
+            self._cancel_all_locked()
+        self.output.stop()
+
+    def is_speaking(self) -> bool:
+        with self._lock:
+            return bool(self._active or self._heap)
+
+    def recent_speech(self, window_seconds: float) -> list[str]:
+        """Texts that are playing or stopped playing less than window_seconds ago."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                u.text for u in self._played
+                if u.finished_at is None or now - u.finished_at < window_seconds
+            ]
+
+    def speech_between(self, start: float, end: float) -> list[str]:
+        """Texts that were on the speaker at some point between two time.monotonic() values."""
+        with self._lock:
+            return [
+                u.text for u in self._played
+                if u.started_at is not None and u.started_at <= end
+                and (u.finished_at is None or u.finished_at >= start)
+            ]
+
+    def _cancel_all_locked(self):
+        dropped = [item[2] for item in self._heap] + list(self._active)
+        self._heap.clear()
+        self._active.clear()
+        for utterance in dropped:
+            utterance.cancel()
+            utterance.finish()
+
+    # Called from the audio callback: hand off to the loop thread, which
+    # may take the lock.
+
+    def _on_start(self, utterance: Utterance):
+        self._loop.call_soon_threadsafe(self._started, utterance)
+
+    def _on_finish(self, utterance: Utterance):
+        self._loop.call_soon_threadsafe(self._finished, utterance)
+
+    def _started(self, utterance: Utterance):
+        with self._lock:
+            self._played.append(utterance)
+        utterance.start()
+
+    def _finished(self, utterance: Utterance):
+        with self._lock:
+            self._active.discard(utterance)
+        utterance.finish()
+
+    async def _next(self) -> Utterance:
+        while True:
+            with self._lock:
+                if self._heap:
+                    utterance = heapq.heappop(self._heap)[2]
+                    self._active.add(utterance)
+                    return utterance
+                self._wakeup.clear()
+            await self._wakeup.wait()
+
+    async def _run(self):
+        while True:
+            utterance = await self._next()
+            if utterance.cancelled.is_set():
+                utterance.finish()
+                continue
+            await self._synthesize(utterance)
+
+    async def _synthesize(self, utterance: Utterance):
+        task = asyncio.create_task(_synthesize_all(utterance))
+        watcher = asyncio.create_task(_cancel_on_stop(utterance, task))
+
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print("EDGE TTS ERROR:", e)
+        finally:
+            watcher.cancel()
+
+        if utterance.cancelled.is_set():
+            utterance.finish()
+            return
+
+        # End marker; the output finishes the utterance once it has played.
+        if not await asyncio.to_thread(self.output.put, utterance, None):
+            utterance.finish()
+
+
+_engine = SpeechEngine()
+
+
+def edge_speak(text: str, ui=None, blocking=False, priority: int = PRIORITY_NORMAL):
+    """
+    Queues text on the speech engine. Utterances never overlap; they play
+    in priority order (see PRIORITY_*). blocking waits until it has been
+    spoken or cancelled.
+    """
+    if not text or not text.strip():
+        return None
+
+    utterance = _engine.speak(text, ui, priority)
+
+    if blocking:
+        utterance.wait()
+    return utterance
+
+def speak_queued(text: str, ui=None):
+    """
+    Speaks text after everything queued before it.
+    Used for sentences that arrive one by one from a streamed reply.
+    """
+    return edge_speak(text, ui)
+
+def is_speaking() -> bool:
+    return _engine.is_speaking()
+
+def is_playing(tail_seconds: float = 0.0) -> bool:
+    """True while audio is on the speaker, or was less than tail_seconds ago."""
+    output = _engine.output
+    return output.is_playing() or time.monotonic() - output.last_audio_at < tail_seconds
+
+def recent_speech(window_seconds: float = 0.0) -> list[str]:
+    """What Jarvis is saying right now, plus what it said in the last window_seconds."""
+    return _engine.recent_speech(window_seconds)
+
+def speech_between(start: float, end: float) -> list[str]:
+    """What Jarvis was saying at some point between start and end (time.monotonic())."""
+    return _engine.speech_between(start, end)
+
+def split_sentences(text: str) -> list[str]:
+    """Splits text into sentences, merging fragments shorter than MIN_SENTENCE_CHARS."""
+    parts = [p.strip() for p in _SENTENCE_SPLIT.split(text.strip()) if p.strip()]
+
+    sentences = []
+    for part in parts:
+        if sentences and len(sentences[-1]) < MIN_SENTENCE_CHARS:
+            sentences[-1] = f"{sentences[-1]} {part}"
+        else:
+            sentences.append(part)
+    return sentences
+
+async def _open_stream(sentence: str):
+    """
+    Starts synthesis on the backend the selector picks. If the cloud fails
+    or doesn't deliver audio within CLOUD_TTFB_TIMEOUT_MS, the sentence is
+    synthesized locally instead. Returns (backend, first_chunk, chunks).
+    """
+    backend = backends.choose()
+    use_timeout = backend is backends.cloud and backends.local.available()
+
+    start = time.perf_counter()
+    chunks = backend.stream(sentence)
+    try:
+        first = await asyncio.wait_for(
+            anext(chunks, None),
+            CLOUD_TTFB_TIMEOUT_MS / 1000 if use_timeout else None
+        )
+    except Exception as e:
+        await chunks.aclose()
+        if not use_timeout:
+            raise
+        backends.record_failure(backend, timeout=isinstance(e, asyncio.TimeoutError))
+
+        backend = backends.local
+        start = time.perf_counter()
+        chunks = backend.stream(sentence)
+        first = await anext(chunks, None)
+
+    backends.record_ttfb(backend, (time.perf_counter() - start) * 1000)
+    return backend, first, chunks
+
+async def _chain(first, chunks):
+    if first is not None:
+        yield first
+    async for chunk in chunks:
+        yield chunk
+
+async def _synthesize_into(sentence: str, utterance: Utterance, cache: bool = True) -> bool:
+    """
+    Streams one sentence (or a run of them) to the output. Returns False
+    once the utterance was cancelled. cache: keep the audio in the phrase
+    cache if it's short enough.
+    """
+    output = _engine.output
+    key = phrase_key(sentence, VOICE, RATE, VOLUME, PITCH)
+
+    cached = await asyncio.to_thread(phrase_cache.get, key)
+    if cached:
+        samplerate, pcm = cached
+        pcm = to_output_format(samplerate, pcm)
+        for start in range(0, len(pcm), CACHED_CHUNK_FRAMES):
+            chunk = pcm[start:start + CACHED_CHUNK_FRAMES]
+            if not await asyncio.to_thread(output.put, utterance, chunk):
+                return False
+        return True
+
+    backend, first, stream = await _open_stream(sentence)
+
+    # Local fallback audio is never cached under the cloud voice's key.
+    collected = [] if cache and backend.cacheable and len(sentence) <= MAX_CACHED_CHARS else None
+    samplerate = None
+
+    async with aclosing(stream), aclosing(_chain(first, stream)) as chunks:
+        async for samplerate, pcm in chunks:
+            if utterance.cancelled.is_set():
+                return False
+            if collected is not None:
+                collected.append(pcm)
+            chunk = to_output_format(samplerate, pcm)
+            if not await asyncio.to_thread(output.put, utterance, chunk):
+                return False
+
+    if collected:
+        await asyncio.to_thread(phrase_cache.put, key, samplerate, np.concatenate(collected))
+    return True
+
+async def _cancel_on_stop(utterance: Utterance, task: asyncio.Task):
+    while not task.done():
+        if utterance.cancelled.is_set():
+            task.cancel()
+            return
+        await asyncio.sleep(0.05)
+
+async def _synthesize_all(utterance: Utterance):
+    # Cached sentences play from the phrase cache. Every run of uncached
+    # ones between them is a single request: each edge-tts request is its
+    # own websocket (TCP + TLS + upgrade), so one per sentence would only
+    # add handshakes. The service streams a run as it synthesizes it.
+    run = []
+    for sentence in split_sentences(utterance.text):
+        if not phrase_cache.contains(phrase_key(sentence, VOICE, RATE, VOLUME, PITCH)):
+            run.append(sentence)
+            continue
+        if run and not await _synthesize_into(" ".join(run), utterance, cache=len(run) == 1):
+            return
+        run = []
+        if not await _synthesize_into(sentence, utterance):
+            return
+    if run:
+        await _synthesize_into(" ".join(run), utterance, cache=len(run) == 1)
+
+async def _prewarm_async(phrases: list[str]):
+    for phrase in phrases:
+        for sentence in split_sentences(phrase):
+            key = phrase_key(sentence, VOICE, RATE, VOLUME, PITCH)
+            if phrase_cache.contains(key):
+                continue
+
+            collected = []
+            samplerate = None
+            async with aclosing(_cloud.stream(sentence)) as chunks:
+                async for samplerate, pcm in chunks:
+                    collected.append(pcm)
+
+            if collected:
+                await asyncio.to_thread(phrase_cache.put, key, samplerate, np.concatenate(collected))
+
+def prewarm_phrase_cache(phrases: list[str] | None = None):
+    """Synthesizes the fixed phrases into the on-disk cache without playing them."""
+    future = asyncio.run_coroutine_threadsafe(
+        _prewarm_async(phrases if phrases is not None else PREWARM_PHRASES),
+        _engine.loop
+    )
+    try:
+        future.result()
+        print(f"🔊 TTS phrase cache ready ({phrase_cache.stats()['entries']} phrases)")
+    except Exception as e:
+        print(f"⚠️ TTS phrase cache pre-warm failed: {e}")
+
+def prewarm_phrase_cache_async(phrases: list[str] | None = None) -> threading.Thread:
+    thread = threading.Thread(target=prewarm_phrase_cache, args=(phrases,), daemon=True)
+    thread.start()
+    return thread
+
+def stop_speaking():
+    _engine.stop()
\ No newline at end of file
@@ -0,0 +1,91 @@
+import time
+import threading
+
+from speech_to_text import listen_for_phrases
+
+# Only engage the full recognizer and the LLM after the wake phrase.
+WAKE_WORD_MODE = False
+
+WAKE_PHRASES = ["jarvis", "hey jarvis"]
+
+# After waking, each turn waits this long for the user to start speaking
+# before going back to sleep. Answered turns keep the conversation awake.
+WAKE_WINDOW_SECONDS = 8
+
+# A wake phrase spotted this soon after a rejected utterance means the
+# first attempt was most likely a missed wake phrase.
+REPEAT_WINDOW_SECONDS = 4
+
+
+class WakeWordGate:
+    """
+    Sleeps until a wake phrase is heard, then stays awake for follow-up
+    turns until a listening window passes in silence.
+
+    false_accepts: woke up, but nothing was said in the window.
+    false_rejects: the wake phrase only got through on a quick repeat.
+    """
+
+    def __init__(self, phrases: list[str] | None = None, window_seconds: float = WAKE_WINDOW_SECONDS):
+        self.phrases = [p.lower() for p in (phrases or WAKE_PHRASES)]
+        self.window_seconds = window_seconds
+
+        self._awake = False
+        self._answered = False
+        self._last_rejected = 0.0
+        self._lock = threading.Lock()
+        self._stats = {
+            "wakes": 0,
+            "false_accepts": 0,
+            "false_rejects": 0,
+            "rejected_utterances": 0,
+        }
+
+    def is_awake(self) -> bool:
+        return self._awake
+
+    def wait(self) -> bool:
+        """Blocks until the wake phrase is heard. False if listening was stopped."""
+        heard = listen_for_phrases(self.phrases, on_rejected=self._on_rejected)
+        if not heard:
+            return False
+
+        with self._lock:
+            self._stats["wakes"] += 1
+            if time.monotonic() - self._last_rejected < REPEAT_WINDOW_SECONDS:
+                self._stats["false_rejects"] += 1
+            self._awake = True
+            self._answered = False
+
+        print(f"🎙 Wake phrase: {heard}")
+        return True
+
+    def strip(self, text: str) -> str:
+        """Removes a leading wake phrase from a command ("jarvis open chrome")."""
+        lowered = text.lower().strip()
+        for phrase in sorted(self.phrases, key=len, reverse=True):
+            if lowered == phrase:
+                return ""
+            if lowered.startswith(phrase + " "):
+                return text.strip()[len(phrase) + 1:].strip()
+        return text
+
+    def on_turn(self, text: str):
+        """Called with each listening result while awake; "" ends the window."""
+        with self._lock:
+            if text:
+                self._answered = True
+                return
+
+            if self._awake and not self._answered:
+                self._stats["false_accepts"] += 1
+            self._awake = False
+
+    def _on_rejected(self, text: str):
+        with self._lock:
+            self._stats["rejected_utterances"] += 1
+            self._last_rejected = time.monotonic()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)